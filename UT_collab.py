@@ -1,15 +1,9 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import Select
-from selenium.webdriver.common.action_chains import ActionChains
-
-from webdriver_manager.chrome import ChromeDriverManager
-import time
-from selenium import webdriver
-import pandas as pd
-
+from collab_crawler import crawl_pairs
+from crawl_checkpoint import CheckpointStore, plan_pairs
+from record_sink import RecordSink
+from response_cache import ResponseCache
+from table_extraction import COLUMNS
+from ut_http_client import UTSearchClient
 
 # List of schools to search
 schools = [
@@ -26,204 +20,79 @@ schools = [
     # Add more schools as needed
 ]
 
-# Initialize an empty DataFrame to store all results
-all_non_business_data = pd.DataFrame()
-all_business_data = pd.DataFrame()
+# Number of concurrent headless browsers and minimum seconds between query starts
+NUM_WORKERS = 4
+MIN_INTERVAL = 2.0
 
-for i in range(len(schools)):
-    for j in range(len(schools)):
-        school = schools[i]
-        next_school = schools[j]
-        if school == next_school:
-            pass
-        else:
+# URL of the search request behind the Search button. When set, searches are sent directly
+# over HTTP (falling back to Selenium on failure); when None, every search drives the page.
+SEARCH_API_URL = None
+
+# Completed pairs and their rows, so an interrupted crawl resumes where it stopped
+CHECKPOINT_PATH = 'collab_checkpoint.sqlite'
+
+# On-disk response cache shared by all crawls: past years are never refetched, so a fresh
+# crawl (new checkpoint) only searches the current year of each pair
+CACHE_PATH = 'scrape_cache.sqlite'
+
+# Output datasets (Parquet part files partitioned by school) and the rows buffered per flush
+OUTPUT_DIRS = {
+    "Business School Faculty": 'all_business_schools_collabs',
+    "Non-Business School Faculty": 'all_non_business_schools_collabs',
+}
+BATCH_SIZE = 50_000
 
-            driver = webdriver.Chrome()
-            # Refresh the page before each new search
-            driver.get("https://jsom.utdallas.edu/the-utd-top-100-business-school-research-rankings/search#collaboration")
-
-            # Wait for the search box to be present
-            search_box = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "as-input"))
-            )
-
-            # Input the school name into the search box
-            search_box.clear()  # Clear any previous input
-            search_box.send_keys(school)
-
-            # Wait for the results dropdown to appear
-            result_dropdown = WebDriverWait(driver, 15).until(
-                EC.visibility_of_element_located((By.CLASS_NAME, "as-results"))
-            )
-
-            # Locate and click the appropriate result
-            result_items = driver.find_elements(By.CLASS_NAME, "as-result-item")
-            for item in result_items:
-                if school in item.text:
-                    actions = ActionChains(driver)
-                    actions.move_to_element(item).click().perform()
-                    break
-            
-            time.sleep(2)
-
-            # Input the next school name into the search box
-            search_box.clear()  # Clear any previous input
-            search_box.send_keys(next_school)
-
-            # Wait for the results dropdown to appear
-            result_dropdown = WebDriverWait(driver, 10).until(
-                EC.visibility_of_element_located((By.CLASS_NAME, "as-results"))
-            )
-
-            # Locate and click the appropriate result
-            result_items = driver.find_elements(By.CLASS_NAME, "as-result-item")
-            for item in result_items:
-                if next_school in item.text:
-                    actions = ActionChains(driver)
-                    actions.move_to_element(item).click().perform()
-                    break
-            
-            time.sleep(2)
-
-            # Wait for the year dropdown to be present
-            year_dropdown = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.ID, "fromDate"))
-            )
-
-            # Create a Select object to interact with the dropdown
-            select = Select(year_dropdown)
-
-            # Select the option with value "1990"
-            select.select_by_value("1990")
-
-            time.sleep(8)
-
-            # Wait for the "Select All" link to be clickable
-            select_all_link = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.LINK_TEXT, "Select All"))
-            )
-
-            # Click the "Select All" link
-            select_all_link.click()
-
-            time.sleep(2)
-
-            # Wait for the "Search" button to be clickable
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CLASS_NAME, "button4"))
-            )
-
-            # Click the "Search" button
-            search_button.click()
-            time.sleep(8)
-
-            # Wait for the results to load, specifically waiting for the tables to appear
-            WebDriverWait(driver, 20).until(
-                EC.presence_of_all_elements_located((By.TAG_NAME, "table"))
-            )
-
-            # Locate the tables
-            tables = driver.find_elements(By.TAG_NAME, "table")
-
-
-            # Extract data from the "Publications by Business School Faculty" table
-            if len(tables) > 0:
-                business_table = tables[0]
-                business_rows = business_table.find_elements(By.TAG_NAME, "tr")
-                
-                # Initialize lists to store column data
-                business_journals = []
-                business_articles = []
-                business_authors = []
-                business_years = []
-                business_volumes = []
-
-                # Loop through each row and extract the data
-                for row in business_rows[1:]:  # Skip the header row
-                    cells = row.find_elements(By.TAG_NAME, "td")
-                    if len(cells) == 5:  # Ensure there are 5 columns
-                        business_journals.append(cells[0].text)
-                        business_articles.append(cells[1].text)
-                        business_authors.append(cells[2].text)
-                        business_years.append(cells[3].text)
-                        business_volumes.append(cells[4].text)
-
-                # Create a DataFrame for Business School Faculty
-                df_business = pd.DataFrame({
-                    'School': school,
-                    'Next School': next_school,
-                    'Type': 'Business School Faculty',
-                    'Journal': business_journals,
-                    'Article': business_articles,
-                    'Author': business_authors,
-                    'Year': business_years,
-                    'Volume': business_volumes
-                })
-
-                # append to the combined DataFrame
-                if all_business_data.shape[0] == 0 and df_business.shape[0] == 0:
-                    pass
-                elif all_business_data.shape[0] > 0 and df_business.shape[0] == 0:
-                    pass
-                elif all_business_data.shape[0] == 0 and df_business.shape[0] > 0:
-                    all_business_data = df_business
-                elif all_business_data.shape[0] > 0 and df_business.shape[0] > 0:   
-                    all_business_data = all_business_data._append(df_business, ignore_index=True)
-                
-
-            if len(tables) > 1:
-                time.sleep(1)
-                # Extract data from the "Publications by Non-Business School Faculty" table
-                non_business_table = tables[1]
-                non_business_rows = non_business_table.find_elements(By.TAG_NAME, "tr")
-                
-                # Initialize lists to store column data
-                non_business_journals = []
-                non_business_articles = []
-                non_business_authors = []
-                non_business_years = []
-                non_business_volumes = []
-
-                # Loop through each row and extract the data
-                for row in non_business_rows[1:]:  # Skip the header row
-                    cells = row.find_elements(By.TAG_NAME, "td")
-                    if len(cells) == 5:  # Ensure there are 5 columns
-                        non_business_journals.append(cells[0].text)
-                        non_business_articles.append(cells[1].text)
-                        non_business_authors.append(cells[2].text)
-                        non_business_years.append(cells[3].text)
-                        non_business_volumes.append(cells[4].text)
-
-                # Create a DataFrame for Non-Business School Faculty
-                df_non_business = pd.DataFrame({
-                    'School': school,
-                    'Next School': next_school,
-                    'Type': 'Non-Business School Faculty',
-                    'Journal': non_business_journals,
-                    'Article': non_business_articles,
-                    'Author': non_business_authors,
-                    'Year': non_business_years,
-                    'Volume': non_business_volumes
-                })
-
-                # append to the combined DataFrame
-                if all_non_business_data.shape[0] == 0 and df_non_business.shape[0] == 0:
-                    pass
-                elif all_non_business_data.shape[0] > 0 and df_non_business.shape[0] == 0:
-                    pass
-                elif all_non_business_data.shape[0] == 0 and df_non_business.shape[0] > 0:
-                    all_non_business_data = df_non_business
-                elif all_non_business_data.shape[0] > 0 and df_non_business.shape[0] > 0:   
-                    all_non_business_data = all_non_business_data._append(df_non_business, ignore_index=True)
-                
-            # Optional: Add a short delay to avoid overwhelming the server
-            time.sleep(2)
-
-            # Close the browser
-            driver.quit()
-
-# Save the combined DataFrame to a single CSV file
-all_business_data.to_csv('all_business_schools_collabs.csv', index=False)
-all_non_business_data.to_csv('all_non_business_schools_collabs.csv', index=False)
-
-print("All school data saved to all_schools_collabs.csv")
+
+def main():
+    store = CheckpointStore(CHECKPOINT_PATH)
+
+    # The tables are symmetric: fetch each unordered pair once, skipping finished ones
+    pending = store.pending(plan_pairs(schools))
+    print(f"{len(pending)} school pairs left to fetch")
+
+    cache = ResponseCache(CACHE_PATH)
+    client = None
+    if SEARCH_API_URL:
+        client = UTSearchClient(SEARCH_API_URL, cache=cache)
+        results = client.search_pairs(pending, max_workers=NUM_WORKERS)
+    else:
+        results = crawl_pairs(pending, num_workers=NUM_WORKERS, min_interval=MIN_INTERVAL, cache=cache)
+
+    for pair, tables, error in results:
+        if error is not None:
+            print(f"Skipping {pair[0]} / {pair[1]}: {error}")
+            store.record_failure(pair, error)
+        else:
+            store.save_pair(pair, tables)
+    if client is not None:
+        client.close()
+    cache.close()
+
+    # Stream each ordered pair's tables to disk, reconstructing (B, A) from the stored (A, B)
+    output_columns = ['School', 'Next School', 'Type'] + COLUMNS
+    sinks = {
+        table_type: RecordSink(directory, output_columns, partition_by=['School'], batch_size=BATCH_SIZE,
+                               replace=True)
+        for table_type, directory in OUTPUT_DIRS.items()
+    }
+
+    for school in schools:
+        for next_school in schools:
+            if school == next_school:
+                continue
+            tables = store.load_pair(school, next_school)
+            if tables is None:
+                continue
+
+            for table_type, sink in sinks.items():
+                sink.write(tables[table_type], **{'School': school, 'Next School': next_school, 'Type': table_type})
+
+    for sink in sinks.values():
+        sink.close()
+
+    print(f"All school data saved to {', '.join(OUTPUT_DIRS.values())}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
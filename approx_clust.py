@@ -1,20 +1,10 @@
 import numpy as np
-import networkx as nx
-import matplotlib.pyplot as plt
+from graph_generators import random_complete_matrix, to_networkx
 
 # Step 1: Create a directed graph with random weights
-def create_random_directed_graph(n_vertices=10):
-    G = nx.DiGraph()
-    G.add_nodes_from(range(n_vertices))
-
-    # Assign random weights to directed edges (representing preferences)
-    for i in range(n_vertices):
-        for j in range(n_vertices):
-            if i != j:
-                weight = np.random.randint(1, 11)  # Random weight between 1 and 10
-                G.add_edge(i, j, weight=weight)
-    
-    return G
+def create_random_directed_graph(n_vertices=10, seed=None):
+    # Assign random weights between 1 and 10 to every directed edge (representing preferences)
+    return to_networkx(random_complete_matrix(n_vertices, low=1, high=10, seed=seed))
 
 # Step 2: SDP-inspired vector assignment (randomized vectors on the unit sphere)
 def assign_random_vectors(n_vertices, dim=3):
@@ -48,6 +38,9 @@ def assign_clusters_with_ordering(vectors, n_clusters=3):
 
 # Step 4: Visualize the graph with cluster colors
 def visualize_graph(G, clusters):
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
     pos = nx.spring_layout(G)  # Spring layout for visualizing the graph
     colors = ['r', 'g', 'b']  # Use 3 colors for 3 clusters
     node_colors = [colors[clusters[node]] for node in G.nodes]
@@ -67,7 +60,7 @@ def main():
     np.random.seed(42)  # Set seed for reproducibility
     
     # Create a graph with 10 vertices
-    G = create_random_directed_graph(n_vertices=10)
+    G = create_random_directed_graph(n_vertices=10, seed=42)
     
     # Assign random vectors (simulating the SDP relaxation)
     vectors = assign_random_vectors(n_vertices=10)
@@ -0,0 +1,330 @@
+import argparse
+import csv
+import importlib
+import json
+import multiprocessing
+import resource
+import sys
+import time
+
+import numpy as np
+
+from graph_generators import random_tournament_matrix
+
+DEFAULT_SIZES = [10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+NUM_TIERS = 3
+
+
+def _feedback_weight(weights, ordering):
+    """
+    Total weight of arcs pointing backwards in an ordering of the nodes (best ranked first).
+    """
+    order = np.asarray(ordering)
+    permuted = weights[np.ix_(order, order)]
+    return float(np.tril(permuted, -1).sum())
+
+
+def _tiers_from_labels(labels):
+    """
+    Converts a label vector into a list of tiers (lists of node indices), dropping empty tiers.
+    """
+    labels = np.asarray(labels)
+    return [np.flatnonzero(labels == k).tolist() for k in np.unique(labels)]
+
+
+def run_exact_dp(weights):
+    from recursive import solve_exact_fas_dp
+
+    cost, _ = solve_exact_fas_dp(weights)
+    return {"objective": cost}
+
+
+def run_bfasp_mip(weights):
+    import gurobipy as gp
+
+    from run_bfasp import solve_bfasp
+
+    # solve_bfasp builds its own model; silence it through the default environment so
+    # solver logging is not timed
+    gp.setParam("OutputFlag", 0)
+    solution = solve_bfasp(weights)
+    return {
+        "objective": solution["optimal_value"],
+        "num_vars": solution["num_vars"],
+        "num_constrs": solution["num_constrs"],
+    }
+
+
+def run_lp_relaxation(weights):
+    from graph_generators import to_networkx
+    from recursive import solve_lp_relaxation
+
+    stats = {}
+    value, _ = solve_lp_relaxation(to_networkx(weights), stats=stats)
+    return {"objective": value, **stats}
+
+
+def run_lp_rounding(weights):
+    from graph_generators import to_networkx
+    from recursive import round_lp_solution, solve_lp_relaxation
+
+    G = to_networkx(weights)
+    stats = {}
+    _, solution = solve_lp_relaxation(G, stats=stats)
+    ordering, _ = round_lp_solution(G, solution)
+    return {"objective": _feedback_weight(weights, ordering), **stats}
+
+
+def run_recursive_dominance(weights):
+    from graph_generators import to_networkx
+    from recursive import recursive_dominance_ordering
+
+    ordering, _ = recursive_dominance_ordering(to_networkx(weights))
+    return {"objective": _feedback_weight(weights, ordering)}
+
+
+def run_tier_enumeration(weights):
+    from enumerate_tiers import enumerate_sequential_tier_splits
+
+    _, best = enumerate_sequential_tier_splits(weights.shape[0], NUM_TIERS, weights, verbose=False)
+    return {"objective": best}
+
+
+def run_tier_mip(weights):
+    from gurobipy import GRB
+
+    from enumerate_tiers import compute_cut_imbalance
+    from make_tiers import build_tier_model, convert_matrix_to_dict, tier_assignment
+
+    n = weights.shape[0]
+    V = [f"V{i+1}" for i in range(n)]
+    model, x, _ = build_tier_model(convert_matrix_to_dict(weights), V, NUM_TIERS)
+    model.Params.OutputFlag = 0
+    model.optimize()
+    if model.status != GRB.OPTIMAL:
+        raise Exception("Optimal solution not found!")
+
+    labels = list(tier_assignment(model, x, V, NUM_TIERS).values())
+    tiers = _tiers_from_labels(labels)
+    return {
+        "objective": compute_cut_imbalance(tiers, weights),
+        "num_vars": model.NumVars,
+        "num_constrs": model.NumConstrs,
+    }
+
+
+def _sequential_tiers(num_nodes):
+    return [part.tolist() for part in np.array_split(np.arange(num_nodes), NUM_TIERS)]
+
+
+def run_cut_imbalance_loop(weights):
+    # Reference: the original pair-by-pair loop over every pair of tiers
+    tiers = _sequential_tiers(weights.shape[0])
+    total = 0.0
+    for i in range(len(tiers)):
+        for j in range(i + 1, len(tiers)):
+            w_ij = sum(weights[u][v] for u in tiers[i] for v in tiers[j])
+            w_ji = sum(weights[u][v] for u in tiers[j] for v in tiers[i])
+            if w_ij + w_ji > 0:
+                total += abs(w_ij - w_ji) / (w_ij + w_ji)
+    return {"objective": total}
+
+
+def run_cut_imbalance_kernel(weights):
+    from tier_metrics import labels_from_tiers, tier_cut_imbalance
+
+    labels = labels_from_tiers(_sequential_tiers(weights.shape[0]), weights.shape[0])
+    return {"objective": tier_cut_imbalance(weights, labels, NUM_TIERS)}
+
+
+def run_approx_clust(weights):
+    from approx_clust import assign_clusters_with_ordering, assign_random_vectors
+    from enumerate_tiers import compute_cut_imbalance
+
+    n = weights.shape[0]
+    clusters = assign_clusters_with_ordering(assign_random_vectors(n), n_clusters=NUM_TIERS)
+    return {"objective": compute_cut_imbalance(_tiers_from_labels(clusters), weights)}
+
+
+# name: (runner, modules, problem, sense, is_bound, max_nodes)
+# Modules are imported before the timer starts so wall times exclude import cost.
+# B-FASP keeps both arcs of bidirectional pairs, so it is compared only with itself.
+# Tiering algorithms are all scored with enumerate_tiers.compute_cut_imbalance so they are comparable.
+# The tier MIP has O(n^2 K^2) binaries, so it only runs at the smallest sizes (10 and 20). It needs a
+# full Gurobi license: a size-limited one rejects it at both and the cases are recorded as errors.
+# The cut_imbalance cases time the tier_metrics kernel against the original loop on one fixed split.
+ALGORITHMS = {
+    "exact_dp": (run_exact_dp, ["recursive"], "ranking", "min", False, 20),
+    "bfasp_mip": (run_bfasp_mip, ["run_bfasp", "gurobipy"], "bfasp", "min", False, 50),
+    "lp_relaxation": (run_lp_relaxation, ["recursive", "networkx", "gurobipy"], "ranking", "min", True, 200),
+    "lp_rounding": (run_lp_rounding, ["recursive", "networkx", "gurobipy"], "ranking", "min", False, 200),
+    "recursive_dominance": (run_recursive_dominance, ["recursive", "networkx"], "ranking", "min", False, 5000),
+    "tier_enumeration": (run_tier_enumeration, ["enumerate_tiers"], "tiering", "max", False, 100),
+    "tier_mip": (run_tier_mip, ["make_tiers", "enumerate_tiers", "gurobipy"], "tiering", "max", False, 20),
+    "cut_imbalance_loop": (run_cut_imbalance_loop, [], "cut_imbalance", "max", False, 500),
+    "cut_imbalance_kernel": (run_cut_imbalance_kernel, ["tier_metrics"], "cut_imbalance", "max", False, 5000),
+    "approx_clust": (run_approx_clust, ["approx_clust", "enumerate_tiers", "networkx"], "tiering", "max", False, 5000),
+}
+
+
+def _run_case(name, size, seed):
+    """
+    Runs one algorithm on one seeded graph. Executed in a fresh worker process so the
+    peak RSS it reports belongs to this case alone.
+    """
+    runner, modules = ALGORITHMS[name][:2]
+    for module in modules:
+        importlib.import_module(module)
+    weights = random_tournament_matrix(size, seed=seed).astype(float)
+    np.random.seed(seed)
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    try:
+        record = runner(weights)
+        record["error"] = None
+    except Exception as e:
+        record = {"objective": None, "error": f"{type(e).__name__}: {e}"}
+    record["wall_time"] = time.perf_counter() - start
+    record["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    record["rss_before_kb"] = rss_before
+    return record
+
+
+def run_benchmarks(sizes=None, algorithms=None, seeds=(0,), timeout=None):
+    """
+    Runs every selected algorithm on seeded synthetic tournaments of every size.
+
+    Parameters:
+    sizes (list): Graph sizes to benchmark (defaults to DEFAULT_SIZES).
+    algorithms (list): Algorithm names from ALGORITHMS (defaults to all of them).
+    seeds (iterable): Graph seeds; each (size, seed) pair is one graph shared by all algorithms.
+    timeout (float): Seconds before a case is abandoned and recorded as timed out.
+
+    Returns:
+    list: One result dictionary per (algorithm, size, seed) case.
+    """
+    sizes = DEFAULT_SIZES if sizes is None else sizes
+    algorithms = list(ALGORITHMS) if algorithms is None else algorithms
+    context = multiprocessing.get_context("spawn")
+
+    results = []
+    for size in sizes:
+        for seed in seeds:
+            for name in algorithms:
+                _, _, problem, sense, is_bound, max_nodes = ALGORITHMS[name]
+                if size > max_nodes:
+                    continue
+
+                record = {"algorithm": name, "problem": problem, "sense": sense, "is_bound": is_bound,
+                          "size": size, "seed": seed, "num_vars": None, "num_constrs": None}
+                with context.Pool(processes=1, maxtasksperchild=1) as pool:
+                    pending = pool.apply_async(_run_case, (name, size, seed))
+                    try:
+                        record.update(pending.get(timeout=timeout))
+                    except multiprocessing.TimeoutError:
+                        record.update({"objective": None, "error": "timeout", "wall_time": timeout})
+                        pool.terminate()
+                print(f"{name:>20} n={size:<5} seed={seed} time={record['wall_time']:.3f}s "
+                      f"objective={record['objective']} error={record['error']}")
+                results.append(record)
+
+    add_gaps(results)
+    return results
+
+
+def add_gaps(results):
+    """
+    Adds the relative gap of each result to the best known feasible objective for the
+    same problem, size and seed. Bounds (LP relaxations) are reported against it too.
+    """
+    best = {}
+    for record in results:
+        if record["objective"] is None or record["is_bound"]:
+            continue
+        key = (record["problem"], record["size"], record["seed"])
+        better = min if record["sense"] == "min" else max
+        best[key] = record["objective"] if key not in best else better(best[key], record["objective"])
+
+    for record in results:
+        key = (record["problem"], record["size"], record["seed"])
+        record["best_known"] = best.get(key)
+        if record["objective"] is None or record["best_known"] is None:
+            record["gap"] = None
+        else:
+            record["gap"] = abs(record["objective"] - record["best_known"]) / max(abs(record["best_known"]), 1e-9)
+    return results
+
+
+def write_results(results, json_path=None, csv_path=None):
+    if json_path:
+        with open(json_path, "w") as file:
+            json.dump(results, file, indent=2)
+    if csv_path and results:
+        columns = list(dict.fromkeys(key for record in results for key in record))
+        with open(csv_path, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(results)
+
+
+def compare_to_baseline(results, baseline, time_tolerance=1.5, gap_tolerance=1e-6):
+    """
+    Compares results with a stored baseline run.
+
+    Parameters:
+    results (list): Results of the current run.
+    baseline (list): Results of the baseline run (as written by write_results).
+    time_tolerance (float): Allowed slowdown factor for wall time.
+    gap_tolerance (float): Allowed increase in gap to the best known solution.
+
+    Returns:
+    list: Human-readable descriptions of every regression found.
+    """
+    previous = {(r["algorithm"], r["size"], r["seed"]): r for r in baseline}
+    regressions = []
+    for record in results:
+        key = (record["algorithm"], record["size"], record["seed"])
+        if key not in previous:
+            continue
+        old = previous[key]
+        if record["error"] and not old["error"]:
+            regressions.append(f"{key}: now fails with {record['error']}")
+            continue
+        if old["wall_time"] and record["wall_time"] > time_tolerance * old["wall_time"]:
+            regressions.append(f"{key}: wall time {old['wall_time']:.3f}s -> {record['wall_time']:.3f}s")
+        if old.get("objective") is not None and record.get("objective") is not None:
+            worse = record["objective"] - old["objective"]
+            if record["sense"] == "max":
+                worse = -worse
+            if worse > gap_tolerance * max(abs(old["objective"]), 1.0):
+                regressions.append(f"{key}: objective {old['objective']} -> {record['objective']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ranking and tiering algorithms.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--algorithms", nargs="+", choices=list(ALGORITHMS), default=list(ALGORITHMS))
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--json", default="benchmark_results.json")
+    parser.add_argument("--csv", default="benchmark_results.csv")
+    parser.add_argument("--baseline", help="JSON results of a previous run to check for regressions")
+    parser.add_argument("--time-tolerance", type=float, default=1.5)
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.algorithms, args.seeds, args.timeout)
+    write_results(results, args.json, args.csv)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare_to_baseline(results, json.load(file), args.time_tolerance)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
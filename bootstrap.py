@@ -0,0 +1,239 @@
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from enumerate_tiers import enumerate_tier_splits_prefix
+from reranking import sift
+from shared_arrays import SharedArrayStore, attach
+
+
+def bootstrap_inputs(articles, schools=None, first_year=None, last_year=None):
+    """
+    Arrays a replicate's co-authorship matrix is rebuilt from. The resampling unit is a
+    publication record (an article as listed under one school): every record of the faculty
+    data in the window is part of the population, and contributes its (home, co-author)
+    matrix cells, if any.
+
+    Parameters:
+    articles (pd.DataFrame): Faculty publication data with School, Article, Author and Year columns.
+    schools (list): Matrix rows and columns (the sorted faculty schools if None).
+    first_year, last_year (int): Inclusive year window.
+
+    Returns:
+    tuple: (flat matrix cell of every pair, record of every pair, number of records, schools).
+    """
+    import pandas as pd
+
+    from affiliations import article_ids, collaboration_pairs
+
+    schools = sorted(articles["School"].dropna().unique()) if schools is None else list(schools)
+    records = pd.DataFrame({
+        "article_id": article_ids(articles),
+        "year": articles["Year"].to_numpy(),
+        "home": pd.Categorical(articles["School"], categories=schools).codes.astype(np.int64),
+    })
+    keep = records["home"].to_numpy() >= 0
+    if first_year is not None:
+        keep &= records["year"].to_numpy() >= first_year
+    if last_year is not None:
+        keep &= records["year"].to_numpy() <= last_year
+    records = records[keep].drop_duplicates(["article_id", "home"]).reset_index(drop=True)
+    records["record"] = np.arange(len(records), dtype=np.int64)
+
+    # Records without a cross-school co-author have no pairs but still take part in the draws
+    pairs = collaboration_pairs(articles, schools).merge(records[["article_id", "home", "record"]],
+                                                         on=["article_id", "home"])
+    n = len(schools)
+    cells = pairs["home"].to_numpy(np.int64) * n + pairs["coauthor"].to_numpy(np.int64)
+    return cells, pairs["record"].to_numpy(np.int64), len(records), schools
+
+
+def replicate_matrix(cells, records, num_records, num_schools, rng=None):
+    """
+    Weight matrix of one bootstrap replicate: records are drawn with replacement and every
+    pair is counted once per draw of its record, in two bincounts. With rng=None every
+    record counts once, which gives the original matrix.
+    """
+    if rng is None:
+        pair_weights = None
+    else:
+        draws = np.bincount(rng.integers(0, num_records, num_records), minlength=num_records)
+        pair_weights = draws[records]
+    flat = np.bincount(cells, weights=pair_weights, minlength=num_schools * num_schools)
+    return flat.reshape(num_schools, num_schools).astype(float)
+
+
+def _replicate_batch(cells, records, num_records, num_schools, base_order, seeds, num_tiers, max_passes):
+    """
+    Rank a batch of replicates in a worker and return only their aggregated counts.
+    """
+    cells, records = attach(cells), attach(records)
+    n = num_schools
+    rank_counts = np.zeros((n, n), dtype=np.int64)
+    comembership = np.zeros((n, n), dtype=np.int64)
+    objectives = []
+    ranks = np.empty(n, dtype=np.int64)
+    for seed in seeds:
+        weights = replicate_matrix(cells, records, num_records, n, np.random.default_rng(seed))
+        order, objective, _ = sift(weights, base_order, max_passes)
+        ranks[order] = np.arange(n)
+        rank_counts[np.arange(n), ranks] += 1
+        objectives.append(objective)
+        if num_tiers:
+            split, _ = enumerate_tier_splits_prefix(n, num_tiers, weights[np.ix_(order, order)])
+            labels = np.empty(n, dtype=np.int64)
+            for k, tier in enumerate(split):
+                labels[order[tier]] = k
+            comembership += labels[:, None] == labels[None, :]
+    return {"replicates": len(seeds), "rank_counts": rank_counts, "comembership": comembership,
+            "objectives": objectives}
+
+
+def rank_percentiles(rank_counts, percentiles):
+    """
+    Percentiles (0-100) of every school's rank distribution from its rank histogram.
+
+    Returns:
+    numpy.ndarray: (num_schools, len(percentiles)) ranks, 1 = best.
+    """
+    cumulative = np.cumsum(rank_counts, axis=1)
+    totals = cumulative[:, -1:]
+    return np.stack([(cumulative < totals * (p / 100)).sum(axis=1) + 1 for p in percentiles], axis=1)
+
+
+def bootstrap_rank_stability(articles, schools=None, num_replicates=1000, num_tiers=3, base_order=None,
+                             first_year=None, last_year=None, seed=0, interval=95, batch_size=25,
+                             max_workers=None, max_passes=10):
+    """
+    Bootstrap the stability of the ranking: publication records are resampled, each
+    replicate's matrix is rebuilt with bincount and ranked by sifting from the base ordering,
+    and optionally split into tiers. Replicates are ranked in batches on a process pool that
+    attaches the shared pair arrays, and only their running counts are kept.
+
+    Parameters:
+    articles (pd.DataFrame): Faculty publication data (see bootstrap_inputs).
+    schools (list): Schools to rank (the sorted faculty schools if None).
+    num_replicates (int): Number of bootstrap replicates.
+    num_tiers (int): Tiers per replicate for the co-membership frequencies (0 to skip).
+    base_order (list): Base ranking (school names, best first), e.g. from the B-FASP ranking
+        JSON; if None, the net-flow order of the full matrix repaired by sifting.
+    first_year, last_year (int): Inclusive year window.
+    seed (int): Seed of the replicate random streams.
+    interval (float): Width of the percentile interval, in percent.
+    batch_size (int): Replicates per task.
+    max_workers (int): Worker processes.
+    max_passes (int): Maximum sifting passes per replicate.
+
+    Returns:
+    dict: "summary" (DataFrame per school: base, mean, median and interval ranks, standard
+    deviation), "rank_counts" (DataFrame of rank histograms), "comembership" (DataFrame of
+    tier co-membership frequencies, if num_tiers) and "objectives" (backward weight per replicate).
+    """
+    import pandas as pd
+
+    cells, records, num_records, schools = bootstrap_inputs(articles, schools, first_year, last_year)
+    n = len(schools)
+    base_weights = replicate_matrix(cells, records, num_records, n)
+    if base_order is None:
+        start = np.argsort(-(base_weights.sum(axis=1) - base_weights.sum(axis=0)), kind="stable")
+        base_order, _, _ = sift(base_weights, start)
+    else:
+        index = {school: i for i, school in enumerate(schools)}
+        base_order = np.array([index[school] for school in base_order], dtype=np.int64)
+
+    seeds = np.random.SeedSequence(seed).spawn(num_replicates)
+    batches = [seeds[i:i + batch_size] for i in range(0, num_replicates, batch_size)]
+    rank_counts = np.zeros((n, n), dtype=np.int64)
+    comembership = np.zeros((n, n), dtype=np.int64)
+    objectives = []
+    with SharedArrayStore() as store:
+        cells_handle, records_handle = store.publish(cells), store.publish(records)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+            # Keep a bounded number of batches in flight and fold each result in as it arrives
+            max_in_flight = 2 * (max_workers or os.cpu_count() or 1)
+            batches = iter(batches)
+            running = set()
+            while True:
+                for batch in itertools.islice(batches, max_in_flight - len(running)):
+                    running.add(executor.submit(_replicate_batch, cells_handle, records_handle, num_records, n,
+                                                base_order, batch, num_tiers, max_passes))
+                if not running:
+                    break
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    partial = future.result()
+                    rank_counts += partial["rank_counts"]
+                    comembership += partial["comembership"]
+                    objectives.extend(partial["objectives"])
+
+    base_ranks = np.empty(n, dtype=np.int64)
+    base_ranks[base_order] = np.arange(1, n + 1)
+    positions = np.arange(1, n + 1)
+    mean = rank_counts @ positions / num_replicates
+    low, median, high = rank_percentiles(rank_counts, [(100 - interval) / 2, 50, (100 + interval) / 2]).T
+    summary = pd.DataFrame({
+        "base_rank": base_ranks,
+        "mean_rank": mean,
+        "median_rank": median,
+        f"rank_{(100 - interval) / 2:g}": low,
+        f"rank_{(100 + interval) / 2:g}": high,
+        "rank_std": np.sqrt(rank_counts @ positions ** 2 / num_replicates - mean ** 2),
+    }, index=pd.Index(schools, name="School")).sort_values("base_rank")
+
+    result = {
+        "summary": summary,
+        "rank_counts": pd.DataFrame(rank_counts, index=schools, columns=positions),
+        "objectives": np.array(objectives),
+    }
+    if num_tiers:
+        result["comembership"] = pd.DataFrame(comembership / num_replicates, index=schools, columns=schools)
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import time
+
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Bootstrap confidence intervals for every school's rank.")
+    parser.add_argument("--faculty", default="Non_Business_Faculty_Data.csv",
+                        help="Faculty publication CSV or publication dataset directory")
+    parser.add_argument("--ranking", help="Ranking JSON (pipeline ranking stage) giving the base order")
+    parser.add_argument("--replicates", type=int, default=1000)
+    parser.add_argument("--tiers", type=int, default=3)
+    parser.add_argument("--first-year", type=int)
+    parser.add_argument("--last-year", type=int)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="rank_stability.csv")
+    parser.add_argument("--comembership", default="tier_comembership.csv")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    columns = ["School", "Article", "Author", "Year"]
+    if args.faculty.endswith(".csv"):
+        articles = pd.read_csv(args.faculty, usecols=columns)
+    else:
+        from publication_store import load_publications
+
+        articles = load_publications(args.faculty, columns=columns)
+    schools, base_order = None, None
+    if args.ranking:
+        with open(args.ranking) as file:
+            ranking = json.load(file)
+        schools, base_order = ranking["schools"], ranking["order"]
+        articles = articles[articles["School"].isin(schools)]
+
+    result = bootstrap_rank_stability(articles, schools, args.replicates, args.tiers, base_order,
+                                      args.first_year, args.last_year, args.seed, max_workers=args.workers)
+    result["summary"].to_csv(args.output)
+    if args.tiers:
+        result["comembership"].to_csv(args.comembership)
+    print(result["summary"].to_string())
+    print(f"{args.replicates} replicates in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,265 @@
+import asyncio
+import csv
+import os
+import re
+import time
+import unicodedata
+from urllib.parse import parse_qs, urljoin, urlparse
+
+import requests
+
+from politeness import AdaptiveRateLimiter
+from response_cache import cache_key, cached_get
+
+SCHOLAR_URL = "https://scholar.google.com"
+CSV_HEADER = ["Paper Title", "Citing Title", "Authors"]
+RESULTS_PER_PAGE = 10
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+_RESULT_COUNT = re.compile(r"([\d,.]+)\s+result")
+
+
+def normalize_title(title):
+    """
+    Normalize a paper title for deduplication: strip accents and punctuation, case-fold
+    and collapse whitespace.
+    """
+    title = unicodedata.normalize("NFKD", str(title))
+    title = "".join(c for c in title if not unicodedata.combining(c))
+    title = _PUNCTUATION.sub(" ", title.casefold())
+    return _WHITESPACE.sub(" ", title).strip()
+
+
+def unique_titles(titles):
+    """
+    Deduplicate titles by their normalized form, keeping the first spelling of each in order.
+    """
+    seen = {}
+    for title in titles:
+        if not isinstance(title, str):
+            continue
+        key = normalize_title(title)
+        if key and key not in seen:
+            seen[key] = title
+    return list(seen.values())
+
+
+def open_citing_papers_csv(output_file):
+    """
+    Open the citing papers CSV in append mode, writing the header only if the file is new
+    or empty.
+
+    Returns:
+    tuple: (file, csv writer).
+    """
+    is_file_empty = not os.path.exists(output_file) or os.path.getsize(output_file) == 0
+    file = open(output_file, mode='a', newline='', encoding='utf-8')
+    csv_writer = csv.writer(file)
+    if is_file_empty:
+        csv_writer.writerow(CSV_HEADER)
+    return file, csv_writer
+
+
+def parse_results_page(html, base_url=SCHOLAR_URL):
+    """
+    Parse a Scholar results page.
+
+    Returns:
+    dict: "results" as (title, authors) pairs, the first "cited_by" link, the "next" page
+    link, the reported total "count" of results (or None) and whether the page is "blocked"
+    by a captcha.
+    """
+    import lxml.html
+
+    document = lxml.html.fromstring(html)
+    results = []
+    for result in document.find_class("gs_ri"):
+        titles = result.xpath(".//h3")
+        authors = result.find_class("gs_a")
+        if titles and authors:
+            results.append((titles[0].text_content().strip(), authors[0].text_content().strip()))
+
+    cited_by = next((a.get("href") for a in document.iter("a") if a.text_content().startswith("Cited by")), None)
+    next_page = next((a.get("href") for a in document.iter("a") if a.text_content().strip() == "Next"), None)
+
+    count = None
+    for summary in document.xpath('//*[@id="gs_ab_md"]'):
+        match = _RESULT_COUNT.search(summary.text_content())
+        if match:
+            count = int(re.sub(r"[,.]", "", match.group(1)))
+
+    blocked = bool(document.xpath('//*[@id="gs_captcha_ccl"]')) or "unusual traffic" in html
+    return {
+        "results": results,
+        "cited_by": urljoin(base_url, cited_by) if cited_by else None,
+        "next": urljoin(base_url, next_page) if next_page else None,
+        "count": count,
+        "blocked": blocked,
+    }
+
+
+class CitationCrawler:
+    """
+    Asyncio crawl engine for "Cited by" lists. Titles are deduplicated up front, a bounded
+    number of fetches run concurrently under per-host rate limits, the remaining "Cited by"
+    pages of a paper are requested together once the first page reports the result count,
+    and rows stream to the CSV writer as each paper completes.
+
+    Parameters:
+    base_url (str): Scholar base URL (point it at a local stub server for testing).
+    concurrency (int): Maximum number of requests in flight.
+    rate (float): Starting requests per second allowed per host.
+    max_pages (int): Maximum "Cited by" pages fetched per paper.
+    max_retries (int): Retries per page after errors or captcha pages.
+    jitter (float): Random extra wait per request as a fraction of the host's interval.
+    session (requests.Session): Session used for the fetches (a new pooled one if None).
+    cache (ResponseCache): On-disk cache; fresh pages are served from it without a request.
+    """
+
+    def __init__(self, base_url=SCHOLAR_URL, concurrency=4, rate=1 / 20, max_pages=50, max_retries=3,
+                 jitter=0.5, session=None, cache=None):
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.rate = rate
+        self.max_pages = max_pages
+        self.max_retries = max_retries
+        self.jitter = jitter
+        self.session = session if session is not None else requests.Session()
+        self.cache = cache
+        self.limiters = {}
+        self._semaphore = None
+
+    def limiter_for(self, url):
+        host = urlparse(url).netloc
+        if host not in self.limiters:
+            self.limiters[host] = AdaptiveRateLimiter(rate=self.rate, min_rate=self.rate / 30,
+                                                      target_latency=15.0, jitter=self.jitter)
+        return self.limiters[host]
+
+    async def fetch(self, url, params=None):
+        """
+        Fetch one page under the concurrency bound and the host's rate limit, retrying with
+        backoff on errors, captcha pages and bodies that do not parse (empty or garbage).
+
+        Returns:
+        dict: The parsed page (see parse_results_page), or None if every attempt failed.
+        """
+        from lxml.etree import ParserError
+
+        if self.cache is not None:
+            cached = self.cache.get("scholar", cache_key(url=url, params=params or {}))
+            if cached is not None:
+                return parse_results_page(cached, self.base_url)
+
+        limiter = self.limiter_for(url)
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                # Wait for the host's slot only once holding a connection slot, so requests
+                # queued at the semaphore cannot go out back to back when slots free together
+                await limiter.wait_async()
+                start = time.monotonic()
+                try:
+                    if self.cache is not None:
+                        status, text = await asyncio.to_thread(
+                            cached_get, self.cache, self.session, "scholar", url, params, 30,
+                            lambda html: not parse_results_page(html, self.base_url)["blocked"],
+                        )
+                    else:
+                        response = await asyncio.to_thread(self.session.get, url, params=params, timeout=30)
+                        status, text = response.status_code, response.text
+                    page = parse_results_page(text, self.base_url) if 200 <= status < 400 else None
+                except requests.RequestException as e:
+                    print(f"Error fetching {url}: {e}")
+                    page = None
+                except (ParserError, ValueError) as e:
+                    print(f"Error parsing {url}: {e}")
+                    page = None
+            ok = page is not None and not page["blocked"]
+            limiter.record(time.monotonic() - start, ok=ok)
+            if ok:
+                return page
+        return None
+
+    async def citing_papers(self, paper_title):
+        """
+        All (paper title, citing title, authors) rows for one paper.
+        """
+        search = await self.fetch(urljoin(self.base_url, "/scholar"), params={"q": paper_title})
+        if search is None or search["cited_by"] is None:
+            return []
+
+        first = await self.fetch(search["cited_by"])
+        if first is None:
+            return []
+        pages = [first]
+
+        if first["count"] is not None:
+            # Result count known: request the remaining pages concurrently
+            num_pages = min(self.max_pages, -(-first["count"] // RESULTS_PER_PAGE))
+            query = parse_qs(urlparse(search["cited_by"]).query)
+            cited_url = search["cited_by"].split("?")[0]
+            params = [
+                {**{key: values[0] for key, values in query.items()}, "start": page * RESULTS_PER_PAGE}
+                for page in range(1, num_pages)
+            ]
+            pages += await asyncio.gather(*(self.fetch(cited_url, p) for p in params))
+        else:
+            # Otherwise follow the "Next" links one by one
+            page = first
+            while page is not None and page["next"] and len(pages) < self.max_pages:
+                page = await self.fetch(page["next"])
+                pages.append(page)
+
+        return [[paper_title, title, authors] for page in pages if page for title, authors in page["results"]]
+
+    async def crawl(self, paper_titles, csv_writer, file=None):
+        """
+        Crawl the citing papers of every unique title, writing rows as each paper completes.
+
+        Returns:
+        int: Number of rows written.
+        """
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        titles = unique_titles(paper_titles)
+        print(f"Crawling {len(titles)} unique titles")
+
+        # Bounded number of papers in flight; each paper's pages share the request semaphore
+        paper_slots = asyncio.Semaphore(self.concurrency)
+
+        async def crawl_one(title):
+            async with paper_slots:
+                return await self.citing_papers(title)
+
+        written = 0
+        for task in asyncio.as_completed([crawl_one(title) for title in titles]):
+            rows = await task
+            csv_writer.writerows(rows)
+            if file is not None:
+                file.flush()
+            written += len(rows)
+        return written
+
+
+def crawl_citing_papers(paper_titles, output_file, **crawler_options):
+    """
+    Run the citation crawl for a list of titles, appending rows to `output_file`.
+    """
+    file, csv_writer = open_citing_papers_csv(output_file)
+    try:
+        return asyncio.run(CitationCrawler(**crawler_options).crawl(paper_titles, csv_writer, file))
+    finally:
+        file.close()
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    from response_cache import ResponseCache
+
+    pub_data = pd.read_csv('Business_Faculty_Data.csv')
+    cache = ResponseCache('scrape_cache.sqlite')
+    try:
+        crawl_citing_papers(list(pub_data['Article']), 'citing_papers_output.csv', cache=cache)
+    finally:
+        cache.close()
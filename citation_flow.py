@@ -0,0 +1,201 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import scipy.sparse as sp
+
+from affiliations import normalize_text
+
+# Columns written by scholar_scrape2 / citation_crawler
+CITATION_COLUMNS = ["Paper Title", "Citing Title", "Authors"]
+
+
+def author_keys(names):
+    """
+    Matching key of author names: first initial and surname, lower-cased without accents or
+    punctuation ("Pamela J Hinds" and Scholar's "PJ Hinds" both give "p hinds").
+
+    Returns:
+    pyarrow.Array: Keys (empty where a name has no letters).
+    """
+    names = normalize_text(names)
+    initial = pc.utf8_slice_codeunits(names, 0, 1)
+    # Last word: first word of the reversed string, reversed back
+    surname = pc.utf8_reverse(pc.list_element(pc.split_pattern(pc.utf8_reverse(names), " ", max_splits=1), 0))
+    keys = pc.binary_join_element_wise(initial, surname, pa.scalar(" ", names.type))
+    return pc.if_else(pc.equal(names, ""), "", keys)
+
+
+def title_index(articles, schools):
+    """
+    Hashed index from normalized article titles to the schools whose faculty wrote them.
+
+    Parameters:
+    articles (pd.DataFrame): Faculty publication data with Article and School columns.
+    schools (list): Schools addressing the matrix rows and columns.
+
+    Returns:
+    tuple: (pd.Index of normalized titles, DataFrame of (title_code, cited) school code pairs).
+    """
+    pairs = pd.DataFrame({
+        "title": normalize_text(articles["Article"]).to_pandas(),
+        "cited": pd.Categorical(articles["School"], categories=schools).codes,
+    })
+    pairs = pairs[(pairs["cited"] >= 0) & (pairs["title"] != "")].drop_duplicates()
+    titles = pd.Index(pairs["title"].unique())
+    pairs["title_code"] = titles.get_indexer(pairs["title"])
+    return titles, pairs[["title_code", "cited"]].reset_index(drop=True)
+
+
+def author_index(affiliations):
+    """
+    School of each author key, taken from the faculty affiliations (see
+    affiliations.explode_authors). Keys shared by authors at several schools resolve to the
+    school with the most papers.
+
+    Returns:
+    pd.Series: School code indexed by author key.
+    """
+    known = affiliations[affiliations["school"].cat.codes >= 0]
+    frame = pd.DataFrame({
+        "key": author_keys(known["author"]).to_pandas(),
+        "school": known["school"].cat.codes.to_numpy(),
+    })
+    frame = frame[frame["key"] != ""]
+    counts = frame.groupby(["key", "school"]).size().reset_index(name="papers")
+    best = counts.sort_values("papers", ascending=False, kind="stable").drop_duplicates("key")
+    return best.set_index("key")["school"].sort_index()
+
+
+def _citing_schools(authors, authors_index):
+    """
+    (row, citing school code) pairs of a chunk's Scholar author strings, e.g.
+    "Y Chen, S Lee - Journal of Marketing, 2024 - sagepub.com".
+    """
+    authors = pc.fill_null(pa.array(authors.astype(object).where(authors.notna(), None), type=pa.large_string()), "")
+    names = pc.list_element(pc.split_pattern(authors, " - ", max_splits=1), 0)
+    names = pc.split_pattern(names, ",")
+    rows = np.repeat(np.arange(len(authors)), pc.list_value_length(names).to_numpy(zero_copy_only=False))
+    schools = authors_index.reindex(author_keys(pc.list_flatten(names)).to_pandas()).to_numpy()
+    found = ~np.isnan(schools)
+    pairs = pd.DataFrame({"row": rows[found], "citing": schools[found].astype(np.int64)})
+    # A citing paper counts once per school, however many of its authors are there
+    return pairs.drop_duplicates()
+
+
+def _spill(buckets, hashes, cells, num_buckets):
+    """
+    Append (row hash, matrix cell) pairs to the on-disk hash buckets, each pair to the
+    bucket of its hash.
+    """
+    records = np.column_stack((hashes, cells.astype(np.uint64)))
+    bucket_of = hashes % np.uint64(num_buckets)
+    for bucket in np.unique(bucket_of):
+        with open(buckets[int(bucket)], "ab") as file:
+            records[bucket_of == bucket].tofile(file)
+
+
+def build_citation_flow(citations, articles, affiliations, schools=None, chunksize=1_000_000,
+                        include_self=False, num_buckets=16, spill_dir=None):
+    """
+    Accumulate a school citation-flow matrix from scraped citation rows. Arcs run from the
+    cited school to the citing school: entry (i, j) counts the distinct papers with an author
+    at school j that cite a paper by the faculty of school i. run_bfasp ranks the source of an
+    arc ahead of its target, so heavily cited schools rank high.
+
+    The scrapers append, so reruns repeat rows. Each chunk's (row hash, matrix cell) pairs are
+    spilled to hash buckets on disk, and every bucket is then deduplicated on its own with
+    np.unique, so memory is bounded by one chunk and one bucket rather than by every citation
+    seen. A repeated (cited, citing) title pair counts once per school pair.
+
+    Parameters:
+    citations (str or iterable): Path of citing_papers_output.csv, or an iterable of
+        DataFrames with the CITATION_COLUMNS. Read in chunks, never loaded whole.
+    articles (pd.DataFrame): Faculty publication data (Article and School columns).
+    affiliations (pd.DataFrame): Exploded authors from affiliations.explode_authors, used to
+        resolve the citing authors' schools.
+    schools (list): Matrix rows and columns (the sorted faculty schools if None).
+    chunksize (int): Citation rows per chunk.
+    include_self (bool): Keep citations from a school to itself on the diagonal.
+    num_buckets (int): Hash buckets the deduplication is split into.
+    spill_dir (str): Directory for the bucket files (a temporary directory if None).
+
+    Returns:
+    tuple: (scipy.sparse.csr_matrix of shape (n, n), list of the n schools).
+    """
+    import tempfile
+
+    schools = sorted(articles["School"].dropna().unique()) if schools is None else list(schools)
+    n = len(schools)
+    titles, cited_pairs = title_index(articles, schools)
+    authors_index = author_index(affiliations.assign(school=affiliations["school"].cat.set_categories(schools)))
+
+    if isinstance(citations, str):
+        citations = pd.read_csv(citations, usecols=CITATION_COLUMNS, dtype=str, chunksize=chunksize)
+
+    flow = sp.csr_matrix((n, n), dtype=np.int64)
+    with tempfile.TemporaryDirectory(dir=spill_dir) as directory:
+        buckets = [os.path.join(directory, f"bucket-{b}.bin") for b in range(num_buckets)]
+        for chunk in citations:
+            cited_titles = normalize_text(chunk["Paper Title"]).to_pandas()
+            title_codes = titles.get_indexer(cited_titles.to_numpy())
+            rows = np.flatnonzero(title_codes >= 0)
+            if len(rows) == 0:
+                continue
+
+            hashes = pd.util.hash_pandas_object(
+                pd.DataFrame({
+                    "cited": cited_titles.iloc[rows].to_numpy(),
+                    "citing": normalize_text(chunk["Citing Title"].iloc[rows]).to_pandas().to_numpy(),
+                }),
+                index=False,
+            ).to_numpy()
+            citing = _citing_schools(chunk["Authors"].iloc[rows].reset_index(drop=True), authors_index)
+            cited = pd.DataFrame({"row": np.arange(len(rows)), "title_code": title_codes[rows]}).merge(cited_pairs, on="title_code")
+            pairs = citing.merge(cited[["row", "cited"]], on="row")
+            if not include_self:
+                pairs = pairs[pairs["citing"] != pairs["cited"]]
+            if len(pairs):
+                cells = pairs["cited"].to_numpy(np.int64) * n + pairs["citing"].to_numpy(np.int64)
+                _spill(buckets, hashes[pairs["row"].to_numpy()], cells, num_buckets)
+
+        for path in buckets:
+            if not os.path.exists(path):
+                continue
+            records = np.unique(np.fromfile(path, dtype=np.uint64).reshape(-1, 2), axis=0)
+            cells, counts = np.unique(records[:, 1].astype(np.int64), return_counts=True)
+            flow = flow + sp.coo_matrix((counts.astype(np.int64), (cells // n, cells % n)), shape=(n, n)).tocsr()
+
+    return flow, schools
+
+
+def write_adjacency_matrix(matrix, schools, path):
+    """
+    Write a weight matrix in the layout of Adjacency_Matrix.csv (school names as the index
+    column and header), which run_bfasp loads with pd.read_csv(path, index_col=0).
+    """
+    dense = matrix.toarray() if sp.issparse(matrix) else np.asarray(matrix)
+    pd.DataFrame(dense, index=schools, columns=schools).to_csv(path)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from affiliations import load_affiliations
+
+    parser = argparse.ArgumentParser(description="Build a school citation-flow matrix from scraped citations.")
+    parser.add_argument("--citations", default="citing_papers_output.csv")
+    parser.add_argument("--faculty", default="Non_Business_Faculty_Data.csv")
+    parser.add_argument("--output", default="Citation_Flow_Matrix.csv")
+    parser.add_argument("--chunksize", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    articles, affiliations = load_affiliations(args.faculty)
+    flow, schools = build_citation_flow(args.citations, articles, affiliations, chunksize=args.chunksize)
+    write_adjacency_matrix(flow, schools, args.output)
+    print(f"{flow.sum()} school citations across {flow.nnz} school pairs written to {args.output} "
+          f"in {time.perf_counter() - start:.1f}s")
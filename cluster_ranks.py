@@ -1,40 +1,39 @@
 import numpy as np
-import networkx as nx
-import matplotlib.pyplot as plt
 from itertools import permutations, combinations
+from graph_generators import random_complete_matrix, to_networkx
+from tier_metrics import labels_from_tiers, tier_cut_imbalance
 
 # Create a random directed graph with weights
-def create_random_weighted_graph(n_vertices):
-    G = nx.DiGraph()
-    for i in range(n_vertices):
-        for j in range(n_vertices):
-            if i != j:
-                G.add_edge(i, j, weight=np.random.randint(1, 10))
-    return G
-
-# Cut imbalance (CIbase) between two clusters
-def cut_imbalance(G, cluster1, cluster2):
-    w_XY = sum(G[i][j]['weight'] for i in cluster1 for j in cluster2 if G.has_edge(i, j))
-    w_YX = sum(G[i][j]['weight'] for i in cluster2 for j in cluster1 if G.has_edge(i, j))
-    
-    if w_XY + w_YX == 0:
-        return 0  # Avoid division by zero when no edges exist between clusters
-    
-    return 0.5 * abs(w_XY - w_YX) / (w_XY + w_YX)
+def create_random_weighted_graph(n_vertices, seed=None):
+    return to_networkx(random_complete_matrix(n_vertices, low=1, high=9, seed=seed))
+
+# Weight matrix of G with nodes mapped to matrix indices
+def graph_weight_matrix(G):
+    import networkx as nx
+
+    nodes = list(G.nodes)
+    index = {node: i for i, node in enumerate(nodes)}
+    return nx.to_numpy_array(G, nodelist=nodes, weight='weight'), index
+
+# Cut imbalance (CIbase) between two clusters, with the 0.5 factor of CIbase.
+# Pass matrix=graph_weight_matrix(G) when scoring many partitions of the same graph.
+def cut_imbalance(G, cluster1, cluster2, matrix=None):
+    weights, index = graph_weight_matrix(G) if matrix is None else matrix
+    labels = labels_from_tiers([[index[v] for v in cluster1], [index[v] for v in cluster2]], len(index))
+    return 0.5 * tier_cut_imbalance(weights, labels, 2)
 
 # Calculate total cut imbalance across all cluster pairs
-def total_cut_imbalance(G, clusters):
-    total_CI = 0
-    cluster_list = list(clusters.values())
-    for i in range(len(cluster_list)):
-        for j in range(i + 1, len(cluster_list)):
-            total_CI += cut_imbalance(G, cluster_list[i], cluster_list[j])
-    return total_CI
+def total_cut_imbalance(G, clusters, matrix=None):
+    weights, index = graph_weight_matrix(G) if matrix is None else matrix
+    tiers = [[index[v] for v in members] for members in clusters.values()]
+    return 0.5 * tier_cut_imbalance(weights, labels_from_tiers(tiers, len(index)), len(tiers))
 
 # Exhaustive Enumeration for Clustering, respecting vertex ordering
 def enumerate_solutions(G, n_vertices, n_clusters):
     best_CI = -np.inf
     best_partition = None
+    # Build the weight matrix once and score every candidate partition against it
+    matrix = graph_weight_matrix(G)
 
     # Generate all possible ways to partition n_vertices into n_clusters (enumerate all solutions)
     partitions = combinations(permutations(range(n_vertices), n_vertices), n_clusters)
@@ -55,7 +54,7 @@ def enumerate_solutions(G, n_vertices, n_clusters):
             continue  # Skip invalid partitions
         
         # Calculate total CIbase for this partition
-        CI = total_cut_imbalance(G, clusters)
+        CI = total_cut_imbalance(G, clusters, matrix)
         
         if CI > best_CI:
             best_CI = CI
@@ -65,6 +64,9 @@ def enumerate_solutions(G, n_vertices, n_clusters):
 
 # Visualize the clusters, showing vertex numbers on nodes
 def visualize_clusters(clusters, G):
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
     pos = nx.spring_layout(G)
     colors = ['r', 'g', 'b', 'y']
 
@@ -0,0 +1,104 @@
+import queue
+import threading
+import time
+
+from politeness import AdaptiveRateLimiter
+from response_cache import cached_search
+from ut_search import SEARCH_URL, make_driver, search_schools
+
+
+def _crawl_worker(tasks, results, limiter, make_driver, url, from_year, max_retries, cache):
+    """
+    Worker loop: owns one long-lived driver and runs queued pairs until the queue is empty.
+    The driver is relaunched only if a query fails.
+    """
+    driver = None
+
+    def fetch(schools, year):
+        # Only actual page loads wait for the limiter; cache hits return immediately
+        limiter.wait()
+        start = time.monotonic()
+        try:
+            tables = search_schools(driver, schools, year, url)
+        except Exception:
+            limiter.record(time.monotonic() - start, ok=False)
+            raise
+        limiter.record(time.monotonic() - start)
+        return tables
+
+    try:
+        while True:
+            try:
+                pair = tasks.get_nowait()
+            except queue.Empty:
+                return
+
+            for attempt in range(max_retries + 1):
+                try:
+                    if driver is None:
+                        driver = make_driver()
+                    if cache is not None:
+                        tables = cached_search(cache, fetch, list(pair), from_year)
+                    else:
+                        tables = fetch(list(pair), from_year)
+                    results.put((pair, tables, None))
+                    break
+                except Exception as e:
+                    print(f"Error searching {pair} (attempt {attempt + 1}): {e}")
+                    if driver is not None:
+                        try:
+                            driver.quit()
+                        except Exception:
+                            pass
+                        driver = None
+                    if attempt == max_retries:
+                        results.put((pair, None, e))
+    finally:
+        if driver is not None:
+            driver.quit()
+
+
+def crawl_pairs(pairs, num_workers=4, min_interval=2.0, from_year="1990", url=SEARCH_URL,
+                make_driver=make_driver, max_retries=2, limiter=None, cache=None):
+    """
+    Run the collaboration search for every school pair on a pool of long-lived drivers.
+
+    Parameters:
+    pairs (list): (school, next_school) pairs to search.
+    num_workers (int): Number of concurrent browsers.
+    min_interval (float): Starting minimum seconds between query starts across all workers.
+    from_year (str): First publication year to include.
+    url (str): Search page URL (point it at a local fixture server for testing).
+    make_driver (callable): Factory returning a new WebDriver.
+    max_retries (int): Retries per pair, each on a fresh driver.
+    limiter (AdaptiveRateLimiter): Shared limiter (a new one at 1 / min_interval queries per second if None).
+    cache (ResponseCache): On-disk cache; past years are served from it and only the current
+        year is refetched.
+
+    Yields:
+    tuple: (pair, tables, error) as pairs complete; tables maps table type -> DataFrame,
+    and is None when the pair failed with `error`.
+    """
+    tasks = queue.Queue()
+    for pair in pairs:
+        tasks.put(pair)
+    results = queue.Queue()
+    if limiter is None:
+        limiter = AdaptiveRateLimiter(rate=1.0 / min_interval, target_latency=30.0)
+
+    workers = [
+        threading.Thread(
+            target=_crawl_worker,
+            args=(tasks, results, limiter, make_driver, url, from_year, max_retries, cache),
+            daemon=True,
+        )
+        for _ in range(min(num_workers, len(pairs)))
+    ]
+    for worker in workers:
+        worker.start()
+
+    for _ in range(len(pairs)):
+        yield results.get()
+
+    for worker in workers:
+        worker.join()
@@ -0,0 +1,126 @@
+import itertools
+import sqlite3
+import time
+
+import pandas as pd
+
+from table_extraction import COLUMNS, TABLE_TYPES
+
+
+def canonical_pair(school, next_school):
+    """
+    The collaboration tables are symmetric, so (A, B) and (B, A) share one canonical key.
+    """
+    return tuple(sorted((school, next_school)))
+
+
+def plan_pairs(schools):
+    """
+    Every unordered pair of distinct schools, in canonical form, each exactly once.
+    """
+    unique_schools = sorted(set(schools))
+    return list(itertools.combinations(unique_schools, 2))
+
+
+class CheckpointStore:
+    """
+    SQLite checkpoint for the collaboration crawl. Every completed pair is committed together
+    with its rows in one transaction, so a crash never leaves a half-written pair and a
+    restart can skip everything already fetched.
+
+    Parameters:
+    path (str): SQLite database file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS pairs (
+                school_a TEXT NOT NULL,
+                school_b TEXT NOT NULL,
+                status TEXT NOT NULL,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (school_a, school_b)
+            );
+            CREATE TABLE IF NOT EXISTS rows (
+                school_a TEXT NOT NULL,
+                school_b TEXT NOT NULL,
+                type TEXT NOT NULL,
+                journal TEXT,
+                article TEXT,
+                author TEXT,
+                year TEXT,
+                volume TEXT
+            );
+            CREATE INDEX IF NOT EXISTS rows_pair ON rows (school_a, school_b);
+        """)
+
+    def completed_pairs(self):
+        cursor = self.connection.execute("SELECT school_a, school_b FROM pairs WHERE status = 'done'")
+        return set(cursor.fetchall())
+
+    def pending(self, pairs):
+        """
+        The canonical pairs that still need fetching, in the given order.
+        """
+        done = self.completed_pairs()
+        return [pair for pair in pairs if canonical_pair(*pair) not in done]
+
+    def save_pair(self, pair, tables):
+        """
+        Store the result tables of a pair and mark it done, atomically.
+
+        Parameters:
+        pair (tuple): The searched (school, next_school) pair.
+        tables (dict): Table type -> DataFrame with the COLUMNS.
+        """
+        school_a, school_b = canonical_pair(*pair)
+        records = [
+            (school_a, school_b, table_type, *row)
+            for table_type, df in tables.items()
+            for row in df[COLUMNS].astype(str).itertuples(index=False, name=None)
+        ]
+        with self.connection:
+            self.connection.execute("DELETE FROM rows WHERE school_a = ? AND school_b = ?", (school_a, school_b))
+            self.connection.executemany("INSERT INTO rows VALUES (?, ?, ?, ?, ?, ?, ?, ?)", records)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO pairs VALUES (?, ?, 'done', NULL, ?)", (school_a, school_b, time.time())
+            )
+
+    def record_failure(self, pair, error):
+        school_a, school_b = canonical_pair(*pair)
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO pairs VALUES (?, ?, 'failed', ?, ?)",
+                (school_a, school_b, str(error), time.time()),
+            )
+
+    def load_pair(self, school, next_school):
+        """
+        The result tables for an ordered pair, reconstructed from the canonical stored pair.
+
+        Returns:
+        dict: Table type -> DataFrame with the COLUMNS, or None if the pair is not done.
+        """
+        school_a, school_b = canonical_pair(school, next_school)
+        status = self.connection.execute(
+            "SELECT status FROM pairs WHERE school_a = ? AND school_b = ?", (school_a, school_b)
+        ).fetchone()
+        if status is None or status[0] != "done":
+            return None
+        df = pd.read_sql_query(
+            "SELECT type, journal, article, author, year, volume FROM rows WHERE school_a = ? AND school_b = ?",
+            self.connection,
+            params=(school_a, school_b),
+        )
+        df.columns = ["Type"] + COLUMNS
+        return {
+            table_type: df.loc[df["Type"] == table_type, COLUMNS].reset_index(drop=True)
+            for table_type in TABLE_TYPES
+        }
+
+    def close(self):
+        self.connection.close()
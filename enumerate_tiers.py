@@ -1,37 +1,104 @@
 import itertools
 import numpy as np
+from shared_arrays import SharedArrayStore, attach, prefix_sums
+from tier_metrics import labels_from_tiers, tier_cut_imbalance
 
 def compute_cut_imbalance(tiers, weights):
-    total_cut_imbalance = 0
-    num_tiers = len(tiers)
-    for i in range(num_tiers):
-        for j in range(num_tiers):
-            if i != j:
-                w_ij = sum(weights[u][v] for u in tiers[i] for v in tiers[j])
-                w_ji = sum(weights[u][v] for u in tiers[j] for v in tiers[i])
-                if w_ij + w_ji > 0:
-                    total_cut_imbalance += abs(w_ij - w_ji) / (w_ij + w_ji)
-    return total_cut_imbalance / 2
-
-def enumerate_sequential_tier_splits(num_nodes, num_tiers, weights):
+    # Sum over unordered tier pairs, computed from the inter-tier flow matrix
+    weights = attach(weights)
+    labels = labels_from_tiers(tiers, len(weights))
+    return tier_cut_imbalance(weights, labels, len(tiers))
+
+def enumerate_sequential_tier_splits(num_nodes, num_tiers, weights, verbose=True, first_split=None):
+    # Weights may be a shared_arrays handle; first_split fixes the end of the first tier
+    weights = attach(weights)
     nodes = list(range(num_nodes))
     best_split = None
     best_cut_imbalance = float('-inf')
 
     # Generate all possible split points for the tiers
-    for split_points in itertools.combinations(range(1, num_nodes), num_tiers - 1):
+    if first_split is None:
+        all_split_points = itertools.combinations(range(1, num_nodes), num_tiers - 1)
+    else:
+        all_split_points = ((first_split,) + rest for rest in itertools.combinations(range(first_split + 1, num_nodes), num_tiers - 2))
+    for split_points in all_split_points:
         split_points = (0,) + split_points + (num_nodes,)
         tiers = [nodes[split_points[i]:split_points[i + 1]] for i in range(num_tiers)]
 
         cut_imbalance = compute_cut_imbalance(tiers, weights)
-        print(f"Split point:  {split_points}, cut imbalance: {cut_imbalance}")
+        if verbose:
+            print(f"Split point:  {split_points}, cut imbalance: {cut_imbalance}")
         if cut_imbalance > best_cut_imbalance:
             best_cut_imbalance = cut_imbalance
             best_split = tiers
 
     return best_split, best_cut_imbalance
 
+def enumerate_tier_splits_prefix(num_nodes, num_tiers, weights, prefix=None, batch_size=100_000):
+    """
+    Same result as enumerate_sequential_tier_splits, with the inter-tier flows of a whole
+    batch of split points read from the 2D prefix sums of the weights (O(K^2) per split
+    instead of a pass over the matrix).
+    """
+    weights = attach(weights)
+    prefix = attach(prefix) if prefix is not None else prefix_sums(weights)
+    nodes = list(range(num_nodes))
+    if num_tiers == 1:
+        # The only split is the empty one, with no inter-tier flow
+        return [nodes], 0.0
+    upper = [(k, l) for k in range(num_tiers) for l in range(k + 1, num_tiers)]
+    best_split = None
+    best_cut_imbalance = float('-inf')
+
+    def block(row_start, row_stop, col_start, col_stop):
+        return (prefix[row_stop, col_stop] - prefix[row_start, col_stop]
+                - prefix[row_stop, col_start] + prefix[row_start, col_start])
+
+    all_split_points = itertools.combinations(range(1, num_nodes), num_tiers - 1)
+    while True:
+        batch = np.array(list(itertools.islice(all_split_points, batch_size)), dtype=np.int64).reshape(-1, num_tiers - 1)
+        if len(batch) == 0:
+            break
+        bounds = np.column_stack((np.zeros(len(batch), dtype=np.int64), batch, np.full(len(batch), num_nodes)))
+        cut_imbalance = np.zeros(len(batch))
+        for k, l in upper:
+            forward = block(bounds[:, k], bounds[:, k + 1], bounds[:, l], bounds[:, l + 1])
+            backward = block(bounds[:, l], bounds[:, l + 1], bounds[:, k], bounds[:, k + 1])
+            total = forward + backward
+            cut_imbalance += np.divide(np.abs(forward - backward), total, out=np.zeros_like(total), where=total > 0)
+        best = int(np.argmax(cut_imbalance))
+        if cut_imbalance[best] > best_cut_imbalance:
+            best_cut_imbalance = float(cut_imbalance[best])
+            split_points = bounds[best].tolist()
+            best_split = [nodes[split_points[i]:split_points[i + 1]] for i in range(num_tiers)]
+
+    return best_split, best_cut_imbalance
+
+def enumerate_tier_splits_parallel(num_nodes, num_tiers, weights, max_workers=None):
+    """
+    enumerate_sequential_tier_splits sharded over a process pool by the end of the first
+    tier. The weights are published once in shared memory and every shard attaches them by handle.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    if num_tiers < 2 or num_nodes < num_tiers:
+        # Nothing to shard: a single tier, or too few nodes for any split
+        return enumerate_sequential_tier_splits(num_nodes, num_tiers, weights, verbose=False)
+    with SharedArrayStore() as store:
+        handle = store.publish(np.asarray(attach(weights), dtype=float))
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+            shards = [
+                executor.submit(enumerate_sequential_tier_splits, num_nodes, num_tiers, handle, False, first_split)
+                for first_split in range(1, num_nodes - num_tiers + 2)
+            ]
+            results = [shard.result() for shard in shards]
+    # Ties resolve to the earliest split, as in the sequential enumeration
+    return max(results, key=lambda result: result[1])
+
 def ensure_square_weights(weights):
+    weights = attach(weights)
     rows, cols = weights.shape
     if rows != cols:
         raise ValueError("Weight matrix must be square. Provided matrix has dimensions {}x{}.".format(rows, cols))
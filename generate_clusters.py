@@ -24,11 +24,12 @@ def generate_clusters_with_itertools(n, k):
     
     return clusters
 
-# Example usage:
-n = 15  # Numbers 1 to 15
-k = 4   # 4 clusters
-clusters = generate_clusters_with_itertools(n, k)
+if __name__ == "__main__":
+    # Example usage:
+    n = 15  # Numbers 1 to 15
+    k = 4   # 4 clusters
+    clusters = generate_clusters_with_itertools(n, k)
 
-# Print all the clusters
-for i, cluster_set in enumerate(clusters, 1):
-    print(f"Cluster Set {i}: {cluster_set}")
+    # Print all the clusters
+    for i, cluster_set in enumerate(clusters, 1):
+        print(f"Cluster Set {i}: {cluster_set}")
@@ -0,0 +1,127 @@
+import sys
+
+import numpy as np
+
+
+def _tournament_blocks(num_nodes, rng, bidirectional_prob, low, high, dtype, block_size):
+    """
+    Yield the arcs of a random tournament a block of rows at a time.
+    For every pair i < j the orientation is a fair coin flip, the arc gets a weight in
+    [low, high], and with probability `bidirectional_prob` the reverse arc is added too.
+
+    Yields:
+        tuple: (start, forward, backward) where forward[r, j] is the weight of arc (start + r) -> j
+        and backward[r, j] the weight of arc j -> (start + r), both zero outside j > start + r.
+    """
+    cols = np.arange(num_nodes)
+    for start in range(0, num_nodes, block_size):
+        stop = min(start + block_size, num_nodes)
+        shape = (stop - start, num_nodes)
+        upper = cols[None, :] > np.arange(start, stop)[:, None]
+
+        oriented = rng.random(shape) < 0.5
+        reverse = rng.random(shape) < bidirectional_prob
+        weight = rng.integers(low, high + 1, size=shape, dtype=dtype)
+        reverse_weight = rng.integers(low, high + 1, size=shape, dtype=dtype)
+
+        forward = np.where(oriented, weight, np.where(reverse, reverse_weight, 0)) * upper
+        backward = np.where(oriented, np.where(reverse, reverse_weight, 0), weight) * upper
+        yield start, forward.astype(dtype, copy=False), backward.astype(dtype, copy=False)
+
+
+def random_tournament_matrix(num_nodes, bidirectional_prob=0.25, low=1, high=10, seed=None,
+                             dtype=np.int16, as_sparse=False, block_size=None):
+    """
+    Generates the weight matrix of a random tournament, with some bidirectional arcs.
+
+    Parameters:
+    num_nodes (int): Number of nodes.
+    bidirectional_prob (float): Probability that a pair also gets the reverse arc.
+    low (int): Smallest arc weight.
+    high (int): Largest arc weight (inclusive).
+    seed (int | numpy.random.Generator | None): Seed or generator for reproducible graphs.
+    dtype (numpy.dtype): Element type of the matrix; small integers keep 10k-node graphs in memory.
+    as_sparse (bool): Return a scipy.sparse CSR matrix instead of a dense array.
+    block_size (int): Rows generated per batch (chosen to keep batches around 4M entries if None).
+
+    Returns:
+    numpy.ndarray | scipy.sparse.csr_matrix: Matrix where element (i, j) is the weight of arc i -> j.
+    """
+    rng = np.random.default_rng(seed)
+    if block_size is None:
+        block_size = max(1, (1 << 22) // max(num_nodes, 1))
+    blocks = _tournament_blocks(num_nodes, rng, bidirectional_prob, low, high, dtype, block_size)
+
+    if not as_sparse:
+        weights = np.zeros((num_nodes, num_nodes), dtype=dtype)
+        for start, forward, backward in blocks:
+            stop = start + forward.shape[0]
+            weights[start:stop, :] += forward
+            weights[:, start:stop] += backward.T
+        return weights
+
+    rows, cols, data = [], [], []
+    for start, forward, backward in blocks:
+        r, c = np.nonzero(forward)
+        rows.append(r + start)
+        cols.append(c)
+        data.append(forward[r, c])
+        r, c = np.nonzero(backward)
+        rows.append(c)
+        cols.append(r + start)
+        data.append(backward[r, c])
+
+    from scipy import sparse
+
+    if not rows:
+        return sparse.csr_matrix((num_nodes, num_nodes), dtype=dtype)
+    return sparse.csr_matrix(
+        (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(num_nodes, num_nodes),
+    )
+
+
+def random_complete_matrix(num_nodes, low=1, high=10, seed=None, dtype=np.int16):
+    """
+    Generates the weight matrix of a complete directed graph with random arc weights.
+
+    Parameters:
+    num_nodes (int): Number of nodes.
+    low (int): Smallest arc weight.
+    high (int): Largest arc weight (inclusive).
+    seed (int | numpy.random.Generator | None): Seed or generator for reproducible graphs.
+    dtype (numpy.dtype): Element type of the matrix.
+
+    Returns:
+    numpy.ndarray: Matrix where element (i, j) is the weight of arc i -> j, with a zero diagonal.
+    """
+    rng = np.random.default_rng(seed)
+    weights = rng.integers(low, high + 1, size=(num_nodes, num_nodes), dtype=dtype)
+    np.fill_diagonal(weights, 0)
+    return weights
+
+
+def is_sparse(weights):
+    """
+    Whether `weights` is a scipy.sparse matrix, without importing scipy: a sparse matrix can
+    only exist once scipy.sparse has been loaded.
+    """
+    sparse = sys.modules.get("scipy.sparse")
+    return sparse is not None and sparse.issparse(weights)
+
+
+def to_networkx(weights):
+    """
+    Converts a weight matrix into a networkx DiGraph, e.g. for plotting.
+
+    Parameters:
+    weights (numpy.ndarray | scipy.sparse matrix): Matrix where element (i, j) is the weight of arc i -> j.
+
+    Returns:
+    networkx.DiGraph: Graph with a `weight` attribute on every non-zero arc.
+    """
+    import networkx as nx
+
+    if is_sparse(weights):
+        return nx.from_scipy_sparse_array(weights, create_using=nx.DiGraph)
+    return nx.from_numpy_array(weights, create_using=nx.DiGraph)
@@ -0,0 +1,216 @@
+import contextlib
+import json
+import os
+import resource
+import threading
+import time
+
+# Phase kinds used to classify a run as build-, solve-, extract- or I/O-bound
+PHASE_KINDS = ("build", "solve", "extract", "io", "other")
+
+
+def current_rss():
+    """
+    Current resident set size in bytes (peak RSS where /proc is unavailable).
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _MemorySampler(threading.Thread):
+    """
+    Background thread recording the highest RSS seen until stopped.
+    """
+
+    def __init__(self, interval):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = current_rss()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.peak = max(self.peak, current_rss())
+        return self.peak
+
+
+class Instrumentation:
+    """
+    Lightweight timing and memory instrumentation for model build, solve and post-processing.
+    Wrap each phase in `phase()`, pass `gurobi_callback()` to `model.optimize` to follow the
+    node count, incumbent and bound over time, then write the record with `write_json` or
+    print `summary()`.
+
+    Parameters:
+    name (str): Name of the instrumented run.
+    sample_interval (float): Seconds between RSS samples during a phase (None disables sampling).
+    profile (bool): Collect a cProfile of every phase.
+    """
+
+    def __init__(self, name="run", sample_interval=0.05, profile=False):
+        self.name = name
+        self.sample_interval = sample_interval
+        self.phases = []
+        self.solver_log = []
+        self.metadata = {}
+        self._stack = []
+        self._profiler = None
+        if profile:
+            import cProfile
+
+            self._profiler = cProfile.Profile()
+
+    @contextlib.contextmanager
+    def phase(self, name, kind="other"):
+        """
+        Time a phase: wall time, CPU time, RSS before and after, and the peak RSS sampled
+        while it ran. Phases may nest; nested phases are recorded with their depth.
+        """
+        if kind not in PHASE_KINDS:
+            raise ValueError(f"Unknown phase kind: {kind}")
+        record = {"phase": name, "kind": kind, "depth": len(self._stack),
+                  "nested_in_kind": any(k != "other" for k in self._stack), "rss_before": current_rss()}
+        self.phases.append(record)
+        sampler = _MemorySampler(self.sample_interval) if self.sample_interval else None
+        if sampler is not None:
+            sampler.start()
+        if self._profiler is not None and not self._stack:
+            self._profiler.enable()
+
+        self._stack.append(kind)
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall_time"] = time.perf_counter() - wall_start
+            record["cpu_time"] = time.process_time() - cpu_start
+            self._stack.pop()
+            if self._profiler is not None and not self._stack:
+                self._profiler.disable()
+            record["rss_after"] = current_rss()
+            record["peak_rss"] = sampler.stop() if sampler is not None else max(record["rss_before"], record["rss_after"])
+
+    def gurobi_callback(self, min_interval=0.5):
+        """
+        Gurobi callback recording (time, node count, incumbent, bound) at most every
+        `min_interval` seconds, and at every new incumbent.
+
+        Returns:
+        callable: Callback to pass to model.optimize.
+        """
+        from gurobipy import GRB
+
+        start = time.perf_counter()
+        last = [-min_interval]
+
+        def callback(model, where):
+            if where == GRB.Callback.MIP:
+                now = time.perf_counter() - start
+                if now - last[0] < min_interval:
+                    return
+                last[0] = now
+                self.solver_log.append({
+                    "time": now,
+                    "event": "progress",
+                    "nodes": model.cbGet(GRB.Callback.MIP_NODCNT),
+                    "incumbent": model.cbGet(GRB.Callback.MIP_OBJBST),
+                    "bound": model.cbGet(GRB.Callback.MIP_OBJBND),
+                })
+            elif where == GRB.Callback.MIPSOL:
+                self.solver_log.append({
+                    "time": time.perf_counter() - start,
+                    "event": "incumbent",
+                    "nodes": model.cbGet(GRB.Callback.MIPSOL_NODCNT),
+                    "incumbent": model.cbGet(GRB.Callback.MIPSOL_OBJ),
+                    "bound": model.cbGet(GRB.Callback.MIPSOL_OBJBND),
+                })
+
+        return callback
+
+    def _finished(self):
+        return [record for record in self.phases if "wall_time" in record]
+
+    def bottleneck(self):
+        """
+        The phase kind with the most wall time ("build", "solve", "extract" or "io"), counting
+        the outermost phases of each kind, so "other" phases may wrap classified ones. "other"
+        if no phase is classified, None if nothing was recorded.
+        """
+        phases = self._finished()
+        totals = {}
+        for record in phases:
+            if record["kind"] != "other" and not record["nested_in_kind"]:
+                totals[record["kind"]] = totals.get(record["kind"], 0.0) + record["wall_time"]
+        if not totals:
+            return "other" if phases else None
+        return max(totals, key=totals.get)
+
+    def profile_stats(self, limit=25, sort="cumulative"):
+        """
+        The top `limit` functions of the cProfile capture as text (None if profiling is off).
+        """
+        if self._profiler is None:
+            return None
+        import io
+        import pstats
+
+        stream = io.StringIO()
+        pstats.Stats(self._profiler, stream=stream).sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def write_profile(self, path):
+        """
+        Dump the cProfile capture for snakeviz / pstats.
+        """
+        if self._profiler is not None:
+            self._profiler.dump_stats(path)
+
+    def report(self):
+        return {
+            "name": self.name,
+            "metadata": self.metadata,
+            "bottleneck": self.bottleneck(),
+            "phases": self.phases,
+            "solver_log": self.solver_log,
+        }
+
+    def write_json(self, path):
+        with open(path, "w") as file:
+            json.dump(self.report(), file, indent=2, default=str)
+
+    def summary(self):
+        """
+        Summary table of the phases, with each top-level phase's share of the total time.
+        """
+        phases = self._finished()
+        total = sum(r["wall_time"] for r in phases if r["depth"] == 0) or 1.0
+        lines = [f"{self.name}: bottleneck = {self.bottleneck()}",
+                 f"{'phase':<30} {'kind':<8} {'wall s':>9} {'cpu s':>9} {'share':>7} {'peak MB':>9} {'delta MB':>9}"]
+        for r in phases:
+            share = f"{100 * r['wall_time'] / total:.1f}%" if r["depth"] == 0 else ""
+            lines.append(
+                f"{'  ' * r['depth'] + r['phase']:<30} {r['kind']:<8} {r['wall_time']:>9.3f} {r['cpu_time']:>9.3f} "
+                f"{share:>7} {r['peak_rss'] / 2**20:>9.1f} {(r['rss_after'] - r['rss_before']) / 2**20:>9.1f}"
+            )
+        if self.solver_log:
+            last = self.solver_log[-1]
+            lines.append(f"solver: {len(self.solver_log)} samples, last at {last['time']:.2f}s: "
+                         f"nodes={last['nodes']:.0f} incumbent={last['incumbent']} bound={last['bound']}")
+        return "\n".join(lines)
+
+
+def maybe_phase(instrumentation, name, kind="other"):
+    """
+    instrumentation.phase(name, kind), or a no-op context when instrumentation is None.
+    """
+    if instrumentation is None:
+        return contextlib.nullcontext()
+    return instrumentation.phase(name, kind)
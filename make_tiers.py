@@ -1,18 +1,6 @@
-import gurobipy as gp
-from gurobipy import GRB
 import numpy as np
-
-# Define the parameters (example data; replace with real inputs)
-V = ["V1", "V2", "V3", "V4", "V5"]  # Set of vertices
-K = 3  # Number of clusters
-
-weights = np.array([
-    [0, 3, 1, 8, 7],
-    [2, 0, 9, 4, 2],
-    [8, 1, 0, 5, 2],
-    [3, 3, 2, 0, 3],
-    [1, 3, 1, 6, 7],
-])
+from solution_extraction import assignment_labels, variable_values
+from tier_metrics import cut_imbalance_from_flow, inter_tier_flow_from_arcs
 
 def convert_matrix_to_dict(weights):
     """
@@ -34,125 +22,207 @@ def convert_matrix_to_dict(weights):
                 weight_dict[edge] = weights[i, j]
 
     return weight_dict
-weights = convert_matrix_to_dict(weights)
-#weights = {("A", "B"): 3, ("B", "C"): 5, ("A", "C"): 2}  # Edge weights
-M = 1000  # Big M for linearization
-
-# Create the model
-model = gp.Model("Binary_Program")
-
-# Decision variables
-x = model.addVars(V, range(1, K+1), vtype=GRB.BINARY, name="x")  # Binary assignment to clusters
-z = model.addVars([(i, j, k, l) for (i, j) in weights.keys() for k in range(1, K+1) for l in range(1, K+1)], vtype=GRB.BINARY, name="z")  # Binary product variables
-g = model.addVars([(i, j, k, l) for (i, j) in weights.keys() for k in range(1, K+1) for l in range(1, K+1)], lb=0, vtype=GRB.CONTINUOUS, name="g")  # Auxiliary variables
-f = model.addVar(lb=0, vtype=GRB.CONTINUOUS, name="f")  # Objective variable
-p = model.addVar(lb=0, vtype=GRB.CONTINUOUS, name="p")  # Absolute value numerator
-
-# Objective function: maximize f
-model.setObjective(f, GRB.MAXIMIZE)
-
-# Constraint (13): Reformulated constraint for f
-model.addConstr(
-    gp.quicksum(weights[(i, j)] * g[i, j, k, l] for (i, j) in weights for k in range(1, K+1) for l in range(1, K+1)) == p,
-    "g_constraint"
-)
-
-# Linearization constraints for g = f * z
-for (i, j) in weights.keys():
-    for k in range(1, K+1):
-        for l in range(1, K+1):
-            #model.addConstr(g[i, j, k, l] <= f, f"g_ub1_{i}_{j}_{k}_{l}")
-            model.addConstr(g[i, j, k, l] <= M * z[i, j, k, l], f"g_ub2_{i}_{j}_{k}_{l}")
-            model.addConstr(g[i, j, k, l] >= f - M * (1 - z[i, j, k, l]), f"g_lb_{i}_{j}_{k}_{l}")
-            model.addConstr(g[i, j, k, l] >= 0, f"g_nonneg_{i}_{j}_{k}_{l}")
-
-# Assignment constraint (18)
-for v in V:
-    model.addConstr(gp.quicksum(x[v, k] for k in range(1, K+1)) == 1, f"assignment_{v}")
-
-
-# At least one node in each cluster
-for k in range(1, K+1):
-    model.addConstr(gp.quicksum(x[v, k] for v in V) >= 1, f"cluster_min_{k}")
-
-#Ranking constraints (25)
-for i in range(len(V)):
-    for j in range(i+1, len(V)):
-        vi, vj = V[i], V[j]
-        model.addConstr(
-            gp.quicksum(k * x[vi, k] for k in range(1, K+1)) <= gp.quicksum(k * x[vj, k] for k in range(1, K+1)),
-            f"ranking_{vi}_{vj}"
-        )
-
-# z constraints (22), (23), (24)
-for (i, j) in weights.keys():
+
+
+def build_tier_model(weights, V, K, M=1000):
+    """
+    Builds the binary program that assigns vertices to K ordered tiers maximizing cut imbalance.
+
+    Parameters:
+    weights (dict): A dictionary of edge weights keyed by vertex pairs.
+    V (list): List of vertices, in ranking order.
+    K (int): Number of clusters.
+    M (float): Big M for linearization.
+
+    Returns:
+    tuple: The Gurobi model, the assignment variables x and the objective variable f.
+    """
+    import gurobipy as gp
+    from gurobipy import GRB
+
+    # Create the model
+    model = gp.Model("Binary_Program")
+
+    # Decision variables
+    x = model.addVars(V, range(1, K+1), vtype=GRB.BINARY, name="x")  # Binary assignment to clusters
+    z = model.addVars([(i, j, k, l) for (i, j) in weights.keys() for k in range(1, K+1) for l in range(1, K+1)], vtype=GRB.BINARY, name="z")  # Binary product variables
+    g = model.addVars([(i, j, k, l) for (i, j) in weights.keys() for k in range(1, K+1) for l in range(1, K+1)], lb=0, vtype=GRB.CONTINUOUS, name="g")  # Auxiliary variables
+    f = model.addVar(lb=0, vtype=GRB.CONTINUOUS, name="f")  # Objective variable
+    p = model.addVar(lb=0, vtype=GRB.CONTINUOUS, name="p")  # Absolute value numerator
+
+    # Objective function: maximize f
+    model.setObjective(f, GRB.MAXIMIZE)
+
+    # Constraint (13): Reformulated constraint for f
+    model.addConstr(
+        gp.quicksum(weights[(i, j)] * g[i, j, k, l] for (i, j) in weights for k in range(1, K+1) for l in range(1, K+1)) == p,
+        "g_constraint"
+    )
+
+    # Linearization constraints for g = f * z
+    for (i, j) in weights.keys():
+        for k in range(1, K+1):
+            for l in range(1, K+1):
+                #model.addConstr(g[i, j, k, l] <= f, f"g_ub1_{i}_{j}_{k}_{l}")
+                model.addConstr(g[i, j, k, l] <= M * z[i, j, k, l], f"g_ub2_{i}_{j}_{k}_{l}")
+                model.addConstr(g[i, j, k, l] >= f - M * (1 - z[i, j, k, l]), f"g_lb_{i}_{j}_{k}_{l}")
+                model.addConstr(g[i, j, k, l] >= 0, f"g_nonneg_{i}_{j}_{k}_{l}")
+
+    # Assignment constraint (18)
+    for v in V:
+        model.addConstr(gp.quicksum(x[v, k] for k in range(1, K+1)) == 1, f"assignment_{v}")
+
+
+    # At least one node in each cluster
     for k in range(1, K+1):
-        for l in range(1, K+1):
-            model.addConstr(z[i, j, k, l] <= x[i, k], f"z_ub1_{i}_{j}_{k}_{l}")
-            model.addConstr(z[i, j, k, l] <= x[j, l], f"z_ub2_{i}_{j}_{k}_{l}")
-            model.addConstr(z[i, j, k, l] >= x[i, k] + x[j, l] - 1, f"z_lb_{i}_{j}_{k}_{l}")
+        model.addConstr(gp.quicksum(x[v, k] for v in V) >= 1, f"cluster_min_{k}")
+
+    #Ranking constraints (25)
+    for i in range(len(V)):
+        for j in range(i+1, len(V)):
+            vi, vj = V[i], V[j]
+            model.addConstr(
+                gp.quicksum(k * x[vi, k] for k in range(1, K+1)) <= gp.quicksum(k * x[vj, k] for k in range(1, K+1)),
+                f"ranking_{vi}_{vj}"
+            )
+
+    # z constraints (22), (23), (24)
+    for (i, j) in weights.keys():
+        for k in range(1, K+1):
+            for l in range(1, K+1):
+                model.addConstr(z[i, j, k, l] <= x[i, k], f"z_ub1_{i}_{j}_{k}_{l}")
+                model.addConstr(z[i, j, k, l] <= x[j, l], f"z_ub2_{i}_{j}_{k}_{l}")
+                model.addConstr(z[i, j, k, l] >= x[i, k] + x[j, l] - 1, f"z_lb_{i}_{j}_{k}_{l}")
 
-# Additional constraints (19) and (20) for absolute values
-X = gp.quicksum(weights[(i, j)] * z[i, j, k, l] for (i, j) in weights for k in range(1, K+1) for l in range(1, K+1))
-Y = gp.quicksum(weights[(j, i)] * z[i, j, k, l] for (i, j) in weights for k in range(1, K+1) for l in range(1, K+1))  # Modify Y if needed
-model.addConstr(p >= X - Y, "abs_val_pos")
-model.addConstr(p >= Y - X, "abs_val_neg")
-model.addConstr(p >= 0, "abs_val_nonneg")
+    # Additional constraints (19) and (20) for absolute values
+    X = gp.quicksum(weights[(i, j)] * z[i, j, k, l] for (i, j) in weights for k in range(1, K+1) for l in range(1, K+1))
+    Y = gp.quicksum(weights.get((j, i), 0) * z[i, j, k, l] for (i, j) in weights for k in range(1, K+1) for l in range(1, K+1))  # Modify Y if needed
+    model.addConstr(p >= X - Y, "abs_val_pos")
+    model.addConstr(p >= Y - X, "abs_val_neg")
+    model.addConstr(p >= 0, "abs_val_nonneg")
 
-# Solve the model
-model.display()
-model.write("model.lp")  # Saves the model in LP format
-model.optimize()
+    return model, x, f
 
 
-def calculate_cut_imbalance(weights, x, V, K):
+def cut_imbalance_from_assignment(weights, assignment, K):
     """
-    Calculate and print the total cut imbalance for the solution.
+    Calculate the total cut imbalance of a cluster assignment.
 
     Parameters:
     weights (dict): A dictionary of edge weights.
-    x (gurobipy.Var): Gurobi binary variable indicating node-cluster assignments.
+    assignment (dict): Cluster (1 to K) of every vertex.
+    K (int): Number of clusters.
+
+    Returns:
+    float: The total cut imbalance, summed over unordered cluster pairs.
+    """
+    vertices = list(assignment)
+    index = {v: position for position, v in enumerate(vertices)}
+    labels = np.fromiter(assignment.values(), dtype=np.int64, count=len(vertices)) - 1
+    edges = np.array([(index[i], index[j]) for i, j in weights.keys()], dtype=np.int64).reshape(-1, 2)
+    arc_weights = np.fromiter(weights.values(), dtype=float, count=len(edges))
+    flow = inter_tier_flow_from_arcs(labels[edges[:, 0]], labels[edges[:, 1]], arc_weights, K)
+    return cut_imbalance_from_flow(flow)
+
+
+def tier_assignment(model, x, V, K):
+    """
+    Cluster (1 to K) of every vertex, read from the assignment variables in one attribute query.
+
+    Parameters:
+    model (gurobipy.Model): The solved tier model.
+    x (gurobipy.tupledict): Assignment variables keyed by (vertex, cluster).
     V (list): List of vertices.
     K (int): Number of clusters.
+
+    Returns:
+    dict: Cluster of every vertex.
     """
-    # Initialize dictionaries to store weights between clusters
-    w_kl = { (k, l): 0 for k in range(1, K+1) for l in range(1, K+1) }
+    values = variable_values(model, [x[v, k] for v in V for k in range(1, K+1)], (len(V), K))
+    return dict(zip(V, (assignment_labels(values) + 1).tolist()))
 
-    # Calculate weights between clusters
-    for (i, j), w in weights.items():
-        for k in range(1, K+1):
-            for l in range(1, K+1):
-                if x[i, k].x > 0.5 and x[j, l].x > 0.5:  # If nodes are in clusters k and l
-                    w_kl[(k, l)] += w
 
-    # Calculate the total cut imbalance
-    total_cut_imbalance = 0
-    for k in range(1, K+1):
-        for l in range(k+1, K+1):  # Avoid double counting
-            w_kl_value = w_kl[(k, l)]
-            w_lk_value = w_kl[(l, k)]
-            total_weight = w_kl_value + w_lk_value
-            if total_weight > 0:
-                cut_imbalance = abs(w_kl_value - w_lk_value) / total_weight
-                total_cut_imbalance += cut_imbalance
+def calculate_cut_imbalance(weights, x, V, K, model=None):
+    """
+    Calculate and print the total cut imbalance for the solution.
+
+    Parameters:
+    weights (dict): A dictionary of edge weights.
+    x (gurobipy.Var): Gurobi binary variable indicating node-cluster assignments.
+    V (list): List of vertices.
+    K (int): Number of clusters.
+    model (gurobipy.Model): The solved model; when given, all assignments are read in one query.
+    """
+    if model is not None:
+        assignment = tier_assignment(model, x, V, K)
+    else:
+        assignment = {v: k for v in V for k in range(1, K+1) if x[v, k].x > 0.5}
+    total_cut_imbalance = cut_imbalance_from_assignment(weights, assignment, K)
 
     print(f"\nTotal Cut Imbalance: {total_cut_imbalance:.4f}")
     return total_cut_imbalance
 
 
-
-
-# Output the results
-if model.status == GRB.OPTIMAL:
-    print(f"Optimal f: {f.x}")
-    for v in V:
-        for k in range(1, K+1):
-            if x[v, k].x > 0.5:
+if __name__ == "__main__":
+    import argparse
+
+    from gurobipy import GRB
+
+    from instrumentation import Instrumentation
+
+    parser = argparse.ArgumentParser(description="Partition an example graph into tiers.")
+    parser.add_argument("--verbose", action="store_true", help="Print the model and every variable value")
+    parser.add_argument("--write-model", help="Save the model in LP format to this file")
+    parser.add_argument("--instrumentation", help="Write phase timings and solver progress to this JSON file")
+    parser.add_argument("--profile", help="Write a cProfile capture of the run to this file")
+    args = parser.parse_args()
+    instrumentation = Instrumentation("make_tiers", profile=bool(args.profile))
+
+    # Define the parameters (example data; replace with real inputs)
+    V = ["V1", "V2", "V3", "V4", "V5"]  # Set of vertices
+    K = 3  # Number of clusters
+
+    weights = np.array([
+        [0, 3, 1, 8, 7],
+        [2, 0, 9, 4, 2],
+        [8, 1, 0, 5, 2],
+        [3, 3, 2, 0, 3],
+        [1, 3, 1, 6, 7],
+    ])
+
+    weights = convert_matrix_to_dict(weights)
+    #weights = {("A", "B"): 3, ("B", "C"): 5, ("A", "C"): 2}  # Edge weights
+    M = 1000  # Big M for linearization
+
+    with instrumentation.phase("tier_build", "build"):
+        model, x, f = build_tier_model(weights, V, K, M)
+        model.update()
+
+    if args.verbose:
+        model.display()
+    if args.write_model:
+        with instrumentation.phase("write_model", "io"):
+            model.write(args.write_model)
+
+    # Solve the model
+    with instrumentation.phase("tier_optimize", "solve"):
+        model.optimize(instrumentation.gurobi_callback())
+
+    # Output the results
+    if model.status == GRB.OPTIMAL:
+        print(f"Optimal f: {f.x}")
+        with instrumentation.phase("tier_extract", "extract"):
+            for v, k in tier_assignment(model, x, V, K).items():
                 print(f"Vertex {v} assigned to cluster {k}")
-    for v in model.getVars():
-        print(f"{v.varName}: {v.x}")
-    
-    #model.display()
-
-    # Calculate and print the cut imbalance
-    calculate_cut_imbalance(weights, x, V, K)
+            if args.verbose:
+                for v in model.getVars():
+                    print(f"{v.varName}: {v.x}")
+
+            # Calculate and print the cut imbalance
+            calculate_cut_imbalance(weights, x, V, K, model)
+
+    print(instrumentation.summary())
+    if args.instrumentation:
+        instrumentation.write_json(args.instrumentation)
+    if args.profile:
+        instrumentation.write_profile(args.profile)
@@ -0,0 +1,423 @@
+import ast
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import textwrap
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+STATE_PATH = ".pipeline_state.json"
+REPORT_PATH = "pipeline_report.json"
+
+
+class Stage:
+    """
+    One step of the pipeline: `func(**inputs, **outputs, **params)` reads the input paths and
+    writes the output paths. A stage depends on the stages that produce its inputs.
+
+    Parameters:
+    name (str): Unique stage name.
+    func (callable): Module-level function (it runs in a worker process).
+    inputs (dict): Argument name -> input file or directory.
+    outputs (dict): Argument name -> output file or directory.
+    params (dict): Further JSON-serializable keyword arguments.
+    deps (iterable): Names of further modules the stage depends on. The modules `func`
+        imports are found from its source; the source of these and of every project module
+        they import, transitively, is part of the fingerprint, so editing them reruns the stage.
+    """
+
+    def __init__(self, name, func, inputs=None, outputs=None, params=None, deps=()):
+        self.name = name
+        self.func = func
+        self.inputs = dict(inputs or {})
+        self.outputs = dict(outputs or {})
+        self.params = dict(params or {})
+        self.deps = tuple(deps)
+
+    def __repr__(self):
+        return f"Stage({self.name!r})"
+
+
+def _hash_file(path, digest):
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+
+
+def content_hash(path, known=None, seen=None):
+    """
+    SHA-256 of a file, or of every file under a directory (relative paths included).
+    `known` maps (path, size, mtime) to earlier hashes so unchanged files are not re-read;
+    the keys looked up are added to the `seen` set.
+    """
+    if not os.path.exists(path):
+        return None
+    known = known if known is not None else {}
+    files = [path] if os.path.isfile(path) else sorted(
+        os.path.join(directory, name) for directory, _, names in os.walk(path) for name in names
+    )
+    digest = hashlib.sha256()
+    for file_path in files:
+        stat = os.stat(file_path)
+        key = f"{os.path.abspath(file_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        if key not in known:
+            file_digest = hashlib.sha256()
+            _hash_file(file_path, file_digest)
+            known[key] = file_digest.hexdigest()
+        if seen is not None:
+            seen.add(key)
+        digest.update(os.path.relpath(file_path, path).encode())
+        digest.update(known[key].encode())
+    return digest.hexdigest()
+
+
+def imported_modules(source):
+    """
+    Top-level names of the modules imported anywhere in Python source, function-local
+    imports included.
+    """
+    names = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.add(node.module.split(".")[0])
+    return names
+
+
+def module_closure(names, root):
+    """
+    Source files of the modules `names` and of every module they import, transitively, that
+    live in the `root` directory. Standard library and third-party modules are left out.
+    Modules are located without being imported.
+
+    Returns:
+    dict: Module name -> source file path.
+    """
+    root = os.path.abspath(root)
+    found = {}
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name in found:
+            continue
+        try:
+            spec = importlib.util.find_spec(name)
+        except (ImportError, ValueError):
+            continue
+        if spec is None or spec.origin is None or not os.path.isfile(spec.origin):
+            continue
+        if os.path.dirname(os.path.abspath(spec.origin)) != root:
+            continue
+        found[name] = spec.origin
+        with open(spec.origin, encoding="utf-8") as file:
+            pending.extend(imported_modules(file.read()))
+    return found
+
+
+def stage_fingerprint(stage, known=None, seen=None):
+    """
+    Fingerprint of everything that determines a stage's outputs: its code and the source of
+    the modules it depends on, its parameters and the content of its inputs.
+    """
+    try:
+        code = inspect.getsource(stage.func)
+        root = os.path.dirname(inspect.getsourcefile(stage.func))
+        deps = imported_modules(textwrap.dedent(code)) | set(stage.deps)
+    except (OSError, TypeError):
+        code = f"{stage.func.__module__}.{stage.func.__qualname__}"
+        root, deps = os.getcwd(), set(stage.deps)
+    modules = module_closure(deps, root)
+    payload = {
+        "code": hashlib.sha256(code.encode()).hexdigest(),
+        "deps": {name: content_hash(path, known, seen) for name, path in sorted(modules.items())},
+        "params": stage.params,
+        "inputs": {name: content_hash(path, known, seen) for name, path in sorted(stage.inputs.items())},
+        "outputs": sorted(stage.outputs.values()),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def plan_stages(stages):
+    """
+    Dependencies between stages, from the paths they produce and consume.
+
+    Returns:
+    dict: Stage name -> set of the stage names it depends on.
+    """
+    names = [stage.name for stage in stages]
+    if len(set(names)) != len(names):
+        raise ValueError("Stage names must be unique")
+    producers = {}
+    for stage in stages:
+        for path in stage.outputs.values():
+            if path in producers:
+                raise ValueError(f"{path} is produced by both {producers[path]} and {stage.name}")
+            producers[path] = stage.name
+    dependencies = {
+        stage.name: {producers[path] for path in stage.inputs.values() if path in producers}
+        for stage in stages
+    }
+
+    # Reject cycles up front
+    done, remaining = set(), dict(dependencies)
+    while remaining:
+        ready = [name for name, deps in remaining.items() if deps <= done]
+        if not ready:
+            raise ValueError(f"Stages form a cycle: {sorted(remaining)}")
+        for name in ready:
+            done.add(name)
+            del remaining[name]
+    return dependencies
+
+
+def _load_state(path):
+    if not os.path.exists(path):
+        return {"stages": {}, "files": {}}
+    with open(path) as file:
+        return json.load(file)
+
+
+def _write_json(data, path, **kwargs):
+    """
+    Write JSON to a temporary file next to `path` and move it into place, so a failure
+    never leaves a truncated file behind.
+    """
+    temporary = path + ".tmp"
+    with open(temporary, "w") as file:
+        json.dump(data, file, indent=2, **kwargs)
+    os.replace(temporary, path)
+
+
+def _save_state(state, path):
+    _write_json(state, path, sort_keys=True)
+
+
+def _run_stage(func, kwargs):
+    """
+    Run one stage in a worker process and time it.
+    """
+    import resource
+
+    start = time.perf_counter()
+    func(**kwargs)
+    return {
+        "wall_time": time.perf_counter() - start,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def run_pipeline(stages, max_workers=None, state_path=STATE_PATH, report_path=REPORT_PATH, force=()):
+    """
+    Run the stages in dependency order, skipping those whose fingerprint (code and module
+    dependencies, parameters, input content) matches the last successful run and whose outputs are unchanged.
+    Independent stages run concurrently in a process pool. Stages downstream of a failure
+    are not run.
+
+    Parameters:
+    stages (list): Stage objects.
+    max_workers (int): Worker processes (os.cpu_count() if None).
+    state_path (str): JSON file with the fingerprints of the last successful runs.
+    report_path (str): JSON timing report written at the end (None to skip).
+    force (iterable): Names of stages to rerun regardless of their fingerprint.
+
+    Returns:
+    list: One report record per stage: status ("ran", "skipped", "failed" or "blocked"),
+    wall time, queue time, peak RSS of the worker and fingerprint.
+    """
+    import multiprocessing
+
+    if os.path.dirname(state_path):
+        os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    by_name = {stage.name: stage for stage in stages}
+    dependencies = plan_stages(stages)
+    force = set(force)
+    state = _load_state(state_path)
+    known = state.setdefault("files", {})
+    # File hashes used by this run; the others are dropped from the state at the end
+    seen = set()
+    report = {}
+    pending = set(by_name)
+    running = {}
+    pipeline_start = time.perf_counter()
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        while pending or running:
+            for name in sorted(pending):
+                deps = dependencies[name]
+                if any(report.get(dep, {}).get("status") in ("failed", "blocked") for dep in deps):
+                    report[name] = {"stage": name, "status": "blocked"}
+                    pending.discard(name)
+                    continue
+                if not all(report.get(dep, {}).get("status") in ("ran", "skipped") for dep in deps):
+                    continue
+
+                stage = by_name[name]
+                pending.discard(name)
+                fingerprint = stage_fingerprint(stage, known, seen)
+                previous = state["stages"].get(name, {})
+                outputs = {path: content_hash(path, known, seen) for path in stage.outputs.values()}
+                if (name not in force and previous.get("fingerprint") == fingerprint
+                        and previous.get("outputs") == outputs and None not in outputs.values()):
+                    report[name] = {"stage": name, "status": "skipped", "fingerprint": fingerprint}
+                    continue
+
+                for path in stage.outputs.values():
+                    directory = os.path.dirname(path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                kwargs = {**stage.inputs, **stage.outputs, **stage.params}
+                future = executor.submit(_run_stage, stage.func, kwargs)
+                running[future] = (name, fingerprint, time.perf_counter())
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, fingerprint, submitted = running.pop(future)
+                stage = by_name[name]
+                record = {"stage": name, "fingerprint": fingerprint}
+                try:
+                    record.update(future.result())
+                    record["status"] = "ran"
+                    record["queue_time"] = max(0.0, time.perf_counter() - submitted - record["wall_time"])
+                    state["stages"][name] = {
+                        "fingerprint": fingerprint,
+                        "outputs": {path: content_hash(path, known, seen) for path in stage.outputs.values()},
+                        "finished_at": time.time(),
+                    }
+                    _save_state(state, state_path)
+                except Exception as e:
+                    record["status"] = "failed"
+                    record["error"] = f"{type(e).__name__}: {e}"
+                    print(f"Stage {name} failed: {record['error']}")
+                report[name] = record
+
+    records = [report[stage.name] for stage in stages]
+    state["files"] = {key: known[key] for key in seen}
+    _save_state(state, state_path)
+    if report_path is not None:
+        with open(report_path, "w") as file:
+            json.dump({"total_time": time.perf_counter() - pipeline_start, "stages": records}, file, indent=2)
+    return records
+
+
+def print_report(records):
+    print(f"{'stage':<32} {'status':<8} {'wall s':>9} {'queue s':>9} {'peak MB':>9}")
+    for record in records:
+        wall = f"{record['wall_time']:.2f}" if "wall_time" in record else "-"
+        queue = f"{record['queue_time']:.2f}" if "queue_time" in record else "-"
+        rss = f"{record['peak_rss_kb'] / 1024:.0f}" if "peak_rss_kb" in record else "-"
+        print(f"{record['stage']:<32} {record['status']:<8} {wall:>9} {queue:>9} {rss:>9}")
+
+
+# Stages of the ranking pipeline: faculty CSV -> Parquet dataset -> weight matrix -> ranking -> tiers
+
+def faculty_dataset_stage(faculty_csv, dataset):
+    from publication_store import convert_csv
+
+    convert_csv(faculty_csv, dataset)
+
+
+def collaboration_matrix_stage(dataset, matrix, first_year=None, last_year=None):
+    """
+    School -> school co-authorship matrix for a year window: entry (i, j) counts the distinct
+    articles of school i's faculty with a co-author at school j.
+    """
+    from affiliations import collaboration_matrix, collaboration_pairs
+    from citation_flow import write_adjacency_matrix
+    from publication_store import load_publications
+
+    articles = load_publications(dataset, columns=["School", "Article", "Author", "Year"],
+                                 years=(first_year, last_year))
+    schools = sorted(articles["School"].dropna().unique())
+    weights = collaboration_matrix(collaboration_pairs(articles, schools), len(schools))
+    write_adjacency_matrix(weights, schools, matrix)
+
+
+def ranking_stage(matrix, ranking, schools=None):
+    """
+    Solve B-FASP on the matrix (restricted to `schools` if given) and write the ranking JSON.
+    """
+    import pandas as pd
+
+    from run_bfasp import rank_schools
+
+    weights = pd.read_csv(matrix, index_col=0)
+    if schools is not None:
+        weights = weights.loc[weights.index.isin(schools), weights.columns.isin(schools)]
+
+    _write_json(rank_schools(weights.values, weights.index.tolist()), ranking)
+
+
+def tiers_stage(matrix, ranking, tiers, num_tiers=3):
+    """
+    Split the ranking into `num_tiers` contiguous tiers maximizing the cut imbalance.
+    """
+    import pandas as pd
+
+    from enumerate_tiers import enumerate_sequential_tier_splits
+
+    with open(ranking) as file:
+        order = json.load(file)["order"]
+    weights = pd.read_csv(matrix, index_col=0).loc[order, order].values.astype(float)
+    best_split, best_cut_imbalance = enumerate_sequential_tier_splits(len(order), num_tiers, weights, verbose=False)
+
+    _write_json({
+        "tiers": [[order[i] for i in tier] for tier in best_split],
+        "cut_imbalance": float(best_cut_imbalance),
+    }, tiers)
+
+
+def default_stages(faculty_csv="Non_Business_Faculty_Data.csv", windows=((None, None),), num_tiers=3,
+                   schools=None, output_dir="pipeline_output"):
+    """
+    The ranking pipeline for one or more year windows. The windows share the converted
+    dataset and are otherwise independent, so they run concurrently.
+    """
+    dataset = os.path.join(output_dir, "faculty_publications")
+    stages = [Stage("faculty_dataset", faculty_dataset_stage,
+                    inputs={"faculty_csv": faculty_csv}, outputs={"dataset": dataset})]
+    for first_year, last_year in windows:
+        window = f"{first_year or 'start'}_{last_year or 'end'}"
+        matrix = os.path.join(output_dir, f"Adjacency_Matrix_{window}.csv")
+        ranking = os.path.join(output_dir, f"ranking_{window}.json")
+        stages += [
+            Stage(f"matrix_{window}", collaboration_matrix_stage,
+                  inputs={"dataset": dataset}, outputs={"matrix": matrix},
+                  params={"first_year": first_year, "last_year": last_year}),
+            Stage(f"ranking_{window}", ranking_stage,
+                  inputs={"matrix": matrix}, outputs={"ranking": ranking}, params={"schools": schools}),
+            Stage(f"tiers_{window}", tiers_stage,
+                  inputs={"matrix": matrix, "ranking": ranking},
+                  outputs={"tiers": os.path.join(output_dir, f"tiers_{window}.json")},
+                  params={"num_tiers": num_tiers}),
+        ]
+    return stages
+
+
+def _parse_window(text):
+    first, _, last = text.partition("-")
+    return (int(first) if first else None, int(last) if last else None)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the ranking pipeline, skipping unchanged stages.")
+    parser.add_argument("--faculty", default="Non_Business_Faculty_Data.csv")
+    parser.add_argument("--windows", nargs="+", default=["-"], help="Year windows such as 1990-2024 or 2015-.")
+    parser.add_argument("--tiers", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output-dir", default="pipeline_output")
+    parser.add_argument("--force", nargs="*", default=(), help="Stages to rerun regardless of fingerprints.")
+    args = parser.parse_args()
+
+    stages = default_stages(args.faculty, [_parse_window(w) for w in args.windows], args.tiers,
+                            output_dir=args.output_dir)
+    print_report(run_pipeline(stages, max_workers=args.workers, force=args.force,
+                              state_path=os.path.join(args.output_dir, STATE_PATH),
+                              report_path=os.path.join(args.output_dir, REPORT_PATH)))
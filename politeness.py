@@ -0,0 +1,187 @@
+import asyncio
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: allows bursts of up to `capacity` requests and a sustained
+    `rate` requests per second, shared by every worker that holds a reference to it.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, jitter=0.0):
+        """
+        Take a token, returning how many seconds the caller must wait before using it.
+
+        Parameters:
+        jitter (float): Random extra wait as a fraction of the nominal interval. It is debited
+        from the bucket along with the token, so later reservations are pushed back by it too.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1 + (random.uniform(0, jitter) if jitter else 0.0)
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def set_rate(self, rate):
+        """
+        Change the rate. Tokens earned so far are credited at the old rate first, so no
+        reservation is computed with two different rates.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class AdaptiveRateLimiter:
+    """
+    Shared politeness layer for the scrapers: a token bucket whose rate adapts to the server.
+    Slow responses and errors halve the rate and trigger an exponential backoff; fast,
+    successful responses raise it again step by step up to `max_rate`.
+
+    Parameters:
+    rate (float): Starting requests per second.
+    max_rate (float): Upper bound for the rate.
+    min_rate (float): Lower bound for the rate.
+    capacity (int): Burst size of the token bucket.
+    target_latency (float): Responses slower than this many seconds count as a slowdown.
+    jitter (float): Random extra wait as a fraction of the nominal interval (0 disables it).
+    max_backoff (float): Cap on the backoff after consecutive failures, in seconds.
+    """
+
+    def __init__(self, rate=0.5, max_rate=None, min_rate=0.01, capacity=1, target_latency=5.0,
+                 jitter=0.0, max_backoff=600.0):
+        self.bucket = TokenBucket(rate, capacity)
+        self.max_rate = rate if max_rate is None else max_rate
+        self.min_rate = min_rate
+        self.target_latency = target_latency
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._blocked_until = 0.0
+        self.stats = {"requests": 0, "waited": 0.0, "slowdowns": 0, "failures": 0}
+
+    @property
+    def rate(self):
+        return self.bucket.rate
+
+    def _next_delay(self):
+        with self._lock:
+            blocked = max(0.0, self._blocked_until - time.monotonic())
+        delay = self.bucket.reserve(self.jitter) + blocked
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["waited"] += delay
+        return delay
+
+    def wait(self):
+        """
+        Block until the caller may send its next request.
+        """
+        delay = self._next_delay()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def wait_async(self):
+        """
+        Asyncio version of wait: suspends only the calling task.
+        """
+        delay = self._next_delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def record(self, latency, ok=True):
+        """
+        Report the outcome of a request so the rate can adapt.
+
+        Parameters:
+        latency (float): Seconds the request took.
+        ok (bool): False for errors, throttling responses (429/503) or captcha pages.
+        """
+        with self._lock:
+            if not ok:
+                self._failures += 1
+                self.stats["failures"] += 1
+                self.bucket.set_rate(max(self.min_rate, self.bucket.rate / 2))
+                backoff = min(self.max_backoff, (2 ** self._failures) * random.uniform(0.5, 1.0))
+                self._blocked_until = max(self._blocked_until, time.monotonic() + backoff)
+            elif latency > self.target_latency:
+                self._failures = 0
+                self.stats["slowdowns"] += 1
+                self.bucket.set_rate(max(self.min_rate, self.bucket.rate / 2))
+            else:
+                self._failures = 0
+                self.bucket.set_rate(min(self.max_rate, self.bucket.rate + 0.1 * self.max_rate))
+
+
+class rows_stable:
+    """
+    WebDriverWait condition: every element matching `locator` is present and the total number
+    of table rows inside them has not changed for `stable_for` seconds. Returns the elements,
+    or True as soon as an element matching `empty_locator` (the page's "no results" state)
+    is visible while nothing matches `locator`.
+    """
+
+    def __init__(self, locator, stable_for=1.0, empty_locator=None):
+        self.locator = locator
+        self.stable_for = stable_for
+        self.empty_locator = empty_locator
+        self._count = None
+        self._since = None
+
+    def __call__(self, driver):
+        elements = driver.find_elements(*self.locator)
+        if not elements:
+            if self.empty_locator is None:
+                return False
+            return any(element.is_displayed() for element in driver.find_elements(*self.empty_locator))
+        count = driver.execute_script(
+            "return arguments[0].reduce(function (n, t) { return n + t.getElementsByTagName('tr').length; }, 0);",
+            elements,
+        )
+        now = time.monotonic()
+        if count != self._count:
+            self._count = count
+            self._since = now
+            return False
+        return elements if now - self._since >= self.stable_for else False
+
+
+class options_loaded:
+    """
+    WebDriverWait condition: the <select> matching `locator` has at least `min_options` options.
+    Returns the select element.
+    """
+
+    def __init__(self, locator, min_options=2):
+        self.locator = locator
+        self.min_options = min_options
+
+    def __call__(self, driver):
+        elements = driver.find_elements(*self.locator)
+        if elements and len(elements[0].find_elements("tag name", "option")) >= self.min_options:
+            return elements[0]
+        return False
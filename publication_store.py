@@ -0,0 +1,226 @@
+import itertools
+import os
+import shutil
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
+
+# Columns of Non_Business_Faculty_Data.csv and the scraper outputs
+FACULTY_COLUMNS = ["School", "Journal", "Article", "Author", "Year", "Volume"]
+
+# Low-cardinality columns stored dictionary-encoded (categorical when loaded)
+DICTIONARY_COLUMNS = ["School", "Journal"]
+
+PARTITION_COLUMN = "Year"
+
+_PARTITIONING = ds.partitioning(pa.schema([(PARTITION_COLUMN, pa.int32())]), flavor="hive")
+
+
+def _prepare(batch):
+    """
+    Cast a record batch to the stored schema: dictionary-encoded School / Journal,
+    integer Year and string values elsewhere.
+    """
+    arrays, names = [], []
+    for name in batch.schema.names:
+        column = batch.column(name)
+        if name == PARTITION_COLUMN:
+            column = pc.cast(column, pa.int32())
+        elif name in DICTIONARY_COLUMNS:
+            column = pc.dictionary_encode(pc.cast(column, pa.string()))
+        else:
+            column = pc.cast(column, pa.string())
+        arrays.append(column)
+        names.append(name)
+    return pa.RecordBatch.from_arrays(arrays, names=names)
+
+
+def _write(batches, root, schema):
+    ds.write_dataset(
+        batches,
+        root,
+        schema=schema,
+        format="parquet",
+        partitioning=_PARTITIONING,
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        max_rows_per_group=256 * 1024,
+    )
+
+
+def _csv_batches(csv_path, block_size):
+    reader = pa_csv.open_csv(
+        csv_path,
+        read_options=pa_csv.ReadOptions(block_size=block_size),
+        # Author cells hold one line per author
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={name: pa.string() for name in FACULTY_COLUMNS if name != PARTITION_COLUMN}
+        ),
+    )
+    for batch in reader:
+        yield _prepare(batch)
+
+
+def convert_csv(csv_path, root, block_size=16 << 20):
+    """
+    Convert a faculty publication CSV into a Parquet dataset partitioned by year
+    (root/Year=2024/part-*.parquet). The CSV is streamed in blocks, so memory stays bounded
+    however large it grows. The dataset is written next to `root` and swapped into place,
+    so readers never see a half-written conversion.
+
+    Parameters:
+    csv_path (str): Source CSV with the FACULTY_COLUMNS.
+    root (str): Dataset directory (replaced if it exists).
+    block_size (int): Bytes of CSV parsed per batch.
+    """
+    batches = _csv_batches(csv_path, block_size)
+    first = next(batches)
+    staging = f"{root.rstrip(os.sep)}.tmp-{uuid.uuid4().hex}"
+    _write(itertools.chain([first], batches), staging, first.schema)
+
+    if os.path.exists(root):
+        retired = f"{root.rstrip(os.sep)}.old-{uuid.uuid4().hex}"
+        os.replace(root, retired)
+        os.replace(staging, root)
+        shutil.rmtree(retired)
+    else:
+        os.replace(staging, root)
+
+
+def append_publications(frame, root):
+    """
+    Add new rows (e.g. from a crawl) to the dataset as new part files in their year partitions.
+    """
+    if len(frame) == 0:
+        return
+    table = pa.Table.from_pandas(frame[FACULTY_COLUMNS], preserve_index=False)
+    batches = [_prepare(batch) for batch in table.to_batches()]
+    _write(batches, root, batches[0].schema)
+
+
+def _year_filter(years):
+    year = ds.field(PARTITION_COLUMN)
+    if isinstance(years, tuple):
+        first, last = years
+        expression = None
+        if first is not None:
+            expression = year >= first
+        if last is not None:
+            expression = year <= last if expression is None else expression & (year <= last)
+        return expression
+    return year.isin([int(y) for y in years])
+
+
+def load_publications(root, columns=None, years=None, schools=None):
+    """
+    Load faculty publication data from a dataset written by convert_csv, reading only the
+    requested columns and year partitions.
+
+    Parameters:
+    root (str): Dataset directory.
+    columns (list): Columns to load (all FACULTY_COLUMNS if None).
+    years (tuple or list): (first, last) inclusive year range, either end None for open,
+        or an explicit list of years. All years if None.
+    schools (list): Keep only rows of these schools (pushed down into the scan).
+
+    Returns:
+    pd.DataFrame: The rows, with School and Journal as categoricals.
+    """
+    dataset = ds.dataset(root, format="parquet", partitioning=_PARTITIONING)
+    expression = _year_filter(years) if years is not None else None
+    if schools is not None:
+        school_filter = ds.field("School").isin(list(schools))
+        expression = school_filter if expression is None else expression & school_filter
+
+    table = dataset.to_table(columns=columns or FACULTY_COLUMNS, filter=expression)
+    return table.to_pandas()
+
+
+def load_csv(csv_path, columns=None, years=None, schools=None):
+    """
+    The same query answered from the CSV, for comparison with load_publications.
+    """
+    columns = list(columns or FACULTY_COLUMNS)
+    # The filter columns are read even when they are not requested, as the dataset scan does
+    filters = ([PARTITION_COLUMN] if years is not None else []) + (["School"] if schools is not None else [])
+    frame = pd.read_csv(csv_path, usecols=columns + [name for name in filters if name not in columns])
+    if years is not None:
+        if isinstance(years, tuple):
+            first, last = years
+            mask = pd.Series(True, index=frame.index)
+            if first is not None:
+                mask &= frame[PARTITION_COLUMN] >= first
+            if last is not None:
+                mask &= frame[PARTITION_COLUMN] <= last
+        else:
+            mask = frame[PARTITION_COLUMN].isin(list(years))
+        frame = frame[mask]
+    if schools is not None:
+        frame = frame[frame["School"].isin(list(schools))]
+    return frame[columns].reset_index(drop=True)
+
+
+def _run_load(loader, path, columns, years):
+    """
+    Time one load in a fresh worker process, so its peak RSS belongs to this load alone.
+    """
+    import resource
+    import time
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    frame = loader(path, columns=columns, years=years)
+    wall_time = time.perf_counter() - start
+    return {
+        "rows": len(frame),
+        "wall_time": wall_time,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "rss_before_kb": rss_before,
+        "frame_mb": frame.memory_usage(deep=True).sum() / 1e6,
+    }
+
+
+def benchmark_loads(csv_path, root, columns=("School", "Author", "Year"), years=None, repeats=3):
+    """
+    Compare loading the ranking pipeline's columns from the CSV and from the Parquet dataset.
+    Each load runs in a fresh process forked from a small forkserver, so the peak RSS is not
+    inflated by this (converting) process.
+
+    Returns:
+    pd.DataFrame: One row per (source, repeat) with rows, wall time, peak RSS and frame size.
+    """
+    import multiprocessing
+
+    columns = list(columns) if columns is not None else None
+    context = multiprocessing.get_context("forkserver")
+    records = []
+    for source, loader, path in (("csv", load_csv, csv_path), ("parquet", load_publications, root)):
+        for repeat in range(repeats):
+            with context.Pool(processes=1, maxtasksperchild=1) as pool:
+                record = pool.apply(_run_load, (loader, path, columns, years))
+            records.append({"source": source, "repeat": repeat, **record})
+    return pd.DataFrame(records)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert faculty publication CSVs to a Parquet dataset.")
+    parser.add_argument("csv", nargs="?", default="Non_Business_Faculty_Data.csv")
+    parser.add_argument("--root", default="faculty_publications")
+    parser.add_argument("--benchmark", action="store_true", help="Compare CSV and Parquet load times.")
+    parser.add_argument("--years", nargs=2, type=int, metavar=("FIRST", "LAST"))
+    args = parser.parse_args()
+
+    convert_csv(args.csv, args.root)
+    print(f"Wrote {args.root}")
+    if args.benchmark:
+        years = tuple(args.years) if args.years else None
+        results = benchmark_loads(args.csv, args.root, years=years)
+        results["rss_growth_kb"] = results["peak_rss_kb"] - results["rss_before_kb"]
+        print(results.groupby("source")[["rows", "wall_time", "rss_growth_kb", "frame_mb"]].median())
@@ -0,0 +1,454 @@
+import json
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+# "subset" derives a subset ranking from the cached full-graph B-FASP ranking (see reranking).
+# Every ranking reports its method and `objective`, with `objective_type` saying what it measures:
+# the B-FASP optimum for "bfasp", the backward (strict feedback arc set) weight of the order
+# for "dominance" and "subset". Only "bfasp" rankings carry `optimal_value`.
+RANKING_METHODS = ("bfasp", "dominance", "subset")
+DEFAULT_PORT = 8765
+
+
+class ServiceBusy(Exception):
+    """
+    Raised when the solve queue is full; the HTTP server answers 503.
+    """
+
+
+def _backward_weight(weights, order):
+    permuted = weights[np.ix_(order, order)]
+    return float(np.tril(permuted, -1).sum())
+
+
+def _rank_task(weights, schools, method):
+    """
+    Rank one (sub)matrix in a worker process.
+    """
+    if method == "bfasp":
+        import gurobipy as gp
+
+        from run_bfasp import rank_schools
+
+        gp.setParam("OutputFlag", 0)
+        ranking = rank_schools(weights, schools)
+        return {**ranking, "method": method, "objective": ranking["optimal_value"], "objective_type": "bfasp",
+                "optimal": True}
+
+    from graph_generators import to_networkx
+    from recursive import recursive_dominance_ordering
+
+    weights = np.array(weights, dtype=float)
+    np.fill_diagonal(weights, 0)
+    order, _ = recursive_dominance_ordering(to_networkx(weights))
+    return {
+        "schools": list(schools),
+        "order": [schools[i] for i in order],
+        "weak_order": [[schools[i]] for i in order],
+        "method": method,
+        "objective": _backward_weight(weights, order),
+        "objective_type": "backward_weight",
+        "optimal": False,
+        "removed_arcs": [[schools[j], schools[i]] for a, i in enumerate(order) for j in order[a + 1:] if weights[j, i] > 0],
+    }
+
+
+def _subset_task(weights, full_order, subset, schools):
+    """
+    Re-rank a subset (indices into `weights`) from the full ordering in a worker process.
+    """
+    from reranking import rerank_subset
+
+    result = rerank_subset(weights, full_order, subset)
+    names = [schools[i] for i in result.pop("order")]
+    return {
+        "schools": sorted(names, key=schools.index),
+        "order": names,
+        "weak_order": [[name] for name in names],
+        "method": "subset",
+        "objective_type": "backward_weight",
+        **result,
+    }
+
+
+def _tier_task(weights, order, num_tiers):
+    """
+    Split a ranking (indices into `weights`) into contiguous tiers in a worker process.
+    """
+    from enumerate_tiers import enumerate_sequential_tier_splits
+
+    ordered = np.asarray(weights, dtype=float)[np.ix_(order, order)]
+    best_split, best_cut_imbalance = enumerate_sequential_tier_splits(len(order), num_tiers, ordered, verbose=False)
+    return best_split, float(best_cut_imbalance)
+
+
+def _copy_outcome(source, target):
+    """
+    Settle the placeholder future of a pending query with the outcome of its solve.
+    """
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache of query results.
+    """
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RankingService:
+    """
+    Keeps the school weights in memory and answers ranking and tiering queries over school
+    subsets and year windows. Solves run on a process pool; results are memoized in an LRU
+    keyed by the query, and identical queries arriving while one is solving share its result.
+
+    Parameters:
+    source (str): A publication dataset directory (see publication_store), which supports year
+        windows, or an adjacency matrix CSV such as Adjacency_Matrix.csv.
+    max_workers (int): Solver processes.
+    cache_size (int): Query results kept in the LRU.
+    max_pending (int): Solves allowed to queue before queries are refused with ServiceBusy.
+    """
+
+    def __init__(self, source, max_workers=None, cache_size=256, max_pending=64):
+        import pandas as pd
+
+        self.source = source
+        self.pairs = None
+        if os.path.isdir(source):
+            from affiliations import collaboration_pairs
+            from publication_store import load_publications
+
+            articles = load_publications(source, columns=["School", "Article", "Author", "Year"])
+            self.schools = sorted(articles["School"].dropna().unique())
+            self.pairs = collaboration_pairs(articles, self.schools)
+            self._weights = None
+        else:
+            matrix = pd.read_csv(source, index_col=0)
+            self.schools = matrix.index.tolist()
+            self._weights = matrix.loc[self.schools, self.schools].to_numpy(dtype=float)
+        self._index = {school: i for i, school in enumerate(self.schools)}
+
+        self.cache = LRUCache(cache_size)
+        self._matrices = LRUCache(cache_size)
+        self.max_pending = max_pending
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _subset(self, schools):
+        """
+        Names of a school subset in matrix order (all schools if None).
+        """
+        if schools is None:
+            return list(self.schools)
+        unknown = [school for school in schools if school not in self._index]
+        if unknown:
+            raise ValueError(f"Unknown schools: {unknown}")
+        return sorted(set(schools), key=self._index.get)
+
+    def matrix(self, schools=None, first_year=None, last_year=None):
+        """
+        Weight matrix of a school subset (all schools if None) over an inclusive year window.
+        Matrices are memoized per (subset, window), so a ranking and its tiers share one build.
+
+        Returns:
+        tuple: (numpy.ndarray weight matrix, list of school names in matrix order).
+        """
+        names = self._subset(schools)
+        key = (tuple(names), first_year, last_year)
+        cached = self._matrices.get(key)
+        if cached is not None:
+            return cached
+        if self.pairs is not None:
+            from affiliations import collaboration_matrix
+
+            weights = collaboration_matrix(self.pairs, len(self.schools), first_year, last_year).astype(float)
+        elif first_year is not None or last_year is not None:
+            raise ValueError("Year windows need a publication dataset source, not an adjacency matrix")
+        else:
+            weights = self._weights
+        if schools is not None:
+            indices = [self._index[school] for school in names]
+            weights = weights[np.ix_(indices, indices)]
+        self._matrices.put(key, (weights, names))
+        return weights, names
+
+    def _solve(self, key, func, make_args):
+        """
+        Cached result of a query, solving `func(*make_args())` on the pool on a miss.
+        Concurrent identical queries wait for the same solve. The cache and the pending solves
+        change together under the lock, so a query always finds one or the other; the solve's
+        arguments are built after its pending slot is reserved, outside the lock.
+        """
+        with self._lock:
+            result = self.cache.get(key)
+            if result is not None:
+                return result
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                if len(self._pending) >= self.max_pending:
+                    raise ServiceBusy(f"{len(self._pending)} solves already queued")
+                future = Future()
+                self._pending[key] = future
+        if owner:
+            try:
+                solve = self._executor.submit(func, *make_args())
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                solve.add_done_callback(lambda done: _copy_outcome(done, future))
+        try:
+            result = future.result()
+        except BaseException:
+            with self._lock:
+                if self._pending.get(key) is future:
+                    del self._pending[key]
+            raise
+        with self._lock:
+            self.cache.put(key, result)
+            if self._pending.get(key) is future:
+                del self._pending[key]
+        return result
+
+    def rank(self, schools=None, first_year=None, last_year=None, method="bfasp"):
+        """
+        Rank a school subset over a year window.
+
+        Returns:
+        dict: The schools, order and weak order, removed arcs, and the method with its
+        objective, objective type and whether the order is proven optimal ("bfasp" rankings
+        are run_bfasp.rank_schools output).
+        """
+        if method not in RANKING_METHODS:
+            raise ValueError(f"Unknown ranking method: {method}")
+        names = self._subset(schools)
+        key = ("rank", tuple(names), first_year, last_year, method)
+        if method == "subset":
+            full = self.rank(None, first_year, last_year, "bfasp")
+            full_order = [self._index[school] for school in full["order"]]
+            subset = [self._index[school] for school in names]
+            return self._solve(key, _subset_task, lambda: (
+                self.matrix(None, first_year, last_year)[0], full_order, subset, self.schools
+            ))
+        return self._solve(key, _rank_task, lambda: (*self.matrix(names, first_year, last_year), method))
+
+    def tiers(self, schools=None, first_year=None, last_year=None, num_tiers=3, method="bfasp"):
+        """
+        Rank a school subset over a year window, then split the ranking into contiguous tiers.
+
+        Returns:
+        dict: The tiers (lists of school names, best first) and their cut imbalance.
+        """
+        ranking = self.rank(schools, first_year, last_year, method)
+        names = self._subset(schools)
+        index = {school: i for i, school in enumerate(names)}
+        order = [index[school] for school in ranking["order"]]
+        key = ("tiers", tuple(names), first_year, last_year, method, num_tiers)
+        split, cut_imbalance = self._solve(
+            key, _tier_task, lambda: (self.matrix(names, first_year, last_year)[0], order, num_tiers)
+        )
+        return {
+            "tiers": [[ranking["order"][i] for i in tier] for tier in split],
+            "cut_imbalance": cut_imbalance,
+        }
+
+    def stats(self):
+        return {
+            "schools": len(self.schools),
+            "year_windows": self.pairs is not None,
+            "cached": len(self.cache),
+            "hits": self.cache.hits,
+            "misses": self.cache.misses,
+            "pending": len(self._pending),
+        }
+
+    def close(self):
+        self._executor.shutdown(cancel_futures=True)
+
+
+def _query_params(params):
+    """
+    Keyword arguments of RankingService.rank / tiers from query-string or JSON parameters.
+    Schools may be a list or a "|"-separated string.
+    """
+    schools = params.get("schools")
+    if isinstance(schools, str):
+        schools = [school for school in schools.split("|") if school]
+    query = {
+        "schools": schools or None,
+        "first_year": int(params["first_year"]) if params.get("first_year") not in (None, "") else None,
+        "last_year": int(params["last_year"]) if params.get("last_year") not in (None, "") else None,
+        "method": params.get("method", "bfasp"),
+    }
+    if "num_tiers" in params:
+        query["num_tiers"] = int(params["num_tiers"])
+    return query
+
+
+class RankingServer:
+    """
+    Local HTTP front end of a RankingService.
+
+    Endpoints (GET with query parameters or POST with a JSON body):
+    /rank: schools, first_year, last_year, method.
+    /tiers: the same plus num_tiers.
+    /stats: cache and queue counters.
+
+    Parameters:
+    service (RankingService): The service answering queries.
+    port (int): Port to listen on (0 picks a free port).
+    """
+
+    def __init__(self, service, port=DEFAULT_PORT):
+        self.service = service
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def _handler(self):
+        service = self.service
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+                self._answer(parsed.path, params)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    params = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError as e:
+                    self._send(400, {"error": f"Invalid JSON: {e}"})
+                    return
+                self._answer(urlparse(self.path).path, params)
+
+            def _answer(self, path, params):
+                try:
+                    if path == "/rank":
+                        query = _query_params(params)
+                        query.pop("num_tiers", None)
+                        self._send(200, service.rank(**query))
+                    elif path == "/tiers":
+                        self._send(200, service.tiers(**_query_params(params)))
+                    elif path == "/stats":
+                        self._send(200, service.stats())
+                    else:
+                        self._send(404, {"error": "not found"})
+                except ServiceBusy as e:
+                    self._send(503, {"error": str(e)})
+                except (ValueError, TypeError) as e:
+                    self._send(400, {"error": str(e)})
+                except Exception as e:
+                    self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def serve_forever(self):
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def query_service(url, endpoint, timeout=None, **params):
+    """
+    POST a query to a running RankingServer and return the decoded JSON answer.
+    Error answers raise urllib.error.HTTPError.
+    """
+    from urllib.request import Request, urlopen
+
+    request = Request(f"{url}/{endpoint.lstrip('/')}", data=json.dumps(params).encode("utf-8"),
+                      headers={"Content-Type": "application/json"}, method="POST")
+    with urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve ranking and tiering queries on localhost.")
+    parser.add_argument("--source", default="Adjacency_Matrix.csv",
+                        help="Adjacency matrix CSV or publication dataset directory (for year windows)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache-size", type=int, default=256)
+    args = parser.parse_args()
+
+    service = RankingService(args.source, max_workers=args.workers, cache_size=args.cache_size)
+    server = RankingServer(service, args.port)
+    print(f"Serving {len(service.schools)} schools on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
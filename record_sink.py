@@ -0,0 +1,140 @@
+import os
+import uuid
+from urllib.parse import quote, unquote
+
+import pandas as pd
+
+from table_extraction import ColumnarBuffer
+
+
+def partition_dir(root, partition_by, values):
+    """
+    Hive-style partition directory (e.g. root/School=Stanford%20University) for a key.
+    """
+    parts = [f"{column}={quote(str(value), safe='')}" for column, value in zip(partition_by, values)]
+    return os.path.join(root, *parts)
+
+
+class RecordSink:
+    """
+    Streams scraper records to disk. Records are buffered in column arrays per partition and
+    written out in batches as new part files, so memory stays bounded by `batch_size` rows
+    however long the crawl runs. Each part file is written under a temporary name and renamed
+    into place, so a crash leaves only complete files and a partial crawl is readable as is.
+
+    With `replace=True` the sink owns every partition it writes: the part files a partition
+    held before this sink first flushed it are deleted once its first new part file is in
+    place, so rewriting a whole partition (e.g. from a crawl checkpoint) does not duplicate
+    the rows of earlier runs.
+
+    Parameters:
+    root (str): Output directory.
+    columns (list): Columns of every record, including the partition columns.
+    partition_by (list): Columns whose values choose the partition directory.
+    batch_size (int): Buffered rows (across partitions) that trigger a flush.
+    format (str): "parquet" or "csv".
+    replace (bool): Replace the existing contents of every partition written.
+    """
+
+    def __init__(self, root, columns, partition_by=(), batch_size=50_000, format="parquet", replace=False):
+        if format not in ("parquet", "csv"):
+            raise ValueError(f"Unsupported format: {format}")
+        self.root = root
+        self.columns = list(columns)
+        self.partition_by = list(partition_by)
+        self.batch_size = batch_size
+        self.format = format
+        self.replace = replace
+        self._replaced = set()
+        self.data_columns = [c for c in self.columns if c not in self.partition_by]
+        self._buffers = {}
+        self._buffered = 0
+        self.rows_written = 0
+        os.makedirs(root, exist_ok=True)
+
+    def write(self, frame, **constants):
+        """
+        Buffer the rows of a DataFrame, with extra constant columns (e.g. School="...").
+        """
+        if len(frame) == 0:
+            return
+        frame = frame.assign(**constants) if constants else frame
+        for key, group in frame.groupby(self.partition_by, sort=False) if self.partition_by else [((), frame)]:
+            key = key if isinstance(key, tuple) else (key,)
+            buffer = self._buffers.setdefault(key, ColumnarBuffer(self.data_columns))
+            for column in self.data_columns:
+                buffer.data[column].extend(group[column].tolist())
+            self._buffered += len(group)
+
+        if self._buffered >= self.batch_size:
+            self.flush()
+
+    def write_records(self, records):
+        """
+        Buffer rows given as sequences of values in `columns` order.
+        """
+        self.write(pd.DataFrame.from_records(list(records), columns=self.columns))
+
+    def flush(self):
+        """
+        Write every non-empty partition buffer to a new part file, atomically.
+        """
+        for key, buffer in self._buffers.items():
+            if len(buffer) == 0:
+                continue
+            directory = partition_dir(self.root, self.partition_by, key)
+            os.makedirs(directory, exist_ok=True)
+            stale = []
+            if self.replace and key not in self._replaced:
+                stale = [name for name in os.listdir(directory) if name.startswith("part-")]
+                self._replaced.add(key)
+            path = os.path.join(directory, f"part-{uuid.uuid4().hex}.{self.format}")
+            temporary = path + ".tmp"
+
+            frame = buffer.to_frame()
+            if self.format == "parquet":
+                frame.to_parquet(temporary, index=False)
+            else:
+                frame.to_csv(temporary, index=False)
+            os.replace(temporary, path)
+            for name in stale:
+                os.remove(os.path.join(directory, name))
+
+            self.rows_written += len(buffer)
+            buffer.clear()
+        self._buffered = 0
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_sink(root, format="parquet", columns=None):
+    """
+    Read everything a RecordSink has written so far into one DataFrame, restoring the
+    partition columns from the directory names.
+    """
+    frames = []
+    for directory, _, files in os.walk(root):
+        parts = [f for f in sorted(files) if f.startswith("part-") and f.endswith("." + format)]
+        if not parts:
+            continue
+        partition = {}
+        for piece in os.path.relpath(directory, root).split(os.sep):
+            if "=" in piece:
+                column, value = piece.split("=", 1)
+                partition[column] = unquote(value)
+        for part in parts:
+            path = os.path.join(directory, part)
+            frame = pd.read_parquet(path) if format == "parquet" else pd.read_csv(path, dtype=str, keep_default_na=False)
+            frames.append(frame.assign(**partition))
+
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    frame = pd.concat(frames, ignore_index=True)
+    return frame[columns] if columns is not None else frame
@@ -1,118 +1,290 @@
-import networkx as nx
-import matplotlib.pyplot as plt
-import random
-import gurobipy as gp
-from gurobipy import GRB
-import networkx as nx
-import itertools
+import numpy as np
+from graph_generators import random_tournament_matrix, to_networkx
+from shared_arrays import attach
 
-def generate_tournament_graph(num_nodes):
+# Largest graph the bitmask DP will accept. At n = 25 its 2^n tables (float64 costs, uint8
+# last node and popcount) take ~ 320 MB, plus ~ 250 MB of temporaries for the largest layer
+# of subsets
+MAX_EXACT_NODES = 25
+
+def generate_tournament_graph(num_nodes, seed=None):
     """
     Generate a random tournament graph with `num_nodes` nodes.
-    Each pair of nodes has exactly one directed edge between them.
-    """
-    G = nx.DiGraph()
-    for i in range(num_nodes):
-        for j in range(i + 1, num_nodes):
-            if random.random() > 0.5:
-                G.add_edge(i, j, weight=random.randint(1, 10))
-                if random.random() > 0.75:
-                    G.add_edge(j, i, weight=random.randint(1, 10))
-            else:
-                G.add_edge(j, i, weight=random.randint(1, 10))
-                if random.random() > 0.75:
-                    G.add_edge(i, j, weight=random.randint(1, 10))
-    return G
-
-def solve_lp_relaxation(G):
-    """
-    Solve the LP relaxation of the B-FASP problem using Gurobi.
+    Each pair of nodes has one directed edge between them, and a reverse edge with probability 0.25.
+    """
+    return to_networkx(random_tournament_matrix(num_nodes, seed=seed))
+
+def solve_lp_relaxation(G, max_rounds=100, cuts_per_round=None, tol=1e-6, stats=None):
+    """
+    Solve the LP relaxation of the B-FASP problem using Gurobi with triangle cutting planes.
+    The model starts with only the ordering constraints; each round the most violated
+    transitivity constraints are found on the fractional solution and added in bulk, and
+    the LP is re-solved with dual simplex from the previous basis.
     Args:
-        G: A tournament graph (DiGraph) with weights on edges.
+        G: A tournament graph (DiGraph) with weights on edges, or a weight matrix (possibly a
+            shared_arrays handle) whose nodes are its indices.
+        max_rounds: Maximum number of separation rounds.
+        cuts_per_round: Maximum number of triangle constraints added per round (defaults to 10n).
+        tol: Violation tolerance below which a triangle is considered satisfied.
+        stats: Optional dict filled with the final model size ("num_vars", "num_constrs",
+            triangle cuts included, and "num_cuts") and the number of LP solves ("rounds").
     Returns:
         A tuple containing:
         - The relaxed objective value.
         - The fractional solution as a dictionary {(i, j): y_ij}.
     """
+    import gurobipy as gp
+    import networkx as nx
+    from gurobipy import GRB
+
+    if hasattr(G, "nodes"):
+        nodes = list(G.nodes)
+        weights = nx.to_numpy_array(G, nodelist=nodes, weight="weight")
+    else:
+        weights = np.asarray(attach(G), dtype=float)
+        nodes = list(range(weights.shape[0]))
+    n = len(nodes)
+    if cuts_per_round is None:
+        cuts_per_round = 10 * n
+
     model = gp.Model("B-FASP_LP")
+    model.Params.OutputFlag = 0
+    # Dual simplex re-optimizes from the previous basis after cuts are added
+    model.Params.Method = 1
 
-    # Create decision variables y_ij
-    y = {}
-    for u, v in G.edges():
-        y[u, v] = model.addVar(lb=0, ub=1, vtype=GRB.CONTINUOUS, name=f"y_{u}_{v}")
-        y[v, u] = model.addVar(lb=0, ub=1, vtype=GRB.CONTINUOUS, name=f"y_{v}_{u}")
+    # Create decision variables y_ij for every ordered pair
+    pairs = [(i, j) for i in range(n) for j in range(n) if i != j]
+    y = model.addVars(pairs, lb=0, ub=1, vtype=GRB.CONTINUOUS, name="y")
 
     # Objective: Minimize the total weight of removed arcs
     model.setObjective(
-        gp.quicksum(G[u][v]["weight"] * (1 - y[u, v]) for u, v in G.edges()), GRB.MINIMIZE
+        gp.quicksum(weights[i, j] * (1 - y[i, j]) for i, j in pairs if weights[i, j] != 0), GRB.MINIMIZE
     )
 
-    # Constraints
-    for u, v in G.edges():
-        # Ordering constraint: y_ij + y_ji = 1
-        model.addConstr(y[u, v] + y[v, u] == 1, f"ordering_{u}_{v}")
+    # Ordering constraints: y_ij + y_ji = 1
+    model.addConstrs((y[i, j] + y[j, i] == 1 for i, j in pairs if i < j), name="ordering")
+
+    y_vars = [y[i, j] for i, j in pairs]
+    rows, cols = np.array(pairs, dtype=int).reshape(-1, 2).T
+    y_matrix = np.zeros((n, n))
+    num_cuts = 0
+    rounds = 0
+
+    for _ in range(max_rounds):
+        model.optimize()
+        rounds += 1
+        if model.status != GRB.OPTIMAL:
+            raise Exception("Optimal solution not found!")
+
+        y_matrix[rows, cols] = model.getAttr("X", y_vars)
+        triangles = find_violated_triangles(y_matrix, tol=tol, max_cuts=cuts_per_round)
+        if len(triangles) == 0:
+            break
 
-    for i, j, k in itertools.permutations(G.nodes, 3):
         # Transitivity constraint: y_ij - y_ik - y_kj >= -1
-        model.addConstr(y[i, j] - y[i, k] - y[k, j] >= -1, f"transitivity_{i}_{j}_{k}")
+        model.addConstrs(
+            (y[i, j] - y[i, k] - y[k, j] >= -1 for i, j, k in triangles.tolist()), name="transitivity"
+        )
+        num_cuts += len(triangles)
 
-    # Solve the LP relaxation
-    model.optimize()
+    objective_value = model.objVal
+    if stats is not None:
+        model.update()
+        stats.update(num_vars=model.NumVars, num_constrs=model.NumConstrs, num_cuts=num_cuts, rounds=rounds)
+    solution = {(nodes[i], nodes[j]): y_matrix[i, j] for i, j in pairs}
+    return objective_value, solution
+
+
+def find_violated_triangles(y_matrix, tol=1e-6, max_cuts=None, block_size=None):
+    """
+    Find the transitivity constraints y_ij - y_ik - y_kj >= -1 violated by a fractional solution.
+    Violations y_ik + y_kj - y_ij - 1 are evaluated as an (i, k, j) tensor, a block of rows
+    of i at a time so memory stays bounded for large graphs.
+    Args:
+        y_matrix: Square matrix of fractional y_ij values with a zero diagonal.
+        tol: Violation tolerance below which a triangle is considered satisfied.
+        max_cuts: Return only the `max_cuts` most violated triangles (all of them if None).
+        block_size: Number of rows of i per block (chosen to keep blocks around 4M entries if None).
+    Returns:
+        An integer array of shape (m, 3) with the (i, j, k) indices, most violated first.
+    """
+    y_matrix = attach(y_matrix)
+    n = y_matrix.shape[0]
+    if block_size is None:
+        block_size = max(1, (1 << 22) // max(n * n, 1))
+
+    found = []
+    found_violation = []
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        # violation[i, k, j] = y_ik + y_kj - y_ij - 1
+        violation = (
+            y_matrix[start:stop, :, None]
+            + y_matrix[None, :, :]
+            - y_matrix[start:stop, None, :]
+            - 1
+        )
+        # Exclude the degenerate i == j triangles
+        local = np.arange(stop - start)
+        violation[local, :, start + local] = -np.inf
+        block_i, block_k, block_j = np.nonzero(violation > tol)
+        values = violation[block_i, block_k, block_j]
+        if max_cuts is not None and len(values) > max_cuts:
+            keep = np.argpartition(-values, max_cuts)[:max_cuts]
+            block_i, block_k, block_j, values = block_i[keep], block_k[keep], block_j[keep], values[keep]
+        found.append(np.column_stack((block_i + start, block_j, block_k)))
+        found_violation.append(values)
+
+    triangles = np.concatenate(found) if found else np.empty((0, 3), dtype=int)
+    violations = np.concatenate(found_violation) if found_violation else np.empty(0)
+    order = np.argsort(-violations, kind="stable")
+    if max_cuts is not None:
+        order = order[:max_cuts]
+    return triangles[order]
+
+
+def round_lp_solution(G, solution):
+    """
+    Round a fractional LP solution to a full ranking.
+    Each node is scored by the total fraction of pairs it is placed ahead in (sum_j y_ij),
+    and nodes are ranked by descending score.
+    Args:
+        G: A tournament graph (DiGraph) with weights on edges.
+        solution: The fractional solution as a dictionary {(i, j): y_ij}.
+    Returns:
+        A tuple containing:
+        - The ordering of nodes.
+        - The set of removed arcs for the feedback arc set.
+    """
+    score = {node: 0.0 for node in G.nodes}
+    for (u, v), value in solution.items():
+        score[u] += value
+    ordering = sorted(G.nodes, key=lambda node: -score[node])
+
+    # Identify backward arcs in the ordering
+    node_index = {node: idx for idx, node in enumerate(ordering)}
+    feedback_arc_set = {(u, v) for u, v in G.edges() if node_index[u] > node_index[v]}
+
+    return ordering, feedback_arc_set
 
-    if model.status == GRB.OPTIMAL:
-        objective_value = model.objVal
-        solution = {(u, v): y[u, v].X for u, v in y}
-        return objective_value, solution
-    else:
-        raise Exception("Optimal solution not found!")
 
 def enumerate_all_solutions(G):
     """
-    Enumerate all possible acyclic orderings of the graph to find the exact optimal solution.
-    Group edges by the cycle they are part of and only remove edges that exist in the graph.
+    Find the exact optimal acyclic ordering of the graph.
+    Delegates to the bitmask dynamic program in `solve_exact_fas_dp`, so graphs of up to
+    `MAX_EXACT_NODES` nodes can be solved instead of enumerating all n! permutations.
     Args:
         G: A tournament graph (DiGraph) with weights on edges.
     Returns:
         A tuple containing:
         - The exact objective value.
-        - The corresponding feedback arc set grouped by cycles.
+        - The corresponding feedback arc set (arcs pointing backwards in the optimal ordering).
     """
+    import networkx as nx
+
     nodes = list(G.nodes)
-    best_cost = float("inf")
-    best_feedback_set = None
-
-    # Enumerate all possible orderings
-    for perm in itertools.permutations(nodes):
-        # Create a copy of the graph and initialize the feedback set
-        graph_copy = G.copy()
-        feedback_set = set()
-
-        # Find all unique cycles and group edges
-        unique_cycles = find_unique_cycles_with_edges(graph_copy)
-        for cycle_edges in unique_cycles:
-            for u, v in cycle_edges:
-                # Only remove edges that actually exist in the graph
-                if graph_copy.has_edge(u, v) and perm.index(u) > perm.index(v):  # Backward edge
-                    feedback_set.add((u, v))
-                    graph_copy.remove_edge(u, v)
-
-        # Check if the resulting graph is acyclic
-        if is_acyclic(graph_copy):
-            # Calculate the cost of removing the feedback arcs
-            cost = sum(G[u][v]["weight"] for u, v in feedback_set)
-
-            # Update best solution if this is better
-            if cost < best_cost:
-                best_cost = cost
-                best_feedback_set = feedback_set
+    weights = nx.to_numpy_array(G, nodelist=nodes, weight="weight")
+
+    best_cost, order = solve_exact_fas_dp(weights)
+    ordering = [nodes[i] for i in order]
+
+    # Identify backward arcs in the optimal ordering
+    node_index = {node: idx for idx, node in enumerate(ordering)}
+    best_feedback_set = {(u, v) for u, v in G.edges() if node_index[u] > node_index[v]}
 
     return best_cost, best_feedback_set
 
 
+def _subset_weight_tables(weights):
+    """
+    Precompute, for every node v, the total weight of arcs from v into any subset of nodes.
+    The subset bitmask is split into a low and a high half so each table has only
+    2^(n/2) entries per node; the weight into subset S is `low[v, S & low_mask] + high[v, S >> half]`.
+    Args:
+        weights: Square weight matrix (numpy.ndarray), weights[i, j] is the weight of arc i -> j.
+    Returns:
+        A tuple (low, high, half) with the two lookup tables and the bit position of the split.
+    """
+    n = weights.shape[0]
+    half = n // 2
+    low = np.zeros((n, 1 << half))
+    high = np.zeros((n, 1 << (n - half)))
+
+    # Build each table one bit at a time: table[:, mask | bit] = table[:, mask] + weights[:, node]
+    for bit in range(half):
+        low[:, 1 << bit:2 << bit] = low[:, :1 << bit] + weights[:, [bit]]
+    for bit in range(n - half):
+        high[:, 1 << bit:2 << bit] = high[:, :1 << bit] + weights[:, [half + bit]]
+
+    return low, high, half
+
+
+def solve_exact_fas_dp(weights, max_nodes=MAX_EXACT_NODES):
+    """
+    Solve the weighted feedback arc set problem exactly with a Held-Karp style
+    dynamic program over node subsets in O(2^n * n) time.
+    best[S] is the minimum weight of backward arcs when the nodes of S fill the first |S|
+    positions of the ordering; appending v after S makes every arc from v into S backward.
+    Args:
+        weights: Square weight matrix (numpy.ndarray or shared_arrays handle), weights[i, j] is the weight of arc i -> j.
+        max_nodes: Refuse graphs larger than this, since memory grows as 2^n.
+    Returns:
+        A tuple containing:
+        - The exact objective value (total weight of backward arcs).
+        - The optimal ordering as a list of node indices, best ranked first.
+    """
+    weights = np.asarray(attach(weights), dtype=float)
+    n = weights.shape[0]
+    if weights.shape != (n, n):
+        raise ValueError("Weight matrix must be square. Provided matrix has dimensions {}x{}.".format(*weights.shape))
+    if n > max_nodes:
+        raise ValueError(f"Exact DP is limited to {max_nodes} nodes, got {n}.")
+    if n == 0:
+        return 0.0, []
+
+    weights = weights.copy()
+    np.fill_diagonal(weights, 0)
+    low, high, half = _subset_weight_tables(weights)
+    low_mask = (1 << half) - 1
+
+    num_subsets = 1 << n
+    best = np.full(num_subsets, np.inf)
+    best[0] = 0.0
+    last_node = np.zeros(num_subsets, dtype=np.uint8)
+
+    # Group subsets by size so every layer only depends on the previous one
+    popcount = np.zeros(num_subsets, dtype=np.uint8)
+    for bit in range(n):
+        popcount[1 << bit:2 << bit] = popcount[:1 << bit] + 1
+
+    for size in range(1, n + 1):
+        masks = np.flatnonzero(popcount == size)
+        for v in range(n):
+            subset = masks[(masks >> v) & 1 == 1]
+            prev = subset ^ (1 << v)
+            candidate = best[prev] + low[v, prev & low_mask] + high[v, prev >> half]
+            improved = candidate < best[subset]
+            best[subset[improved]] = candidate[improved]
+            last_node[subset[improved]] = v
+
+    # Walk back from the full set to recover the ordering
+    order = []
+    mask = num_subsets - 1
+    while mask:
+        v = int(last_node[mask])
+        order.append(v)
+        mask ^= 1 << v
+    order.reverse()
+
+    return float(best[num_subsets - 1]), order
+
+
 def is_acyclic(graph):
     """
     Check if the graph is acyclic.
     """
+    import networkx as nx
+
     try:
         nx.find_cycle(graph, orientation="original")
         return False
@@ -127,6 +299,8 @@ def find_unique_cycles_with_edges(graph):
     Returns:
         A list of unique cycles, where each cycle is represented as a list of edges.
     """
+    import networkx as nx
+
     unique_cycles = set()
     try:
         # Find all simple cycles using networkx's built-in function
@@ -147,12 +321,15 @@ def recursive_dominance_ordering(G):
     """
     Implement the recursive dominance ordering approach for tournament graphs.
     Args:
-        G: A tournament graph (DiGraph) with weights on edges.
+        G: A tournament graph (DiGraph) with weights on edges, or a weight matrix (possibly a
+            shared_arrays handle).
     Returns:
         A tuple containing:
         - The ordering of nodes.
         - The set of removed arcs for the feedback arc set.
     """
+    if not hasattr(G, "nodes"):
+        G = to_networkx(attach(G))
     feedback_arc_set = set()
     ordering = []
 
@@ -178,6 +355,9 @@ def plot_tournament_graph(G, title="Tournament Graph"):
     """
     Plot the given tournament graph.
     """
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
     pos = nx.circular_layout(G)  # Layout for better visualization of tournaments
     edge_labels = nx.get_edge_attributes(G, 'weight')
     nx.draw(G, pos, with_labels=True, node_color="lightblue", node_size=2000, font_size=15, font_weight="bold")
@@ -198,18 +378,15 @@ def main():
     print("Solving LP relaxation...")
     lp_value, lp_solution = solve_lp_relaxation(tournament_graph)
     print("LP Objective Value:", lp_value)
+    lp_ordering, lp_feedback_set = round_lp_solution(tournament_graph, lp_solution)
+    print("LP Rounded Cost:", sum(tournament_graph[u][v]["weight"] for u, v in lp_feedback_set))
 
-    # Enumerate all solutions for exact optimal
-    print("Enumerating all possible solutions...")
-    cycles = find_unique_cycles_with_edges(tournament_graph)
-    exact_value, exact_feedback_set = enumerate_all_solutions(tournament_graph)
-    print("Exact Objective Value:", exact_value)
-    print("Exact Feedback Arc Set:", exact_feedback_set)
-
-if __name__ == "__main__":
-    main()
-
-
+    # Solve exactly with the subset DP when the graph is small enough
+    if num_nodes <= MAX_EXACT_NODES:
+        print("Solving exactly with the subset DP...")
+        exact_value, exact_feedback_set = enumerate_all_solutions(tournament_graph)
+        print("Exact Objective Value:", exact_value)
+        print("Exact Feedback Arc Set:", exact_feedback_set)
 
     # Apply the recursive dominance ordering algorithm
     ordering, feedback_arc_set = recursive_dominance_ordering(tournament_graph)
@@ -224,3 +401,7 @@ if __name__ == "__main__":
 
     # Plot the resulting acyclic graph after removing the feedback arc set
     plot_tournament_graph(feedback_graph, title="Acyclic Graph After Removing Feedback Arc Set")
+
+
+if __name__ == "__main__":
+    main()
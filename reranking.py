@@ -0,0 +1,435 @@
+import time
+
+import numpy as np
+
+from graph_generators import is_sparse
+from recursive import MAX_EXACT_NODES, find_violated_triangles, solve_exact_fas_dp
+
+
+def backward_weight(weights, order):
+    """
+    Total weight of arcs pointing backwards in an ordering of the nodes (best ranked first).
+    """
+    order = np.asarray(order, dtype=np.int64)
+    return float(np.tril(weights[np.ix_(order, order)], -1).sum())
+
+
+def induced_order(order, subset):
+    """
+    The nodes of `subset` in the sequence they have in `order`.
+
+    Parameters:
+    order (list): Ordering of all nodes (indices), best ranked first.
+    subset (list): Node indices to keep; every one must appear in `order`.
+
+    Returns:
+    numpy.ndarray: The subset nodes, best ranked first.
+    """
+    order = np.asarray(order, dtype=np.int64)
+    return order[np.isin(order, np.asarray(subset, dtype=np.int64))]
+
+
+def sift(weights, order, max_passes=20, tol=1e-9, nodes=None):
+    """
+    Local repair of an ordering by sifting: every node in turn is taken out and reinserted
+    at the position that minimizes the backward weight, until a full pass improves nothing.
+    The cost of every insertion position of a node is one cumulative sum, so a pass over n
+    nodes costs O(n^2).
+
+    Parameters:
+    weights (numpy.ndarray): Square weight matrix, weights[i, j] is the weight of arc i -> j.
+    order (list): Starting ordering of node indices, best ranked first.
+    max_passes (int): Maximum number of passes over the nodes.
+    tol (float): Minimum improvement for a move to be made.
+    nodes (list): Move only these nodes (all of them if None).
+
+    Returns:
+    tuple: (repaired ordering as a numpy.ndarray, its backward weight, number of passes made).
+    """
+    order = np.asarray(order, dtype=np.int64).copy()
+    passes = 0
+    for passes in range(1, max_passes + 1):
+        improved = False
+        for v in (order.copy() if nodes is None else nodes):
+            position = int(np.flatnonzero(order == v)[0])
+            rest = np.delete(order, position)
+            # cost[t]: backward weight of v's arcs when v is inserted before rest[t]
+            out_weights, in_weights = weights[v, rest], weights[rest, v]
+            cost = in_weights.sum() + np.concatenate(([0.0], np.cumsum(out_weights - in_weights)))
+            best = int(np.argmin(cost))
+            if cost[best] < cost[position] - tol:
+                order = np.insert(rest, best, v)
+                improved = True
+        if not improved:
+            break
+    return order, backward_weight(weights, order), passes
+
+
+def lp_bound(weights):
+    """
+    Lower bound on the backward weight of any ordering: the LP relaxation with triangle cuts.
+    """
+    from graph_generators import to_networkx
+    from recursive import solve_lp_relaxation
+
+    value, _ = solve_lp_relaxation(to_networkx(np.asarray(weights, dtype=float)))
+    return float(value)
+
+
+def solve_ordering_mip(weights, start_order=None, time_limit=None, max_rounds=50):
+    """
+    Exact minimum backward weight ordering by a binary program with lazily added triangle
+    constraints, warm started from `start_order`. Each round the integer solution is checked
+    for intransitive triangles, which are added before re-solving.
+
+    Parameters:
+    weights (numpy.ndarray): Square weight matrix.
+    start_order (list): Ordering used as the MIP start.
+    time_limit (float): Seconds per round (None for no limit).
+    max_rounds (int): Maximum number of separation rounds.
+
+    Returns:
+    tuple: (backward weight, ordering, whether the ordering is proven optimal). If no proven
+    transitive solution is found, the start ordering is returned unproven.
+    """
+    import gurobipy as gp
+    from gurobipy import GRB
+
+    weights = np.asarray(weights, dtype=float)
+    n = weights.shape[0]
+    pairs = [(i, j) for i in range(n) for j in range(n) if i != j]
+    rows, cols = np.array(pairs, dtype=np.int64).reshape(-1, 2).T
+
+    model = gp.Model("ordering")
+    model.Params.OutputFlag = 0
+    if time_limit is not None:
+        model.Params.TimeLimit = time_limit
+    y = model.addVars(pairs, vtype=GRB.BINARY, name="y")
+    model.setObjective(
+        gp.quicksum(weights[i, j] * (1 - y[i, j]) for i, j in pairs if weights[i, j] != 0), GRB.MINIMIZE
+    )
+    model.addConstrs((y[i, j] + y[j, i] == 1 for i, j in pairs if i < j), name="ordering")
+    y_vars = [y[i, j] for i, j in pairs]
+
+    start = None
+    if start_order is not None:
+        position = np.empty(n, dtype=np.int64)
+        position[np.asarray(start_order, dtype=np.int64)] = np.arange(n)
+        start = (position[rows] < position[cols]).astype(float).tolist()
+
+    y_matrix = np.zeros((n, n))
+    for _ in range(max_rounds):
+        if start is not None:
+            model.setAttr("Start", y_vars, start)
+        model.optimize()
+        if model.SolCount == 0:
+            break
+        y_matrix[rows, cols] = np.round(model.getAttr("X", y_vars))
+        triangles = find_violated_triangles(y_matrix, tol=0.5, max_cuts=10 * n)
+        if len(triangles) == 0:
+            order = np.argsort(-y_matrix.sum(axis=1), kind="stable")
+            return backward_weight(weights, order), order, model.status == GRB.OPTIMAL
+        model.addConstrs(
+            (y[i, j] - y[i, k] - y[k, j] >= -1 for i, j, k in triangles.tolist()), name="transitivity"
+        )
+
+    order = np.asarray(start_order if start_order is not None else np.arange(n), dtype=np.int64)
+    return backward_weight(weights, order), order, False
+
+
+def rerank_subset(weights, full_order, subset, exact=False, bound=True, time_limit=None, max_passes=20):
+    """
+    Rank a subset of nodes from an ordering of the full graph: the induced ordering is the
+    warm start, sifting repairs it, and optionally the subset is solved exactly (by DP when
+    it is small, else by the warm-started MIP).
+
+    Parameters:
+    weights (numpy.ndarray): Weight matrix of the full graph.
+    full_order (list): Ordering of all nodes, best ranked first.
+    subset (list): Node indices to rank.
+    exact (bool): Solve the subset exactly after the repair.
+    bound (bool): Compute the subset's LP bound and the gap of the result to it.
+    time_limit (float): Seconds per MIP round of the exact solve.
+    max_passes (int): Maximum sifting passes.
+
+    Returns:
+    dict: The subset ordering (node indices), its backward weight, the warm-start and repaired
+    weights, the bound and gap if requested, whether the ordering is proven optimal, and timings.
+    """
+    start = time.perf_counter()
+    nodes = induced_order(full_order, subset)
+    sub_weights = np.asarray(weights, dtype=float)[np.ix_(nodes, nodes)].copy()
+    np.fill_diagonal(sub_weights, 0)
+    local = np.arange(len(nodes))
+
+    result = {"warm_start_objective": backward_weight(sub_weights, local)}
+    repaired, objective, passes = sift(sub_weights, local, max_passes)
+    result.update(repaired_objective=objective, sift_passes=passes, repair_time=time.perf_counter() - start)
+    order, optimal = repaired, False
+
+    if exact:
+        solve_start = time.perf_counter()
+        if len(nodes) <= MAX_EXACT_NODES:
+            objective, order = solve_exact_fas_dp(sub_weights)
+            optimal = True
+        else:
+            objective, order, optimal = solve_ordering_mip(sub_weights, repaired, time_limit)
+        result["exact_time"] = time.perf_counter() - solve_start
+
+    result.update(order=nodes[np.asarray(order, dtype=np.int64)].tolist(), objective=objective, optimal=optimal)
+    if bound:
+        bound_start = time.perf_counter()
+        result["bound"] = lp_bound(sub_weights)
+        result["gap"] = (objective - result["bound"]) / max(abs(objective), 1e-9)
+        # An ordering that meets the LP bound is optimal
+        result["optimal"] = optimal or result["gap"] <= 1e-9
+        result["bound_time"] = time.perf_counter() - bound_start
+    result["total_time"] = time.perf_counter() - start
+    return result
+
+
+class SubsetRanker:
+    """
+    Ranks many subsets of one graph from a single full-graph ordering, computed once and cached.
+
+    Parameters:
+    weights (numpy.ndarray): Weight matrix of the full graph.
+    names (list): Node names (defaults to the indices).
+    full_order (list): Ordering of all nodes (indices or names), best first. If None, the full
+        graph is solved once with B-FASP and the ordering is repaired by sifting.
+    """
+
+    def __init__(self, weights, names=None, full_order=None):
+        self.weights = np.array(weights, dtype=float)
+        np.fill_diagonal(self.weights, 0)
+        self.names = list(names) if names is not None else list(range(self.weights.shape[0]))
+        self._index = {name: i for i, name in enumerate(self.names)}
+        if full_order is None:
+            from run_bfasp import solve_bfasp
+
+            solution = solve_bfasp(self.weights)
+            full_order = np.argsort(-solution["ranking_matrix"].sum(axis=1), kind="stable")
+            full_order, _, _ = sift(self.weights, full_order)
+        elif names is not None:
+            full_order = [self._index[name] for name in full_order]
+        self.full_order = np.asarray(full_order, dtype=np.int64)
+
+    @classmethod
+    def from_ranking(cls, matrix_path, ranking_path):
+        """
+        Ranker over an adjacency matrix CSV and a ranking JSON written by
+        pipeline.ranking_stage (or run_bfasp.rank_schools), so the full graph is not re-solved.
+        """
+        import json
+
+        import pandas as pd
+
+        with open(ranking_path) as file:
+            order = json.load(file)["order"]
+        matrix = pd.read_csv(matrix_path, index_col=0).loc[order, order]
+        return cls(matrix.to_numpy(), order, order)
+
+    def rank(self, subset, exact=False, bound=True, time_limit=None):
+        """
+        Rank a subset of the nodes (names). See rerank_subset for the result fields; the
+        ordering is returned as names.
+        """
+        unknown = [name for name in subset if name not in self._index]
+        if unknown:
+            raise ValueError(f"Unknown nodes: {unknown}")
+        result = rerank_subset(self.weights, self.full_order, [self._index[name] for name in subset],
+                               exact=exact, bound=bound, time_limit=time_limit)
+        result["order"] = [self.names[i] for i in result["order"]]
+        return result
+
+
+def delta_entries(delta):
+    """
+    (rows, cols, values) of a sparse change to a weight matrix, given as a scipy.sparse
+    matrix, a dense array, a dict {(i, j): change} or a (rows, cols, values) tuple.
+    Zero changes are dropped.
+    """
+    if isinstance(delta, tuple):
+        rows, cols, values = (np.asarray(a) for a in delta)
+        rows, cols, values = rows.astype(np.int64), cols.astype(np.int64), values.astype(float)
+    elif isinstance(delta, dict):
+        keys = np.array(list(delta.keys()), dtype=np.int64).reshape(-1, 2)
+        rows, cols, values = keys[:, 0], keys[:, 1], np.array(list(delta.values()), dtype=float)
+    elif is_sparse(delta):
+        coo = delta.tocoo()
+        rows, cols, values = coo.row.astype(np.int64), coo.col.astype(np.int64), coo.data.astype(float)
+    else:
+        rows, cols = np.nonzero(delta)
+        values = np.asarray(delta, dtype=float)[rows, cols]
+    keep = (values != 0) & (rows != cols)
+    return rows[keep], cols[keep], values[keep]
+
+
+def matrix_delta(old, new):
+    """
+    Sparse change between two versions of a weight matrix, e.g. the Adjacency_Matrix.csv
+    before and after a crawl. A matrix built with affiliations.collaboration_matrix from only
+    the newly crawled articles is already such a change.
+    """
+    import scipy.sparse as sp
+
+    return sp.coo_matrix(np.asarray(new, dtype=float) - np.asarray(old, dtype=float))
+
+
+def bound_shift(rows, cols, values, n):
+    """
+    Smallest possible change of any ordering's backward weight under a delta: each unordered
+    pair {i, j} contributes the smaller of its two arc changes, since exactly one of its
+    arcs points backwards. Adding it to a lower bound for the old weights gives a lower
+    bound for the new ones.
+    """
+    if len(values) == 0:
+        return 0.0
+    low, high = np.minimum(rows, cols), np.maximum(rows, cols)
+    pairs, inverse = np.unique(low * n + high, return_inverse=True)
+    forward = np.bincount(inverse, weights=np.where(rows < cols, values, 0.0), minlength=len(pairs))
+    backward = np.bincount(inverse, weights=np.where(rows > cols, values, 0.0), minlength=len(pairs))
+    return float(np.minimum(forward, backward).sum())
+
+
+def repair_windows(order, nodes, margin):
+    """
+    Merged position intervals [start, stop) covering `margin` positions on each side of
+    every node of `nodes` in `order`.
+    """
+    n = len(order)
+    position = np.empty(n, dtype=np.int64)
+    position[np.asarray(order, dtype=np.int64)] = np.arange(n)
+    windows = []
+    for p in np.sort(position[np.asarray(nodes, dtype=np.int64)]):
+        start, stop = max(0, p - margin), min(n, p + margin + 1)
+        if windows and start <= windows[-1][1]:
+            windows[-1][1] = max(windows[-1][1], stop)
+        else:
+            windows.append([start, stop])
+    return [tuple(window) for window in windows]
+
+
+def incremental_rerank(weights, order, delta, bound=None, tolerance=1e-3, margin=10, max_passes=20,
+                       fallback=True, time_limit=None):
+    """
+    Update an ordering after a sparse change to the weight matrix. The nodes touched by the
+    change are first sifted to their best positions, then every window of `margin` positions
+    around them is re-sifted (reordering a contiguous block leaves all arcs leaving it
+    unchanged, so each window is an independent subproblem). The repair is certified when
+    its backward weight is within `tolerance` of the previous bound shifted by the delta;
+    otherwise, if `fallback`, the ordering MIP is solved warm-started from the repair.
+
+    Parameters:
+    weights (numpy.ndarray): The updated weight matrix (the delta already applied).
+    order (list): The previous ordering, best ranked first.
+    delta: The change applied to the matrix (see delta_entries).
+    bound (float): Lower bound on the previous optimum, e.g. its proven objective or the
+        B-FASP optimal value (None if unknown, in which case nothing can be certified).
+    tolerance (float): Relative gap to the bound accepted without a re-solve.
+    margin (int): Positions around each affected node re-sifted by the window repair.
+    max_passes (int): Maximum sifting passes.
+    fallback (bool): Solve the warm-started MIP when the repair is not certified.
+    time_limit (float): Seconds per MIP round of the fallback.
+
+    Returns:
+    dict: The new ordering, its backward weight, the updated bound and gap, whether the result
+    is certified, the method that produced it ("repair" or "mip"), the affected nodes and
+    windows, and timings.
+    """
+    start = time.perf_counter()
+    weights = np.asarray(weights, dtype=float)
+    n = weights.shape[0]
+    rows, cols, values = delta_entries(delta)
+    affected = np.unique(np.concatenate((rows, cols)))
+
+    result = {"previous_objective": backward_weight(weights, order), "affected_nodes": affected.tolist(),
+              "affected_arcs": len(values)}
+    order, _, _ = sift(weights, order, max_passes, nodes=affected)
+    windows = repair_windows(order, affected, margin)
+    for window_start, window_stop in windows:
+        block = order[window_start:window_stop]
+        repaired, _, _ = sift(weights[np.ix_(block, block)], np.arange(len(block)), max_passes)
+        order[window_start:window_stop] = block[repaired]
+    objective = backward_weight(weights, order)
+    bound = None if bound is None else bound + bound_shift(rows, cols, values, n)
+    certified = bound is not None and objective - bound <= tolerance * max(abs(objective), 1.0)
+    result.update(windows=windows, repair_objective=objective, repair_time=time.perf_counter() - start)
+
+    method = "repair"
+    if not certified and fallback:
+        solve_start = time.perf_counter()
+        mip_objective, mip_order, optimal = solve_ordering_mip(weights, order, time_limit)
+        if mip_objective <= objective:
+            objective, order = mip_objective, np.asarray(mip_order, dtype=np.int64)
+        if optimal:
+            bound, certified = objective, True
+        method = "mip"
+        result["mip_time"] = time.perf_counter() - solve_start
+
+    result.update(
+        order=np.asarray(order).tolist(),
+        objective=objective,
+        bound=bound,
+        gap=None if bound is None else (objective - bound) / max(abs(objective), 1e-9),
+        certified=certified,
+        method=method,
+        total_time=time.perf_counter() - start,
+    )
+    return result
+
+
+class IncrementalRanker:
+    """
+    Keeps a weight matrix, its ordering and a lower bound, and updates the ordering as
+    sparse changes arrive (see incremental_rerank).
+
+    Parameters:
+    weights (numpy.ndarray): Current weight matrix.
+    order (list): Current ordering (indices or names), best first.
+    bound (float): Lower bound on the optimal backward weight for `weights`.
+    names (list): Node names (defaults to the indices).
+    """
+
+    def __init__(self, weights, order, bound=None, names=None):
+        self.weights = np.array(weights, dtype=float)
+        np.fill_diagonal(self.weights, 0)
+        self.names = list(names) if names is not None else list(range(self.weights.shape[0]))
+        self._index = {name: i for i, name in enumerate(self.names)}
+        if names is not None:
+            order = [self._index[name] for name in order]
+        self.order = np.asarray(order, dtype=np.int64)
+        self.bound = bound
+
+    @classmethod
+    def from_ranking(cls, matrix_path, ranking_path):
+        """
+        Ranker over an adjacency matrix CSV and a ranking JSON written by
+        pipeline.ranking_stage. The B-FASP optimal value is a valid lower bound: every strict
+        ordering is a B-FASP solution.
+        """
+        import json
+
+        import pandas as pd
+
+        with open(ranking_path) as file:
+            ranking = json.load(file)
+        matrix = pd.read_csv(matrix_path, index_col=0)
+        names = matrix.index.tolist()
+        return cls(matrix.loc[names, names].to_numpy(), ranking["order"], ranking.get("optimal_value"), names)
+
+    def update(self, delta, **options):
+        """
+        Apply a sparse change (by index, see delta_entries) and update the ordering.
+        Keyword options are passed to incremental_rerank.
+
+        Returns:
+        dict: The incremental_rerank result, with the ordering as names.
+        """
+        rows, cols, values = delta_entries(delta)
+        np.add.at(self.weights, (rows, cols), values)
+        result = incremental_rerank(self.weights, self.order, (rows, cols, values), self.bound, **options)
+        self.order = np.asarray(result["order"], dtype=np.int64)
+        self.bound = result["bound"]
+        result["order"] = [self.names[i] for i in self.order]
+        return result
@@ -0,0 +1,209 @@
+import datetime
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+import pandas as pd
+
+from table_extraction import COLUMNS
+
+DAY = 24 * 60 * 60
+
+# Seconds before an entry of each source must be refetched (None: never expires)
+DEFAULT_TTLS = {
+    "ut_search": DAY,          # searches that include the current year
+    "ut_search_historic": None,  # searches restricted to past years never change
+    "scholar": 7 * DAY,
+}
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return " ".join(value.casefold().split())
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def cache_key(**query):
+    """
+    Normalized cache key for a query: strings are case-folded with whitespace collapsed and
+    the parameters are serialized in sorted order, so equivalent queries share one entry.
+    """
+    return json.dumps({name: _normalize(value) for name, value in query.items()}, sort_keys=True)
+
+
+class ResponseCache:
+    """
+    Persistent on-disk cache for scraper fetches, stored zlib-compressed in SQLite.
+    Entries carry the validators of HTTP responses (ETag / Last-Modified) so stale entries
+    can be revalidated with a conditional request instead of being downloaded again.
+
+    Parameters:
+    path (str): SQLite database file.
+    ttls (dict): Source -> seconds before entries expire (None: never), on top of DEFAULT_TTLS.
+    """
+
+    def __init__(self, path, ttls=None):
+        self.path = path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS cache (
+                source TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                fetched_at REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                PRIMARY KEY (source, key)
+            );
+        """)
+
+    def is_fresh(self, source, fetched_at):
+        ttl = self.ttls.get(source)
+        return ttl is None or time.time() - fetched_at < ttl
+
+    def lookup(self, source, key):
+        """
+        Returns:
+        dict: "value", "fresh", "etag" and "last_modified" of the entry, or None if absent.
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT value, fetched_at, etag, last_modified FROM cache WHERE source = ? AND key = ?", (source, key)
+            ).fetchone()
+        if row is None:
+            return None
+        value, fetched_at, etag, last_modified = row
+        return {
+            "value": json.loads(zlib.decompress(value)),
+            "fresh": self.is_fresh(source, fetched_at),
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+
+    def get(self, source, key):
+        """
+        The cached value if present and fresh, otherwise None.
+        """
+        entry = self.lookup(source, key)
+        return entry["value"] if entry is not None and entry["fresh"] else None
+
+    def put(self, source, key, value, etag=None, last_modified=None):
+        blob = zlib.compress(json.dumps(value).encode("utf-8"))
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?, ?)",
+                (source, key, blob, time.time(), etag, last_modified),
+            )
+
+    def touch(self, source, key):
+        """
+        Mark an entry as just fetched (after a 304 Not Modified).
+        """
+        with self._lock, self.connection:
+            self.connection.execute(
+                "UPDATE cache SET fetched_at = ? WHERE source = ? AND key = ?", (time.time(), source, key)
+            )
+
+    def close(self):
+        self.connection.close()
+
+
+def cached_get(cache, session, source, url, params=None, timeout=30, is_valid=None):
+    """
+    GET through the cache: fresh entries are served from disk, stale entries with validators
+    are revalidated with If-None-Match / If-Modified-Since, and new bodies are stored.
+    `is_valid` (text -> bool) keeps error pages served with status 200, such as captchas,
+    out of the cache.
+
+    Returns:
+    tuple: (status code, response text); (200, cached text) when served from the cache.
+    """
+    key = cache_key(url=url, params=params or {})
+    entry = cache.lookup(source, key)
+    if entry is not None and entry["fresh"]:
+        return 200, entry["value"]
+
+    headers = {}
+    if entry is not None:
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = session.get(url, params=params, headers=headers, timeout=timeout)
+    if response.status_code == 304 and entry is not None:
+        cache.touch(source, key)
+        return 200, entry["value"]
+    if response.ok and (is_valid is None or is_valid(response.text)):
+        cache.put(source, key, response.text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return response.status_code, response.text
+
+
+def _tables_to_json(tables):
+    return {table_type: df[COLUMNS].astype(str).values.tolist() for table_type, df in tables.items()}
+
+
+def _tables_from_json(value):
+    return {table_type: pd.DataFrame(rows, columns=COLUMNS) for table_type, rows in value.items()}
+
+
+def _split_by_year(tables, current_year):
+    historic, current = {}, {}
+    for table_type, df in tables.items():
+        years = pd.to_numeric(df["Year"], errors="coerce")
+        historic[table_type] = df[years < current_year].reset_index(drop=True)
+        current[table_type] = df[~(years < current_year)].reset_index(drop=True)
+    return historic, current
+
+
+def cached_search(cache, search, schools, from_year="1990", current_year=None):
+    """
+    Run a UT Dallas search through the cache, refetching only the current year.
+    Rows from past years never change, so they are cached without expiry; once they are
+    cached, a refresh only searches from the current year and merges the two.
+
+    Parameters:
+    cache (ResponseCache): The cache.
+    search (callable): (schools, from_year) -> {table type: DataFrame}, the uncached search.
+    schools (list): One school, or a pair of schools.
+    from_year (str): First publication year to include.
+    current_year (int): Year treated as still changing (this year if None).
+
+    Returns:
+    dict: Table type -> DataFrame with the COLUMNS.
+    """
+    current_year = current_year or datetime.date.today().year
+    schools = list(schools)
+    historic_key = cache_key(schools=schools, from_year=int(from_year), through=current_year - 1)
+    current_key = cache_key(schools=schools, from_year=current_year)
+
+    historic = cache.get("ut_search_historic", historic_key)
+    current = cache.get("ut_search", current_key)
+
+    if historic is None:
+        # Nothing cached yet for the past years: one full search fills both entries
+        historic_tables, current_tables = _split_by_year(search(schools, str(from_year)), current_year)
+        cache.put("ut_search_historic", historic_key, _tables_to_json(historic_tables))
+        cache.put("ut_search", current_key, _tables_to_json(current_tables))
+        historic, current = _tables_to_json(historic_tables), _tables_to_json(current_tables)
+    elif current is None and int(from_year) <= current_year:
+        # Incremental refresh: only this year's publications
+        current_tables = search(schools, str(current_year))
+        _, current_tables = _split_by_year(current_tables, current_year)
+        current = _tables_to_json(current_tables)
+        cache.put("ut_search", current_key, current)
+    elif current is None:
+        current = {table_type: [] for table_type in historic}
+
+    historic_tables, current_tables = _tables_from_json(historic), _tables_from_json(current)
+    return {
+        table_type: pd.concat([historic_tables[table_type], current_tables.get(table_type)], ignore_index=True)
+        for table_type in historic_tables
+    }
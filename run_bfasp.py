@@ -1,73 +1,77 @@
 import numpy as np
-import pandas as pd
-from scipy.optimize import linprog
-import cvxpy as cp
 
-import gurobipy as gp
-from gurobipy import GRB
+from instrumentation import maybe_phase
+from solution_extraction import removed_arc_mask, variable_values
 
-# Set NumPy to display floats in fixed-point notation
-np.set_printoptions(suppress=True)
 
-def solve_bfasp(weight_matrix):
+def solve_bfasp(weight_matrix, instrumentation=None):
     """
     Solves the Bidirectional Feedback Arc Set Problem (B-FASP) using a binary linear program with Gurobi.
 
     Parameters:
     weight_matrix (numpy.ndarray): A square matrix where element (i, j) represents the weight of the arc from node i to node j.
+    instrumentation (Instrumentation): Optional recorder for the build, solve and extract phases and the solver progress.
 
     Returns:
     dict: A solution containing the optimal ranking, the arcs to be removed, and the updated weight matrix.
     """
+    import gurobipy as gp
+    from gurobipy import GRB
+
     n = weight_matrix.shape[0]
 
-    # Create a Gurobi model
-    model = gp.Model("B-FASP")
-
-    # Define binary decision variables y_ij
-    y = model.addVars(n, n, vtype=GRB.BINARY, name="y")
-
-    # Objective function: minimize the total weight of removed arcs
-    model.setObjective(gp.quicksum(weight_matrix[i, j] * (1 - y[i, j]) for i in range(n) for j in range(n) if i != j), GRB.MINIMIZE)
-
-    # Transitivity constraints: y_ij - y_ik - y_kj >= -1 for all distinct i, j, k
-    for i in range(n):
-        for j in range(n):
-            if i != j:
-                for k in range(n):
-                    if i != k and j != k:  # Ensure all indices are distinct
-                        model.addConstr(y[i, j] - y[i, k] - y[k, j] >= -1, name=f"trans_{i}_{j}_{k}")
-
-    # Constraints for bidirectional arcs and ordering
-    for i in range(n):
-        for j in range(n):
-            if i != j:
-                if weight_matrix[i, j] > 0 and weight_matrix[j, i] > 0:
-                    # Bidirectional arc: y_ij + y_ji >= 1
-                    model.addConstr(y[i, j] + y[j, i] >= 1, name=f"bidirectional_{i}_{j}")
-                else:
-                    # Unidirectional or no arc: y_ij + y_ji = 1
-                    model.addConstr(y[i, j] + y[j, i] == 1, name=f"unidirectional_{i}_{j}")
+    with maybe_phase(instrumentation, "bfasp_build", "build"):
+        # Create a Gurobi model
+        model = gp.Model("B-FASP")
+
+        # Define binary decision variables y_ij
+        y = model.addVars(n, n, vtype=GRB.BINARY, name="y")
+
+        # Objective function: minimize the total weight of removed arcs
+        model.setObjective(gp.quicksum(weight_matrix[i, j] * (1 - y[i, j]) for i in range(n) for j in range(n) if i != j), GRB.MINIMIZE)
+
+        # Transitivity constraints: y_ij - y_ik - y_kj >= -1 for all distinct i, j, k
+        for i in range(n):
+            for j in range(n):
+                if i != j:
+                    for k in range(n):
+                        if i != k and j != k:  # Ensure all indices are distinct
+                            model.addConstr(y[i, j] - y[i, k] - y[k, j] >= -1, name=f"trans_{i}_{j}_{k}")
+
+        # Constraints for bidirectional arcs and ordering
+        for i in range(n):
+            for j in range(n):
+                if i != j:
+                    if weight_matrix[i, j] > 0 and weight_matrix[j, i] > 0:
+                        # Bidirectional arc: y_ij + y_ji >= 1
+                        model.addConstr(y[i, j] + y[j, i] >= 1, name=f"bidirectional_{i}_{j}")
+                    else:
+                        # Unidirectional or no arc: y_ij + y_ji = 1
+                        model.addConstr(y[i, j] + y[j, i] == 1, name=f"unidirectional_{i}_{j}")
+        model.update()
 
     # Solve the problem
-    model.optimize()
-
-    # Extract the solution
-    y_sol = np.zeros((n, n))
-    for i in range(n):
-        for j in range(n):
-            if i != j:
-                y_sol[i, j] = y[i, j].X
-
-    removed_arcs = [(i, j) for i in range(n) for j in range(n) if i != j and y_sol[i, j] == 0]
-
-    # Create the updated weight matrix with removed arcs
-    updated_weight_matrix = np.copy(weight_matrix)
-    for i, j in removed_arcs:
-        updated_weight_matrix[i, j] = 0
+    with maybe_phase(instrumentation, "bfasp_optimize", "solve"):
+        if instrumentation is None:
+            model.optimize()
+        else:
+            instrumentation.metadata.update(n=n, num_vars=model.NumVars, num_constrs=model.NumConstrs)
+            model.optimize(instrumentation.gurobi_callback())
+
+    with maybe_phase(instrumentation, "bfasp_extract", "extract"):
+        # Extract the solution with one attribute query and array masks
+        y_sol = variable_values(model, y, (n, n))
+        np.fill_diagonal(y_sol, 0)
+        removed = removed_arc_mask(y_sol)
+        removed_arcs = list(zip(*(idx.tolist() for idx in np.nonzero(removed))))
+
+        # Create the updated weight matrix with removed arcs
+        updated_weight_matrix = np.where(removed, 0, weight_matrix).astype(weight_matrix.dtype, copy=False)
 
     return {
         "optimal_value": model.ObjVal,
+        "num_vars": model.NumVars,
+        "num_constrs": model.NumConstrs,
         "removed_arcs": removed_arcs,
         "ranking_matrix": y_sol,
         "updated_weight_matrix": updated_weight_matrix
@@ -150,56 +154,108 @@ def modified_topological_sort(weights, school_names):
     return weak_ordering
 
 
+def rank_schools(weights, school_names, instrumentation=None):
+    """
+    Rank schools with B-FASP and name the result.
+
+    Parameters:
+    weights (np.array): School weight matrix (the diagonal is ignored).
+    school_names (list): School names corresponding to the matrix indices.
+    instrumentation (Instrumentation): Optional recorder passed to solve_bfasp.
 
+    Returns:
+    dict: The schools, their strict order and weak order, the optimal value and the removed arcs.
+    """
+    import contextlib
+    import io
+
+    weights = np.array(weights, dtype=float)
+    np.fill_diagonal(weights, 0)
+    solution = solve_bfasp(weights, instrumentation)
+    order = np.argsort(-solution["ranking_matrix"].sum(axis=1), kind="stable")
+    with contextlib.redirect_stdout(io.StringIO()):
+        weak_order = modified_topological_sort(solution["updated_weight_matrix"], school_names)
+
+    return {
+        "schools": list(school_names),
+        "order": [school_names[i] for i in order],
+        "weak_order": weak_order,
+        "optimal_value": solution["optimal_value"],
+        "removed_arcs": [[school_names[i], school_names[j]] for i, j in solution["removed_arcs"]],
+    }
 
 
-# Reading the CSV file into a DataFrame
-weights = pd.read_csv('Adjacency_Matrix.csv', index_col=0)
-
-# List of school names (from your provided list)
-school_names = [
-    "Stanford University", "University Pennsylvania", "Northwestern University", "University of Chicago", 
-    "Massachusetts Institute of Technology (MIT)", "Harvard University", "New York University", 
-    "University of California at Berkeley", "Yale University", "Dartmouth College", "University of Viriginia", 
-    "Columbia University", "Duke University", "University of Michigan at Ann Arbor", "Cornell University", 
-    "Carnegie Mellon University", "University of Texas at Austin", "Emory University", "University of Southern California", 
-    "Indiana University", "University of California at Los Angeles", "University of North Carolina at Chapel Hill", 
-    "Vanderbilt University", "Georgetown University", "Georgia Institute of Technology", "Washington University in St. Louis", 
-    "University of Georgia", "University of Washington", "Rice University", "Ohio State University", 
-    "University of Notre Dame", "Arizona State University", "University of Rochester", "Southern Methodist University", 
-    "University of Minnesota at Twin Cities", "University of Florida", "Brigham Young University", 
-    "The University of Texas at Dallas", "University of Utah", "William & Mary", "Michigan State University", 
-    "University of Maryland at College Park", "University of Wisconsin at Madison", "Texas Christian University", 
-    "University of California at Irvine", "Boston College", "Texas A&M University at College Station", 
-    "University of Pittsburgh", "University of Tennessee at Knoxville", "Boston University", "Iowa State University", 
-    "University of Arizona", "CUNY Bernard M. Baruch College", "Rutgers University at Newark and New Brunswick", 
-    "University of Alabama (Manderson)", "University of Houston", "Baylor University", "University of California at Davis", 
-    "University of South Carolina", "University of Kansas", "University of Kentucky", "Fordham University", 
-    "George Washington University", "Tulane University", "University of Miami", "Case Western Reserve University", 
-    "Chapman University", "Lehigh University", "North Carolina State University", "Syracuse University", 
-    "University of Colorado at Boulder", "Stevens Institute of Technology", "University of Massachusetts", 
-    "University of Buffalo at SUNY", "University of Arkansas at Fayetteville", "Babson College", 
-    "Oklahoma State University", "University of California at San Diego", "North Carolina A&T State University", 
-    "University of Detroit at Mercy", "Auburn University", "Northeastern University", "University of Mississippi", 
-    "University of Oklahoma", "American University", "College of Charleston", "University of Denver", 
-    "University South Florida", "Pepperdine University", "Binghamton University at SUNY", 
-    "University of California at Riverside", "University of Hawaii at Manoa", "Claremont Graduate University", 
-    "Clark Atlanta University", "University of Minnesota at Duluth", "Clark University", "Clarkson University", 
-    "Louisiana State University at Baton Rouge", "Louisiana Tech University", "Rochester Institute of Technology", 
-    "Saint Louis University"
-]
-
-# Filter the DataFrame to only keep rows and columns with indices in the school_names list
-filtered_weights = weights.loc[weights.index.isin(school_names), weights.columns.isin(school_names)]
-weights_arr = filtered_weights.values
-np.fill_diagonal(weights_arr, 0)
-# Solve binary program with filtered weights
-solution = solve_bfasp(weights_arr)
-print("Binary Program Solution:", solution)
-
-# Example Usage
-# Perform modified topological sorting on the adjacency matrix
-weak_order = modified_topological_sort(solution['updated_weight_matrix'], filtered_weights.index.tolist())
-print("Weak Ordering of Universities:")
-for rank, group in enumerate(weak_order, start=1):
-    print(f"Rank {rank}: {', '.join(group)}")
\ No newline at end of file
+if __name__ == "__main__":
+    import argparse
+
+    import pandas as pd
+
+    from instrumentation import Instrumentation
+
+    parser = argparse.ArgumentParser(description="Rank the schools of Adjacency_Matrix.csv with B-FASP.")
+    parser.add_argument("--instrumentation", help="Write phase timings and solver progress to this JSON file")
+    parser.add_argument("--profile", help="Write a cProfile capture of the run to this file")
+    args = parser.parse_args()
+    instrumentation = Instrumentation("run_bfasp", profile=bool(args.profile))
+
+    # Set NumPy to display floats in fixed-point notation
+    np.set_printoptions(suppress=True)
+
+    # Reading the CSV file into a DataFrame
+    with instrumentation.phase("load_matrix", "io"):
+        weights = pd.read_csv('Adjacency_Matrix.csv', index_col=0)
+
+    # List of school names (from your provided list)
+    school_names = [
+        "Stanford University", "University Pennsylvania", "Northwestern University", "University of Chicago", 
+        "Massachusetts Institute of Technology (MIT)", "Harvard University", "New York University", 
+        "University of California at Berkeley", "Yale University", "Dartmouth College", "University of Viriginia", 
+        "Columbia University", "Duke University", "University of Michigan at Ann Arbor", "Cornell University", 
+        "Carnegie Mellon University", "University of Texas at Austin", "Emory University", "University of Southern California", 
+        "Indiana University", "University of California at Los Angeles", "University of North Carolina at Chapel Hill", 
+        "Vanderbilt University", "Georgetown University", "Georgia Institute of Technology", "Washington University in St. Louis", 
+        "University of Georgia", "University of Washington", "Rice University", "Ohio State University", 
+        "University of Notre Dame", "Arizona State University", "University of Rochester", "Southern Methodist University", 
+        "University of Minnesota at Twin Cities", "University of Florida", "Brigham Young University", 
+        "The University of Texas at Dallas", "University of Utah", "William & Mary", "Michigan State University", 
+        "University of Maryland at College Park", "University of Wisconsin at Madison", "Texas Christian University", 
+        "University of California at Irvine", "Boston College", "Texas A&M University at College Station", 
+        "University of Pittsburgh", "University of Tennessee at Knoxville", "Boston University", "Iowa State University", 
+        "University of Arizona", "CUNY Bernard M. Baruch College", "Rutgers University at Newark and New Brunswick", 
+        "University of Alabama (Manderson)", "University of Houston", "Baylor University", "University of California at Davis", 
+        "University of South Carolina", "University of Kansas", "University of Kentucky", "Fordham University", 
+        "George Washington University", "Tulane University", "University of Miami", "Case Western Reserve University", 
+        "Chapman University", "Lehigh University", "North Carolina State University", "Syracuse University", 
+        "University of Colorado at Boulder", "Stevens Institute of Technology", "University of Massachusetts", 
+        "University of Buffalo at SUNY", "University of Arkansas at Fayetteville", "Babson College", 
+        "Oklahoma State University", "University of California at San Diego", "North Carolina A&T State University", 
+        "University of Detroit at Mercy", "Auburn University", "Northeastern University", "University of Mississippi", 
+        "University of Oklahoma", "American University", "College of Charleston", "University of Denver", 
+        "University South Florida", "Pepperdine University", "Binghamton University at SUNY", 
+        "University of California at Riverside", "University of Hawaii at Manoa", "Claremont Graduate University", 
+        "Clark Atlanta University", "University of Minnesota at Duluth", "Clark University", "Clarkson University", 
+        "Louisiana State University at Baton Rouge", "Louisiana Tech University", "Rochester Institute of Technology", 
+        "Saint Louis University"
+    ]
+
+    # Filter the DataFrame to only keep rows and columns with indices in the school_names list
+    filtered_weights = weights.loc[weights.index.isin(school_names), weights.columns.isin(school_names)]
+    weights_arr = filtered_weights.values
+    np.fill_diagonal(weights_arr, 0)
+    # Solve binary program with filtered weights
+    solution = solve_bfasp(weights_arr, instrumentation)
+    print("Binary Program Solution:", solution)
+
+    # Example Usage
+    # Perform modified topological sorting on the adjacency matrix
+    with instrumentation.phase("weak_ordering", "extract"):
+        weak_order = modified_topological_sort(solution['updated_weight_matrix'], filtered_weights.index.tolist())
+    print("Weak Ordering of Universities:")
+    for rank, group in enumerate(weak_order, start=1):
+        print(f"Rank {rank}: {', '.join(group)}")
+
+    print(instrumentation.summary())
+    if args.instrumentation:
+        instrumentation.write_json(args.instrumentation)
+    if args.profile:
+        instrumentation.write_profile(args.profile)
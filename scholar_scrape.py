@@ -1,50 +1,59 @@
 import time
-import random
+from urllib.parse import urlencode
+
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import Select
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-
-from webdriver_manager.chrome import ChromeDriverManager
-import time
-import undetected_chromedriver as uc
-import ssl
 
-# Ignore SSL certificate verification (for testing only)
-ssl._create_default_https_context = ssl._create_unverified_context
-# Initialize the WebDriver (using Chrome in this case)
-# Make sure to replace 'chromedriver_path' with the actual path of your chromedriver
-driver = uc.Chrome()
+from citation_crawler import SCHOLAR_URL, unique_titles
+from politeness import AdaptiveRateLimiter
+
+# Chrome driver, started by main() so importing this module does not launch a browser
+driver = None
+
+# One shared limiter paces every Scholar request; it slows down on captchas and slow pages
+limiter = AdaptiveRateLimiter(rate=1 / 20, min_rate=1 / 600, target_latency=15.0, jitter=0.5)
+
+# Results list, "Cited by" results or the captcha / unusual traffic page. ("id", ...) is
+# (By.ID, ...), spelled out so importing this module does not load selenium
+RESULTS_LOCATOR = ("id", "gs_res_ccl_mid")
+BLOCKED_LOCATOR = ("id", "gs_captcha_ccl")
+
+
+def load_scholar_page(driver, action):
+    """
+    Wait for the rate limiter, perform `action` (a navigation or click), then wait until
+    the results (or a captcha) have rendered in `driver` and report the latency to the limiter.
+    """
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    limiter.wait()
+    start = time.monotonic()
+    action()
+    WebDriverWait(driver, 60).until(
+        EC.any_of(EC.presence_of_element_located(RESULTS_LOCATOR), EC.presence_of_element_located(BLOCKED_LOCATOR))
+    )
+    blocked = len(driver.find_elements(*BLOCKED_LOCATOR)) > 0
+    limiter.record(time.monotonic() - start, ok=not blocked)
+    if blocked:
+        raise RuntimeError("Google Scholar returned a captcha page")
 
 # Function to search a paper on Google Scholar
 def search_google_scholar(paper_title):
-    # Open Google Scholar
-    driver.get("https://scholar.google.com/")
-    time.sleep(random.uniform(3, 12))
-    
-    # Locate the search bar, input the paper title, and search
-    search_box = driver.find_element(By.NAME, "q")
-    search_box.send_keys(paper_title)
-    search_box.send_keys(Keys.RETURN)
-    
-    # Wait for the search results to load
-    time.sleep(random.uniform(3, 12))
+    # Open the results page directly: one paced, recorded request per title instead of the
+    # homepage load followed by a search submit
+    url = f"{SCHOLAR_URL}/scholar?{urlencode({'q': paper_title})}"
+    load_scholar_page(driver, lambda: driver.get(url))
 
 # Function to retrieve citing papers (title and authors) and store in list of lists
 def get_citing_papers(paper_title=''):
+    from selenium.webdriver.common.by import By
+
     citing_papers = []
 
     # Find the "Cited by" link for the first search result
     try:
         cited_by_link = driver.find_element(By.PARTIAL_LINK_TEXT, "Cited by")
-        cited_by_link.click()
-        time.sleep(random.uniform(3, 12))
+        load_scholar_page(driver, cited_by_link.click)
     except Exception as e:
         print(f"Error: {e}")
         return citing_papers
@@ -71,11 +80,14 @@ def get_citing_papers(paper_title=''):
         # Check if there's a 'Next' button to go to the next page of results
         try:
             next_button = driver.find_element(By.LINK_TEXT, "Next")
-            next_button.click()
-            time.sleep(random.uniform(3, 12))
         except:
             # No more pages
             break
+        try:
+            load_scholar_page(driver, next_button.click)
+        except RuntimeError as e:
+            print(f"Error: {e}")
+            break
     
     return citing_papers
 
@@ -85,10 +97,14 @@ def search_and_extract_citing_papers(paper_titles):
 
     # Loop through each paper title in the list
     for paper_title in paper_titles:
-        time.sleep(300)
         # Search for the paper on Google Scholar
         print(f"Searching for: {paper_title}")
-        search_google_scholar(paper_title)
+        try:
+            search_google_scholar(paper_title)
+        except RuntimeError as e:
+            # Blocked: the limiter has already backed off, move on to the next title
+            print(f"Error: {e}")
+            continue
         
         # Get the citing papers for the current paper
         citing_papers_list = get_citing_papers(paper_title)
@@ -101,15 +117,31 @@ def search_and_extract_citing_papers(paper_titles):
 
     return citing_papers_df
 
-# Example usage
-pub_data = pd.read_csv('Business_Faculty_Data.csv')
-paper_titles = list(pub_data['Article'])
+def main():
+    global driver
+    import ssl
+    import undetected_chromedriver as uc
+
+    # Ignore SSL certificate verification (for testing only)
+    ssl._create_default_https_context = ssl._create_unverified_context
+    # Initialize the WebDriver (using Chrome in this case)
+    driver = uc.Chrome()
+
+    try:
+        # Example usage
+        pub_data = pd.read_csv('Business_Faculty_Data.csv')
+        paper_titles = unique_titles(pub_data['Article'])  # Same article appears once per author/school row
+
+        # Call the function to search and extract citing papers for all the paper titles
+        citing_papers_df = search_and_extract_citing_papers(paper_titles)
+
+        # Print the DataFrame
+        print(citing_papers_df)
+    finally:
+        # Close the browser once done
+        driver.quit()
 
-# Call the function to search and extract citing papers for all the paper titles
-citing_papers_df = search_and_extract_citing_papers(paper_titles)
 
-# Print the DataFrame
-print(citing_papers_df)
+if __name__ == "__main__":
+    main()
 
-# Close the browser once done
-driver.quit()
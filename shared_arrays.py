@@ -0,0 +1,150 @@
+import sys
+import weakref
+from multiprocessing import shared_memory
+from typing import NamedTuple
+
+import numpy as np
+
+# Segments attached in this process, by name, with weak references to the arrays viewing
+# them. A segment stays mapped while any of its arrays is alive and is closed by the next
+# attach (or release) after the last one is gone, so long-lived workers do not keep a mapping
+# for every handle they have ever seen.
+_attached = {}
+
+
+def _close_unused(names=None):
+    """
+    Close the attached segments (among `names`, or all) that no live array views any more.
+    """
+    for name in list(_attached if names is None else names):
+        entry = _attached.get(name)
+        if entry is None:
+            continue
+        segment, views = entry
+        views[:] = [view for view in views if view() is not None]
+        if not views:
+            del _attached[name]
+            segment.close()
+
+
+class SharedArrayHandle(NamedTuple):
+    """
+    Picklable reference to an array published in shared memory. Passing the handle to a
+    worker costs a few bytes; `attach()` maps the array without copying it.
+    """
+
+    name: str
+    shape: tuple
+    dtype: str
+
+    def attach(self, writable=False):
+        """
+        View of the shared array (read-only unless `writable`).
+        """
+        _close_unused()
+        entry = _attached.get(self.name)
+        if entry is None:
+            if sys.version_info >= (3, 13):
+                segment = shared_memory.SharedMemory(name=self.name, track=False)
+            else:
+                segment = shared_memory.SharedMemory(name=self.name)
+            entry = _attached[self.name] = (segment, [])
+        segment, views = entry
+        array = np.ndarray(self.shape, dtype=np.dtype(self.dtype), buffer=segment.buf)
+        array.flags.writeable = writable
+        views.append(weakref.ref(array))
+        return array
+
+
+def attach(array):
+    """
+    The array behind a SharedArrayHandle, or `array` itself if it is not a handle. Functions
+    taking weight matrices call this so callers may pass either.
+    """
+    if isinstance(array, SharedArrayHandle):
+        return array.attach()
+    return array
+
+
+def prefix_sums(weights):
+    """
+    2D prefix sums of a weight matrix with a zero first row and column: the total weight of
+    the block rows [a, b) x columns [c, d) is P[b, d] - P[a, d] - P[b, c] + P[a, c].
+    """
+    weights = np.asarray(weights, dtype=float)
+    table = np.zeros((weights.shape[0] + 1, weights.shape[1] + 1))
+    np.cumsum(np.cumsum(weights, axis=0), axis=1, out=table[1:, 1:])
+    return table
+
+
+def _release(segments):
+    for segment in segments.values():
+        segment.close()
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+    segments.clear()
+
+
+class SharedArrayStore:
+    """
+    Publishes arrays to shared memory once so process-pool workers can attach them by handle
+    instead of receiving a pickled copy with every task. The store owns the segments: they
+    are unlinked by `close()`, on leaving a `with` block, when the store is garbage collected
+    or at interpreter exit. If the owning process is killed outright, the multiprocessing
+    resource tracker unlinks whatever it leaked.
+    """
+
+    def __init__(self):
+        self._segments = {}
+        self._finalizer = weakref.finalize(self, _release, self._segments)
+
+    def publish(self, array):
+        """
+        Copy an array into a new shared memory segment.
+
+        Returns:
+        SharedArrayHandle: Handle to pass to workers.
+        """
+        array = np.ascontiguousarray(array)
+        segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self._segments[segment.name] = segment
+        np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+        return SharedArrayHandle(segment.name, array.shape, array.dtype.str)
+
+    def publish_weights(self, weights, names=None, with_prefix_sums=False):
+        """
+        Publish a weight matrix with, optionally, its node names and prefix-sum table.
+
+        Returns:
+        dict: Handles under "weights", and "names" / "prefix_sums" when requested.
+        """
+        handles = {"weights": self.publish(weights)}
+        if names is not None:
+            handles["names"] = self.publish(np.array([str(name) for name in names]))
+        if with_prefix_sums:
+            handles["prefix_sums"] = self.publish(prefix_sums(weights))
+        return handles
+
+    def release(self, handle):
+        """
+        Unlink one published array. Processes that still hold arrays attached from it keep
+        their mapping until those arrays are gone.
+        """
+        _close_unused([handle.name])
+        segment = self._segments.pop(handle.name, None)
+        if segment is not None:
+            _release({handle.name: segment})
+
+    def close(self):
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self._segments)
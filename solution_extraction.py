@@ -0,0 +1,40 @@
+import numpy as np
+
+
+def variable_values(model, variables, shape=None):
+    """
+    Fetch the solution values of many variables with a single attribute query instead of
+    one `.X` read per variable.
+
+    Parameters:
+    model (gurobipy.Model): The solved model.
+    variables: A tupledict (values are read in insertion order), a list of variables or an MVar.
+    shape (tuple): Shape to give the values, e.g. (n, n) for variables added with addVars(n, n).
+
+    Returns:
+    numpy.ndarray: The variable values.
+    """
+    if hasattr(variables, "shape"):
+        values = np.asarray(variables.X, dtype=float)
+    else:
+        if hasattr(variables, "values"):
+            variables = list(variables.values())
+        values = np.asarray(model.getAttr("X", variables), dtype=float)
+    return values if shape is None else values.reshape(shape)
+
+
+def removed_arc_mask(ranking_matrix):
+    """
+    Boolean mask of the arcs a B-FASP solution removes: off-diagonal pairs with y_ij = 0.
+    Values are compared with 0.5 so solver tolerances on binary variables do not matter.
+    """
+    mask = np.asarray(ranking_matrix) < 0.5
+    np.fill_diagonal(mask, False)
+    return mask
+
+
+def assignment_labels(assignment_values):
+    """
+    Tier of every vertex (0 to K - 1) from a (num_vertices, K) matrix of assignment variable values.
+    """
+    return np.argmax(assignment_values, axis=1)
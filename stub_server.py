@@ -0,0 +1,246 @@
+import datetime
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from table_extraction import COLUMNS, TABLE_TYPES
+
+# Minimal stand-in for the UT Dallas search page: the same autocomplete box, year dropdown,
+# "Select All" link, Search button and result tables the scrapers drive.
+SEARCH_PAGE = """<!DOCTYPE html>
+<html>
+<head><title>UTD search fixture</title>
+<style>.as-results { display: none; } .as-results.open { display: block; }</style>
+</head>
+<body>
+<input class="as-input" type="text">
+<div class="as-results"></div>
+<select id="fromDate">%(year_options)s</select>
+<a href="#" id="select-all">Select All</a>
+<button class="button4">Search</button>
+<div id="spinner" style="display: none">Loading...</div>
+<div id="results"></div>
+<script>
+var schools = %(schools)s;
+var selected = [];
+var input = document.querySelector(".as-input");
+var dropdown = document.querySelector(".as-results");
+input.addEventListener("input", function () {
+    dropdown.innerHTML = "";
+    schools.filter(function (s) { return input.value && s.indexOf(input.value) >= 0; }).forEach(function (s) {
+        var item = document.createElement("div");
+        item.className = "as-result-item";
+        item.textContent = s;
+        item.addEventListener("click", function () {
+            selected.push(s);
+            input.value = "";
+            dropdown.className = "as-results";
+        });
+        dropdown.appendChild(item);
+    });
+    dropdown.className = dropdown.children.length ? "as-results open" : "as-results";
+});
+document.getElementById("select-all").addEventListener("click", function (e) { e.preventDefault(); });
+document.querySelector(".button4").addEventListener("click", function () {
+    var spinner = document.getElementById("spinner");
+    spinner.style.display = "block";
+    var query = "schools=" + encodeURIComponent(selected.join("|")) +
+        "&from=" + encodeURIComponent(document.getElementById("fromDate").value);
+    fetch("/api/search?" + query).then(function (r) { return r.json(); }).then(function (data) {
+        var html = "";
+        data.tables.forEach(function (rows) {
+            html += "<table><tr>" + data.columns.map(function (c) { return "<th>" + c + "</th>"; }).join("") + "</tr>";
+            rows.forEach(function (row) {
+                // Multi-line cells (several authors) are <br>-separated, as on the real page
+                html += "<tr>" + row.map(function (v) { return "<td>" + String(v).split("\\n").join("<br>") + "</td>"; }).join("") + "</tr>";
+            });
+            html += "</table>";
+        });
+        document.getElementById("results").innerHTML = html;
+        spinner.style.display = "none";
+    });
+});
+</script>
+</body>
+</html>
+"""
+
+
+class FixtureServer:
+    """
+    Local HTTP server that mimics the UT Dallas search page, for testing the scrapers offline.
+
+    Parameters:
+    fixtures (dict): Tuple of searched schools -> {table type: list of rows}, each row a
+        list of values for COLUMNS. Newlines in a value (e.g. one author per line) are
+        rendered as <br> in the results page.
+    latency (float | tuple | callable): Seconds to delay every search response: a constant,
+        a (low, high) range to draw from uniformly, or a callable taking the request path.
+    error_rate (float): Fraction of search requests answered with `error_status`, to exercise backoff.
+    error_status (int): Status of those answers: 503 (unavailable) or 429 (throttled).
+    port (int): Port to listen on (0 picks a free port).
+    """
+
+    def __init__(self, fixtures, latency=0.0, error_rate=0.0, error_status=503, port=0):
+        self.fixtures = {tuple(key): value for key, value in fixtures.items()}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = []
+        schools = sorted({school for key in self.fixtures for school in key})
+        self.page = SEARCH_PAGE % {
+            "schools": json.dumps(schools),
+            "year_options": "".join(f'<option value="{year}">{year}</option>' for year in range(1990, datetime.date.today().year + 1)),
+        }
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}/search"
+
+    def delay(self, path):
+        if callable(self.latency):
+            return self.latency(path)
+        if isinstance(self.latency, tuple):
+            return random.uniform(*self.latency)
+        return self.latency
+
+    def search_results(self, schools, from_year):
+        """
+        Tables for a search, keeping only rows from `from_year` onwards.
+        """
+        tables = self.fixtures.get(tuple(schools), {})
+        year_index = COLUMNS.index("Year")
+        return [
+            [row for row in tables.get(table_type, []) if int(row[year_index]) >= int(from_year)]
+            for table_type in TABLE_TYPES
+        ]
+
+    def _handler(self):
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                fixture.requests.append(self.path)
+                if parsed.path == "/search":
+                    self._send(200, "text/html", fixture.page.encode("utf-8"))
+                elif parsed.path == "/api/search":
+                    query = parse_qs(parsed.query)
+                    schools = [s for s in query.get("schools", [""])[0].split("|") if s]
+                    time.sleep(fixture.delay(self.path))
+                    if random.random() < fixture.error_rate:
+                        self._send(fixture.error_status, "text/plain", b"try again later")
+                        return
+                    body = {"columns": COLUMNS, "tables": fixture.search_results(schools, query.get("from", ["1990"])[0])}
+                    self._send(200, "application/json", json.dumps(body).encode("utf-8"))
+                else:
+                    self._send(404, "text/plain", b"not found")
+
+            def _send(self, status, content_type, body):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def recording_key(path):
+    """
+    Normalize a request path so recordings match regardless of query parameter order.
+    """
+    parsed = urlparse(path)
+    query = sorted((key, value) for key, values in parse_qs(parsed.query).items() for value in values)
+    return parsed.path + ("?" + urlencode(query) if query else "")
+
+
+def record_response(response, recordings):
+    """
+    Add a `requests` response to a recordings dict (save it with json.dump to replay later).
+    """
+    parsed = urlparse(response.url)
+    key = recording_key(parsed.path + ("?" + parsed.query if parsed.query else ""))
+    recordings[key] = {
+        "status": response.status_code,
+        "content_type": response.headers.get("Content-Type", "text/html"),
+        "body": response.text,
+    }
+    return recordings
+
+
+class ReplayServer(FixtureServer):
+    """
+    Local HTTP server that replays recorded responses, keyed by path and query.
+    Unrecorded requests get a 404. A recording with an "etag" is sent with that ETag and
+    answered with 304 Not Modified when a request's If-None-Match matches it.
+
+    Parameters:
+    recordings (dict | str): Recordings as built by record_response, or a JSON file of them.
+    latency (float | tuple | callable): Delay before every response, as for FixtureServer.
+    port (int): Port to listen on (0 picks a free port).
+    """
+
+    def __init__(self, recordings, latency=0.0, port=0):
+        if isinstance(recordings, str):
+            with open(recordings) as file:
+                recordings = json.load(file)
+        self.recordings = {recording_key(key): value for key, value in recordings.items()}
+        super().__init__({}, latency=latency, port=port)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def _handler(self):
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fixture.requests.append(self.path)
+                time.sleep(fixture.delay(self.path))
+                recording = fixture.recordings.get(recording_key(self.path))
+                etag = None
+                if recording is None:
+                    status, content_type, body = 404, "text/plain", "not recorded"
+                else:
+                    status, content_type, body = recording["status"], recording["content_type"], recording["body"]
+                    etag = recording.get("etag")
+                    if etag is not None and self.headers.get("If-None-Match") == etag:
+                        status, body = 304, ""
+                body = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                if etag is not None:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
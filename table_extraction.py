@@ -0,0 +1,103 @@
+import pandas as pd
+
+# Result tables in the order they appear on the page, and their columns
+TABLE_TYPES = ["Business School Faculty", "Non-Business School Faculty"]
+COLUMNS = ["Journal", "Article", "Author", "Year", "Volume"]
+
+# Returns every table on the page as a list of rows, each row the innerText of its <td> cells.
+# One execute_script call replaces a find_elements + .text round trip per cell.
+EXTRACT_TABLES_JS = """
+return Array.from(document.getElementsByTagName("table")).map(function (table) {
+    return Array.from(table.getElementsByTagName("tr")).map(function (row) {
+        return Array.from(row.getElementsByTagName("td")).map(function (cell) {
+            return cell.innerText.trim();
+        });
+    });
+});
+"""
+
+
+class ColumnarBuffer:
+    """
+    Accumulates records column by column, so tables are built without per-row DataFrames.
+
+    Parameters:
+    columns (list): Column names, in order.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.data = {column: [] for column in self.columns}
+
+    def __len__(self):
+        return len(self.data[self.columns[0]]) if self.columns else 0
+
+    def append(self, values):
+        for column, value in zip(self.columns, values):
+            self.data[column].append(value)
+
+    def extend(self, rows):
+        """
+        Append rows whose length matches the columns; anything else (header rows, spacer
+        rows) is skipped.
+        """
+        width = len(self.columns)
+        for row in rows:
+            if len(row) == width:
+                self.append(row)
+
+    def to_frame(self):
+        return pd.DataFrame(self.data, columns=self.columns)
+
+    def clear(self):
+        for values in self.data.values():
+            values.clear()
+
+
+def extract_tables_script(driver):
+    """
+    Read the cell text of every table on the page in a single WebDriver round trip.
+
+    Returns:
+    list: One list of rows per table, each row a list of cell strings.
+    """
+    return driver.execute_script(EXTRACT_TABLES_JS)
+
+
+def parse_tables_html(html):
+    """
+    Parse the cell text of every table in an HTML document (e.g. driver.page_source or a
+    saved fixture) with lxml. Line breaks (<br>) inside cells are kept as newlines, matching
+    what the browser reports for the multi-author cells.
+
+    Returns:
+    list: One list of rows per table, each row a list of cell strings.
+    """
+    import lxml.html
+
+    document = lxml.html.fromstring(html)
+    for br in document.iter("br"):
+        br.tail = "\n" + (br.tail or "")
+
+    return [
+        [[cell.text_content().strip() for cell in row.iter("td")] for row in table.iter("tr")]
+        for table in document.iter("table")
+    ]
+
+
+def tables_to_frames(raw_tables):
+    """
+    Turn raw tables into the scrapers' DataFrames.
+
+    Parameters:
+    raw_tables (list): Tables as returned by extract_tables_script or parse_tables_html.
+
+    Returns:
+    dict: Table type -> DataFrame with the COLUMNS (Journal, Article, Author, Year, Volume).
+    """
+    results = {}
+    for table_type, rows in zip(TABLE_TYPES, raw_tables):
+        buffer = ColumnarBuffer(COLUMNS)
+        buffer.extend(rows)
+        results[table_type] = buffer.to_frame()
+    return results
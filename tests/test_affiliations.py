@@ -0,0 +1,83 @@
+import os
+import sys
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from affiliations import collaboration_matrix, collaboration_pairs, explode_authors  # noqa: E402
+from citation_crawler import normalize_title  # noqa: E402
+
+FACULTY_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Non_Business_Faculty_Data.csv")
+
+ARTICLES = pd.DataFrame({
+    "School": ["School A", "School B", "School A", "Brigham Young University - Idaho", "School B", "School A"],
+    "Article": ["Shared Paper", "Shared  paper", "Solo", "Idaho Paper", "Idaho Paper", "Shared Paper"],
+    "Author": [
+        "Ann - School A\nBob - School B",
+        "Ann - School A\nBob -  School B",
+        "Amy - School A\nNo Affiliation",
+        "Ida - Brigham Young University - Idaho\nBen - School B\nAnn - School A",
+        None,
+        "Ann - School A\nBob - School B",
+    ],
+    "Year": [2020, 2020, 2021, 2022, 2022, 2023],
+})
+
+
+def loop_collaboration_matrix(articles, schools, first_year=None, last_year=None):
+    """
+    Reference implementation in plain Python: collect the co-author schools of every article
+    (a paper listed under several schools shares their author lines), then count the
+    distinct articles of each (home, co-author school) pair.
+    """
+    index = {school: i for i, school in enumerate(schools)}
+    rows = list(articles[["School", "Article", "Author", "Year"]].itertuples(index=False))
+    coauthor_schools = defaultdict(set)
+    for _, title, authors, year in rows:
+        for line in authors.split("\n") if isinstance(authors, str) else []:
+            _, separator, school = line.partition(" - ")
+            school = " ".join(school.split())
+            if separator and school in index:
+                coauthor_schools[normalize_title(title), str(year)].add(school)
+
+    articles_by_pair = defaultdict(set)
+    for home, title, _, year in rows:
+        if home not in index:
+            continue
+        if (first_year is not None and year < first_year) or (last_year is not None and year > last_year):
+            continue
+        key = (normalize_title(title), str(year))
+        for school in coauthor_schools[key] - {home}:
+            articles_by_pair[index[home], index[school]].add(key)
+    matrix = np.zeros((len(schools), len(schools)), dtype=np.int64)
+    for (i, j), keys in articles_by_pair.items():
+        matrix[i, j] = len(keys)
+    return matrix
+
+
+def test_explode_authors_splits_names_and_schools():
+    affiliations = explode_authors(ARTICLES)
+    assert affiliations["author"].tolist()[:2] == ["Ann", "Bob"]
+    idaho = affiliations[affiliations["author"] == "Ida"]["school"].tolist()
+    assert idaho == ["Brigham Young University - Idaho"]
+    assert affiliations[affiliations["author"] == "No Affiliation"]["school"].isna().all()
+
+
+@pytest.mark.parametrize("first_year, last_year", [(None, None), (2021, None), (None, 2022)])
+def test_collaboration_matrix_matches_the_loop(first_year, last_year):
+    schools = sorted(ARTICLES["School"].unique())
+    pairs = collaboration_pairs(ARTICLES, schools)
+    expected = loop_collaboration_matrix(ARTICLES, schools, first_year, last_year)
+    np.testing.assert_array_equal(collaboration_matrix(pairs, len(schools), first_year, last_year), expected)
+
+
+def test_collaboration_matrix_matches_the_loop_on_the_faculty_data():
+    articles = pd.read_csv(FACULTY_CSV, usecols=["School", "Article", "Author", "Year"])
+    schools = sorted(articles["School"].dropna().unique())
+    matrix = collaboration_matrix(collaboration_pairs(articles, schools), len(schools))
+    np.testing.assert_array_equal(matrix, loop_collaboration_matrix(articles, schools))
+    assert matrix.sum() > 0
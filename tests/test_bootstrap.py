@@ -0,0 +1,66 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from affiliations import collaboration_matrix, collaboration_pairs  # noqa: E402
+from bootstrap import bootstrap_inputs, bootstrap_rank_stability, replicate_matrix  # noqa: E402
+
+SCHOOLS = ["School A", "School B", "School C"]
+
+ARTICLES = pd.DataFrame({
+    "School": ["School A", "School B", "School A", "School C", "School B", "School C", "School A"],
+    "Article": ["Shared", "Shared", "Solo A", "Solo C", "B and C", "B and C", "Late"],
+    "Author": [
+        "Ann - School A\nBob - School B",
+        "Ann - School A\nBob - School B",
+        "Amy - School A",
+        "Cat - School C\nCal - School C",
+        "Ben - School B\nCat - School C",
+        "Ben - School B\nCat - School C",
+        "Ann - School A\nCat - School C",
+    ],
+    "Year": [2020, 2020, 2021, 2021, 2022, 2022, 2024],
+})
+
+
+def test_records_without_collaborations_are_part_of_the_population():
+    cells, records, num_records, schools = bootstrap_inputs(ARTICLES, SCHOOLS)
+    # Every (article, school) listing is a record, including the two single-school papers
+    assert num_records == len(ARTICLES)
+    assert len(np.unique(records)) == 5
+    assert schools == SCHOOLS
+
+    _, _, num_windowed, _ = bootstrap_inputs(ARTICLES, SCHOOLS, first_year=2021, last_year=2022)
+    assert num_windowed == 4
+
+
+def test_unit_weights_reproduce_the_collaboration_matrix():
+    cells, records, num_records, schools = bootstrap_inputs(ARTICLES, SCHOOLS)
+    expected = collaboration_matrix(collaboration_pairs(ARTICLES, SCHOOLS), len(SCHOOLS))
+    np.testing.assert_array_equal(replicate_matrix(cells, records, num_records, len(SCHOOLS)), expected)
+
+
+def test_replicate_counts_each_pair_once_per_draw_of_its_record():
+    cells, records, num_records, schools = bootstrap_inputs(ARTICLES, SCHOOLS)
+    n = len(SCHOOLS)
+    weights = replicate_matrix(cells, records, num_records, n, np.random.default_rng(7))
+
+    draws = np.random.default_rng(7).integers(0, num_records, num_records)
+    expected = np.zeros(n * n)
+    for record in draws:
+        np.add.at(expected, cells[records == record], 1)
+    np.testing.assert_array_equal(weights, expected.reshape(n, n))
+
+
+def test_rank_stability_counts_every_replicate():
+    result = bootstrap_rank_stability(ARTICLES, SCHOOLS, num_replicates=12, num_tiers=2, batch_size=4,
+                                      max_workers=2)
+    rank_counts = result["rank_counts"].to_numpy()
+    assert (rank_counts.sum(axis=1) == 12).all()
+    assert (rank_counts.sum(axis=0) == 12).all()
+    assert len(result["objectives"]) == 12
+    assert np.allclose(np.diag(result["comembership"].to_numpy()), 1.0)
@@ -0,0 +1,105 @@
+import asyncio
+import csv
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from citation_crawler import CitationCrawler, parse_results_page  # noqa: E402
+from stub_server import ReplayServer  # noqa: E402
+
+RATE = 5.0
+
+
+def html_page(body):
+    return {"status": 200, "content_type": "text/html; charset=utf-8", "body": f"<html><body>{body}</body></html>"}
+
+
+def search_page(cited_by_url):
+    return html_page(f'<div class="gs_ri"><h3>Paper</h3><div class="gs_a">A Author</div></div>'
+                     f'<a href="{cited_by_url}">Cited by 25</a>')
+
+
+def cited_by_page(start, count=25):
+    results = "".join(
+        f'<div class="gs_ri"><h3>Citing {i}</h3><div class="gs_a">C Author{i} - Journal, 2024</div></div>'
+        for i in range(start, min(start + 10, count))
+    )
+    return html_page(f'<div id="gs_ab_md">About {count} results</div>{results}')
+
+
+class TimedReplayServer(ReplayServer):
+    """
+    ReplayServer that also records when every request arrived.
+    """
+
+    def __init__(self, recordings):
+        self.arrivals = []
+        super().__init__(recordings, latency=self._arrived)
+
+    def _arrived(self, path):
+        self.arrivals.append(time.monotonic())
+        return 0.0
+
+
+def run_crawl(crawler, titles):
+    output = io.StringIO()
+    written = asyncio.run(crawler.crawl(titles, csv.writer(output)))
+    return written, list(csv.reader(io.StringIO(output.getvalue())))
+
+
+def test_parse_failures_are_failed_fetches_and_good_hosts_still_complete():
+    with TimedReplayServer({}) as good, TimedReplayServer({}) as bad, TimedReplayServer({}) as search:
+        search.recordings.update({
+            "/scholar?q=Good+paper": search_page(good.base_url + "/scholar?cites=1"),
+            "/scholar?q=Bad+paper": search_page(bad.base_url + "/scholar?cites=2"),
+            "/scholar?q=Empty+paper": {"status": 200, "content_type": "text/html", "body": ""},
+        })
+        good.recordings.update({
+            "/scholar?cites=1": cited_by_page(0),
+            "/scholar?cites=1&start=10": cited_by_page(10),
+            "/scholar?cites=1&start=20": cited_by_page(20),
+        })
+        # An empty 200 body makes lxml raise ParserError
+        bad.recordings["/scholar?cites=2"] = {"status": 200, "content_type": "text/html", "body": ""}
+
+        crawler = CitationCrawler(base_url=search.base_url, concurrency=4, rate=RATE, max_retries=1)
+        written, rows = run_crawl(crawler, ["Good paper", "Bad paper", "Empty paper"])
+
+    assert written == 25
+    assert {row[0] for row in rows} == {"Good paper"}
+    assert sorted(row[1] for row in rows) == sorted(f"Citing {i}" for i in range(25))
+
+    limiters = {host.split(":")[-1]: limiter for host, limiter in crawler.limiters.items()}
+    bad_limiter = limiters[str(bad._server.server_port)]
+    assert bad_limiter.stats["failures"] == 2  # the first attempt and one retry
+    assert limiters[str(good._server.server_port)].stats["failures"] == 0
+    assert len(bad.arrivals) == 2
+
+
+def test_requests_are_rate_limited_per_host():
+    with TimedReplayServer({}) as good, TimedReplayServer({}) as search:
+        search.recordings["/scholar?q=Good+paper"] = search_page(good.base_url + "/scholar?cites=1")
+        good.recordings.update({
+            "/scholar?cites=1": cited_by_page(0),
+            "/scholar?cites=1&start=10": cited_by_page(10),
+            "/scholar?cites=1&start=20": cited_by_page(20),
+        })
+        crawler = CitationCrawler(base_url=search.base_url, concurrency=4, rate=RATE, max_retries=0)
+        run_crawl(crawler, ["Good paper"])
+
+    # The two remaining pages are requested together, but the host's limiter spaces them out
+    assert len(good.arrivals) == 3
+    gaps = [later - earlier for earlier, later in zip(good.arrivals, good.arrivals[1:])]
+    assert min(gaps) >= 0.9 / RATE
+    assert len(crawler.limiters) == 2
+
+
+def test_parse_results_page_reads_count_and_links():
+    page = parse_results_page(search_page("/scholar?cites=7")["body"], "http://scholar.test")
+    assert page["results"] == [("Paper", "A Author")]
+    assert page["cited_by"] == "http://scholar.test/scholar?cites=7"
+    assert page["count"] is None and not page["blocked"]
+    assert parse_results_page(cited_by_page(0)["body"])["count"] == 25
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from affiliations import explode_authors  # noqa: E402
+from citation_flow import CITATION_COLUMNS, build_citation_flow  # noqa: E402
+
+SCHOOLS = ["School A", "School B", "School C"]
+
+ARTICLES = pd.DataFrame({
+    "School": ["School A", "School B", "School C"],
+    "Article": ["Paper A", "Paper B", "Paper C"],
+    "Author": ["Ann Smith - School A", "Bob Jones - School B", "Cat Brown - School C"],
+    "Year": [2020, 2021, 2022],
+})
+
+CITATIONS = pd.DataFrame([
+    # Paper A is cited by a B paper and a B/C paper; the second is scraped twice
+    ["Paper A", "Citing one", "B Jones - Journal, 2023 - site.com"],
+    ["Paper A", "Citing two", "B Jones, C Brown - Journal, 2023 - site.com"],
+    ["Paper B", "Citing three", "A Smith - Journal, 2023"],
+    ["Paper B", "Citing four", "B Jones - Journal, 2023"],
+    ["Paper A", "Citing two!", "B Jones, C Brown - Journal, 2023 - site.com"],
+    ["Not a faculty paper", "Citing five", "A Smith - Journal"],
+    ["paper b", "Citing three", "A Smith - Journal, 2023"],
+], columns=CITATION_COLUMNS)
+
+EXPECTED = np.array([
+    [0, 2, 1],
+    [1, 0, 0],
+    [0, 0, 0],
+])
+
+
+@pytest.mark.parametrize("chunk_rows, num_buckets", [(len(CITATIONS), 16), (2, 1), (1, 3)])
+def test_repeated_citations_count_once_across_chunks(tmp_path, chunk_rows, num_buckets):
+    path = tmp_path / "citations.csv"
+    CITATIONS.to_csv(path, index=False)
+    affiliations = explode_authors(ARTICLES, schools=SCHOOLS)
+
+    flow, schools = build_citation_flow(str(path), ARTICLES, affiliations, SCHOOLS, chunksize=chunk_rows,
+                                        num_buckets=num_buckets, spill_dir=str(tmp_path))
+    assert schools == SCHOOLS
+    np.testing.assert_array_equal(flow.toarray(), EXPECTED)
+    # The bucket files are removed with their temporary directory
+    assert os.listdir(tmp_path) == ["citations.csv"]
+
+
+def test_self_citations_are_kept_on_request():
+    affiliations = explode_authors(ARTICLES, schools=SCHOOLS)
+    flow, _ = build_citation_flow([CITATIONS], ARTICLES, affiliations, SCHOOLS, include_self=True)
+    expected = EXPECTED.copy()
+    expected[1, 1] = 1
+    np.testing.assert_array_equal(flow.toarray(), expected)
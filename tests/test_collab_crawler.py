@@ -0,0 +1,147 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import collab_crawler  # noqa: E402
+import ut_search  # noqa: E402
+from collab_crawler import crawl_pairs  # noqa: E402
+from politeness import AdaptiveRateLimiter  # noqa: E402
+from stub_server import FixtureServer  # noqa: E402
+from table_extraction import TABLE_TYPES, tables_to_frames  # noqa: E402
+
+SCHOOLS = ["School A", "School B", "School C", "School D"]
+PAIRS = [(a, b) for i, a in enumerate(SCHOOLS) for b in SCHOOLS[i + 1:]]
+
+
+def fixture_rows(pair):
+    return {
+        TABLE_TYPES[0]: [["Journal", f"{pair[0]} and {pair[1]}", "Chen, Ying\nLee, Sang", "2021", "1"]],
+        TABLE_TYPES[1]: [["Journal", f"{pair[1]} only", "Smith, John", "2019", "2"]],
+    }
+
+
+FIXTURES = {pair: fixture_rows(pair) for pair in PAIRS}
+
+
+class FakeDriver:
+    """
+    Stands in for a WebDriver: records the calls reset_driver makes and keeps the
+    schools "selected" on the page until the page is reloaded.
+    """
+
+    created = []
+
+    def __init__(self):
+        self.calls = []
+        self.selected = []
+        self.closed = False
+        FakeDriver.created.append(self)
+
+    def delete_all_cookies(self):
+        self.calls.append("delete_all_cookies")
+
+    def execute_script(self, script):
+        self.calls.append("clear_storage")
+
+    def get(self, url):
+        self.calls.append(("get", url))
+        self.selected = []
+
+    def quit(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_browser(monkeypatch):
+    """
+    Replace the page interaction with the fixture server's search API. The real
+    reset_driver still runs before every query, and a query on a page that was not reset
+    sees the schools selected by the previous one.
+    """
+    FakeDriver.created = []
+    starts = []
+    lock = threading.Lock()
+
+    def search_schools(driver, schools, from_year="1990", url=ut_search.SEARCH_URL):
+        with lock:
+            starts.append(time.monotonic())
+        ut_search.reset_driver(driver, url)
+        driver.selected.extend(schools)
+        api_url = url.replace("/search", "/api/search")
+        response = requests.get(api_url, params={"schools": "|".join(driver.selected), "from": from_year}, timeout=5)
+        response.raise_for_status()
+        data = response.json()
+        return tables_to_frames(data["tables"])
+
+    monkeypatch.setattr(collab_crawler, "search_schools", search_schools)
+    return starts
+
+
+def test_driver_pool_reuses_drivers_and_resets_state(fake_browser):
+    with FixtureServer(FIXTURES) as server:
+        results = list(crawl_pairs(PAIRS, num_workers=2, url=server.url, make_driver=FakeDriver,
+                                   limiter=AdaptiveRateLimiter(rate=100.0)))
+
+    assert sorted(pair for pair, _, _ in results) == sorted(PAIRS)
+    for pair, tables, error in results:
+        assert error is None
+        assert tables[TABLE_TYPES[0]]["Article"].tolist() == [f"{pair[0]} and {pair[1]}"]
+        assert tables[TABLE_TYPES[0]]["Author"].tolist() == ["Chen, Ying\nLee, Sang"]
+
+    # One long-lived driver per worker, reset before every query and closed at the end
+    assert len(FakeDriver.created) == 2
+    assert all(driver.closed for driver in FakeDriver.created)
+    resets = sum(driver.calls.count("delete_all_cookies") for driver in FakeDriver.created)
+    assert resets == len(PAIRS)
+
+
+def test_failed_query_relaunches_the_driver(fake_browser):
+    with FixtureServer(FIXTURES, error_rate=1.0) as server:
+        results = list(crawl_pairs(PAIRS[:1], num_workers=1, url=server.url, make_driver=FakeDriver,
+                                   max_retries=2, limiter=AdaptiveRateLimiter(rate=100.0, max_backoff=0.0)))
+
+    (pair, tables, error), = results
+    assert tables is None and error is not None
+    assert len(FakeDriver.created) == 3
+    assert all(driver.closed for driver in FakeDriver.created)
+
+
+def test_query_starts_respect_the_rate_limit(fake_browser):
+    interval = 0.2
+    with FixtureServer(FIXTURES) as server:
+        list(crawl_pairs(PAIRS, num_workers=3, min_interval=interval, url=server.url, make_driver=FakeDriver))
+
+    gaps = [later - earlier for earlier, later in zip(fake_browser, fake_browser[1:])]
+    assert len(fake_browser) == len(PAIRS)
+    assert min(gaps) >= 0.8 * interval
+
+
+@pytest.fixture(scope="session")
+def real_browser():
+    """
+    Skip unless a headless Chrome can actually be launched. The probe only runs when a
+    browser test is selected, not at collection time.
+    """
+    try:
+        driver = ut_search.make_driver()
+    except Exception:
+        pytest.skip("Chrome and chromedriver are not available")
+    driver.quit()
+
+
+def test_crawl_pairs_in_the_browser(real_browser):
+    with FixtureServer(FIXTURES) as server:
+        results = list(crawl_pairs(PAIRS, num_workers=2, url=server.url, limiter=AdaptiveRateLimiter(rate=5.0)))
+
+    assert sorted(pair for pair, _, _ in results) == sorted(PAIRS)
+    for pair, tables, error in results:
+        assert error is None
+        for table_type in TABLE_TYPES:
+            # Authors are <br>-separated on the page and come back one per line
+            assert tables[table_type].values.tolist() == FIXTURES[pair][table_type]
@@ -0,0 +1,73 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import UT_collab  # noqa: E402
+from crawl_checkpoint import CheckpointStore, canonical_pair, plan_pairs  # noqa: E402
+from record_sink import read_sink  # noqa: E402
+from stub_server import FixtureServer  # noqa: E402
+from table_extraction import TABLE_TYPES  # noqa: E402
+from ut_http_client import UTSearchClient  # noqa: E402
+
+SCHOOLS = ["School D", "School A", "School C", "School B"]
+
+
+def fixture_rows(pair):
+    return {
+        TABLE_TYPES[0]: [["Journal", f"{pair[0]} with {pair[1]}", "Chen, Ying", "2021", "1"]],
+        TABLE_TYPES[1]: [["Journal", f"{pair[1]} with {pair[0]}", "Lee, Sang", "2019", "2"]],
+    }
+
+
+def test_plan_pairs_lists_each_unordered_pair_once():
+    pairs = plan_pairs(SCHOOLS + ["School A"])
+    assert len(pairs) == 6
+    assert all(pair == canonical_pair(*reversed(pair)) for pair in pairs)
+
+
+def test_interrupted_crawl_resumes_with_the_remaining_pairs(tmp_path, monkeypatch):
+    pairs = plan_pairs(SCHOOLS)
+    fixtures = {pair: fixture_rows(pair) for pair in pairs}
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(UT_collab, "schools", SCHOOLS)
+    monkeypatch.setattr(UT_collab, "NUM_WORKERS", 1)
+
+    requested = []
+    search_pairs = UTSearchClient.search_pairs
+    interrupt_after = [2]
+
+    def interruptible(self, pending, **kwargs):
+        requested.append(list(pending))
+        for count, result in enumerate(search_pairs(self, pending, **kwargs)):
+            if count == interrupt_after[0]:
+                raise KeyboardInterrupt
+            yield result
+
+    monkeypatch.setattr(UTSearchClient, "search_pairs", interruptible)
+    with FixtureServer(fixtures) as server:
+        monkeypatch.setattr(UT_collab, "SEARCH_API_URL", server.url.replace("/search", "/api/search"))
+        with pytest.raises(KeyboardInterrupt):
+            UT_collab.main()
+
+        store = CheckpointStore(UT_collab.CHECKPOINT_PATH)
+        done = store.completed_pairs()
+        store.close()
+        assert len(done) == 2
+
+        interrupt_after[0] = None
+        UT_collab.main()
+
+    # The resumed run only searches the pairs the first one did not finish
+    assert requested[0] == pairs
+    assert requested[1] == [pair for pair in pairs if pair not in done]
+
+    # Every ordered pair is written, (B, A) rebuilt from the stored (A, B)
+    for table_type, directory in UT_collab.OUTPUT_DIRS.items():
+        rows = read_sink(directory)
+        assert len(rows) == len(SCHOOLS) * (len(SCHOOLS) - 1)
+        for school, next_school, article in rows[["School", "Next School", "Article"]].itertuples(index=False):
+            expected = fixture_rows(canonical_pair(school, next_school))[table_type][0][1]
+            assert article == expected
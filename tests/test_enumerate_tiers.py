@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from enumerate_tiers import enumerate_sequential_tier_splits, enumerate_tier_splits_parallel  # noqa: E402
+from graph_generators import random_complete_matrix  # noqa: E402
+
+
+@pytest.mark.parametrize("num_nodes, num_tiers", [(7, 3), (6, 2), (4, 4), (5, 1), (2, 3)])
+def test_parallel_matches_sequential(num_nodes, num_tiers):
+    weights = random_complete_matrix(num_nodes, low=1, high=9, seed=num_nodes)
+    expected = enumerate_sequential_tier_splits(num_nodes, num_tiers, weights, verbose=False)
+    assert enumerate_tier_splits_parallel(num_nodes, num_tiers, weights, max_workers=2) == expected
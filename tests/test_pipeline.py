@@ -0,0 +1,80 @@
+import importlib
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline import Stage, run_pipeline  # noqa: E402
+
+STAGE_MODULE = '''
+def copy_stage(source, target):
+    from fixture_helper import transform
+
+    with open(source) as file:
+        text = transform(file.read())
+    with open(target, "w") as file:
+        file.write(text)
+'''
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    (tmp_path / "fixture_stage.py").write_text(STAGE_MODULE)
+    (tmp_path / "fixture_helper.py").write_text("from fixture_kernel import transform\n")
+    (tmp_path / "fixture_kernel.py").write_text("def transform(text):\n    return text\n")
+    (tmp_path / "input.txt").write_text("rows\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield tmp_path
+    for name in ("fixture_stage", "fixture_helper", "fixture_kernel"):
+        sys.modules.pop(name, None)
+
+
+def _run(project):
+    stage_module = importlib.import_module("fixture_stage")
+    stages = [Stage("copy", stage_module.copy_stage, inputs={"source": "input.txt"}, outputs={"target": "output.txt"})]
+    records = run_pipeline(stages, max_workers=1, state_path="state.json", report_path=None)
+    return records[0]["status"]
+
+
+def test_editing_an_indirect_dependency_reruns_the_stage(project):
+    assert _run(project) == "ran"
+    assert _run(project) == "skipped"
+
+    # fixture_kernel is only reached through fixture_helper
+    (project / "fixture_kernel.py").write_text("def transform(text):\n    return text.upper()\n")
+    assert _run(project) == "ran"
+    assert (project / "output.txt").read_text() == "ROWS\n"
+
+
+def test_unused_file_hashes_are_pruned(project):
+    _run(project)
+    (project / "input.txt").write_text("other rows\n")
+    _run(project)
+
+    with open(project / "state.json") as file:
+        files = json.load(file)["files"]
+    input_keys = [key for key in files if key.startswith(str(project / "input.txt"))]
+    assert len(input_keys) == 1
+
+
+def test_failed_ranking_leaves_previous_output(tmp_path, monkeypatch):
+    import pandas as pd
+
+    import run_bfasp
+    from pipeline import ranking_stage
+
+    matrix, ranking = tmp_path / "matrix.csv", tmp_path / "ranking.json"
+    pd.DataFrame([[0, 1], [0, 0]], index=["A", "B"], columns=["A", "B"]).to_csv(matrix)
+    ranking.write_text('{"order": ["A", "B"]}')
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("Model too large for size-limited license")
+
+    monkeypatch.setattr(run_bfasp, "rank_schools", fail)
+    with pytest.raises(RuntimeError):
+        ranking_stage(str(matrix), str(ranking))
+    assert json.loads(ranking.read_text()) == {"order": ["A", "B"]}
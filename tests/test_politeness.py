@@ -0,0 +1,120 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from politeness import AdaptiveRateLimiter, TokenBucket  # noqa: E402
+from stub_server import FixtureServer  # noqa: E402
+
+MAX_RATE = 40.0
+TARGET_LATENCY = 0.05
+
+
+@pytest.fixture
+def server():
+    fixtures = {("School A", "School B"): {"Business School Faculty": [["J", "A", "Author", "2020", "1"]]}}
+    with FixtureServer(fixtures, error_status=429) as server:
+        yield server
+
+
+def make_limiter():
+    return AdaptiveRateLimiter(rate=MAX_RATE, min_rate=1.0, target_latency=TARGET_LATENCY, max_backoff=0.05)
+
+
+def send(server, limiter, count):
+    """
+    Send `count` limited requests to the stub's search API, reporting each to the limiter.
+    Returns the rate after every request.
+    """
+    api_url = server.url.replace("/search", "/api/search")
+    rates = []
+    for _ in range(count):
+        limiter.wait()
+        start = time.monotonic()
+        response = requests.get(api_url, params={"schools": "School A|School B"}, timeout=5)
+        limiter.record(time.monotonic() - start, ok=response.status_code == 200)
+        rates.append(limiter.rate)
+    return rates
+
+
+def test_slow_responses_halve_the_rate_and_fast_ones_restore_it(server):
+    limiter = make_limiter()
+    server.latency = 2 * TARGET_LATENCY
+    slow = send(server, limiter, 3)
+    assert slow == [MAX_RATE / 2, MAX_RATE / 4, MAX_RATE / 8]
+    assert limiter.stats["slowdowns"] == 3
+
+    server.latency = 0.0
+    recovered = send(server, limiter, 12)
+    # Additive increase of a tenth of the maximum rate per fast response, capped at the maximum
+    assert recovered[0] == pytest.approx(MAX_RATE / 8 + MAX_RATE / 10)
+    assert all(later >= earlier for earlier, later in zip(recovered, recovered[1:]))
+    assert recovered[-1] == MAX_RATE
+
+
+def test_throttled_responses_back_off_and_recover(server):
+    limiter = make_limiter()
+    server.error_rate = 1.0
+    throttled = send(server, limiter, 4)
+    assert throttled[-1] == MAX_RATE / 16
+    assert limiter.stats["failures"] == 4
+
+    server.error_rate = 0.0
+    start = time.monotonic()
+    recovered = send(server, limiter, 12)
+    assert recovered[-1] == MAX_RATE
+    assert limiter.stats["failures"] == 4
+    # The reduced rate spaces out the first requests after the errors
+    assert time.monotonic() - start >= 1 / (MAX_RATE / 16)
+
+
+def test_rate_never_drops_below_the_minimum(server):
+    limiter = AdaptiveRateLimiter(rate=4.0, min_rate=1.0, target_latency=TARGET_LATENCY, max_backoff=0.01)
+    server.error_rate = 1.0
+    assert send(server, limiter, 4)[-1] == 1.0
+
+
+def test_token_bucket_spaces_requests():
+    bucket = TokenBucket(rate=20.0)
+    delays = [bucket.reserve() for _ in range(5)]
+    assert delays[0] == 0
+    assert delays[-1] == pytest.approx(4 / 20.0, abs=0.01)
+
+
+def test_jittered_concurrent_waiters_keep_the_nominal_spacing():
+    rate = 20.0
+    limiter = AdaptiveRateLimiter(rate=rate, jitter=1.0)
+    released = []
+    lock = threading.Lock()
+
+    def worker():
+        limiter.wait()
+        with lock:
+            released.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    released.sort()
+    gaps = [later - earlier for earlier, later in zip(released, released[1:])]
+    assert min(gaps) >= 0.9 / rate
+
+
+def test_rate_changes_credit_earned_tokens_at_the_old_rate():
+    bucket = TokenBucket(rate=10.0, capacity=5)
+    for _ in range(5):
+        bucket.reserve()
+    time.sleep(0.2)
+    bucket.set_rate(1.0)
+    # Two tokens were earned at 10/s before the change; at 1/s there would be a fifth of one
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() > 0.5
@@ -0,0 +1,66 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from publication_store import (  # noqa: E402
+    FACULTY_COLUMNS, append_publications, convert_csv, load_csv, load_publications,
+)
+
+ROWS = pd.DataFrame([
+    ["School A", "Journal X", "First Paper", "Ann - School A\nBob - School B", 2020, "1"],
+    ["School B", "Journal Y", "Second Paper", "Bob - School B", 2021, "2"],
+    ["School A", "Journal Y", "Third Paper", "Amy - School A", 2022, "3"],
+    ["School C", "Journal X", "Fourth Paper", "Cat - School C\nAnn - School A", 2022, "4"],
+], columns=FACULTY_COLUMNS)
+
+
+def comparable(frame):
+    frame = frame[sorted(frame.columns)].astype(str)
+    return frame.sort_values(list(frame.columns)).reset_index(drop=True)
+
+
+@pytest.fixture
+def store(tmp_path):
+    csv_path = str(tmp_path / "faculty.csv")
+    ROWS.to_csv(csv_path, index=False)
+    root = str(tmp_path / "dataset")
+    convert_csv(csv_path, root, block_size=64)
+    return csv_path, root
+
+
+def test_round_trip_keeps_every_row(store):
+    csv_path, root = store
+    assert sorted(os.listdir(root)) == ["Year=2020", "Year=2021", "Year=2022"]
+    loaded = load_publications(root)
+    assert isinstance(loaded["School"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(comparable(loaded), comparable(ROWS))
+
+
+@pytest.mark.parametrize("columns, years, schools", [
+    (["School", "Author", "Year"], (2021, None), None),
+    (None, [2020, 2022], ["School A"]),
+    (["Article", "Year"], (None, 2021), ["School B", "School C"]),
+])
+def test_pruned_loads_match_the_csv(store, columns, years, schools):
+    csv_path, root = store
+    loaded = load_publications(root, columns=columns, years=years, schools=schools)
+    expected = load_csv(csv_path, columns=columns, years=years, schools=schools)
+    assert list(loaded.columns) == list(columns or FACULTY_COLUMNS)
+    pd.testing.assert_frame_equal(comparable(loaded), comparable(expected))
+
+
+def test_append_and_reconvert(store):
+    csv_path, root = store
+    new = pd.DataFrame([["School B", "Journal Z", "Fifth Paper", "Bob - School B", 2023, "5"]], columns=FACULTY_COLUMNS)
+    append_publications(new, root)
+    assert len(load_publications(root)) == len(ROWS) + 1
+    assert load_publications(root, years=[2023])["Article"].tolist() == ["Fifth Paper"]
+
+    # Converting again replaces the dataset instead of adding to it
+    convert_csv(csv_path, root)
+    assert len(load_publications(root)) == len(ROWS)
+    assert sorted(os.listdir(os.path.dirname(root))) == ["dataset", "faculty.csv"]
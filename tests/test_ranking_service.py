@@ -0,0 +1,115 @@
+import os
+import sys
+import threading
+from urllib.error import HTTPError
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graph_generators import random_tournament_matrix  # noqa: E402
+from ranking_service import RankingServer, RankingService, query_service  # noqa: E402
+
+SCHOOLS = [f"School {i}" for i in range(8)]
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    pytest.importorskip("gurobipy")
+    path = tmp_path_factory.mktemp("service") / "matrix.csv"
+    weights = random_tournament_matrix(len(SCHOOLS), seed=3)
+    pd.DataFrame(weights, index=SCHOOLS, columns=SCHOOLS).to_csv(path)
+
+    service = RankingService(str(path), max_workers=2)
+    with RankingServer(service, port=0) as server:
+        yield server
+    service.close()
+
+
+def test_repeated_query_is_a_cache_hit(server):
+    before = query_service(server.url, "stats")
+    first = query_service(server.url, "rank", schools=SCHOOLS[:6])
+    second = query_service(server.url, "rank", schools=SCHOOLS[:6])
+    after = query_service(server.url, "stats")
+
+    assert first == second
+    assert after["hits"] - before["hits"] == 1
+    assert after["cached"] == before["cached"] + 1
+
+
+def test_concurrent_identical_queries_share_one_solve(server, monkeypatch):
+    service = server.service
+    submitted = []
+    submit = service._executor.submit
+    monkeypatch.setattr(service._executor, "submit", lambda *args: submitted.append(args) or submit(*args))
+
+    results = [None] * 8
+
+    def ask(i):
+        results[i] = query_service(server.url, "rank", schools=SCHOOLS[1:], method="dominance")
+
+    threads = [threading.Thread(target=ask, args=(i,)) for i in range(len(results))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(submitted) == 1
+    assert all(result == results[0] for result in results)
+    assert query_service(server.url, "stats")["pending"] == 0
+
+
+def test_methods_report_their_objective(server):
+    bfasp = query_service(server.url, "rank", method="bfasp")
+    subset = query_service(server.url, "rank", schools=SCHOOLS[:5], method="subset")
+
+    assert bfasp["method"] == "bfasp" and bfasp["objective_type"] == "bfasp"
+    assert bfasp["objective"] == bfasp["optimal_value"] and bfasp["optimal"]
+    assert subset["method"] == "subset" and subset["objective_type"] == "backward_weight"
+    assert "optimal_value" not in subset and "bound" in subset
+
+
+@pytest.mark.parametrize("endpoint, params", [
+    ("rank", {"method": "simulated_annealing"}),
+    ("rank", {"schools": ["Not a school"]}),
+    ("tiers", {"num_tiers": "three"}),
+])
+def test_invalid_queries_are_rejected(server, endpoint, params):
+    with pytest.raises(HTTPError) as error:
+        query_service(server.url, endpoint, **params)
+    assert error.value.code == 400
+
+
+def test_rank_and_tiers_share_one_matrix_build(server):
+    matrices = server.service._matrices
+    misses = matrices.misses
+    query_service(server.url, "rank", schools=SCHOOLS[2:], method="dominance")
+    query_service(server.url, "tiers", schools=SCHOOLS[2:], method="dominance", num_tiers=2)
+    assert matrices.misses - misses == 1
+
+
+def test_cache_hits_are_not_blocked_by_a_matrix_build(server, monkeypatch):
+    service = server.service
+    cached = service.rank(SCHOOLS[:4], method="dominance")
+    building, release = threading.Event(), threading.Event()
+    matrix = service.matrix
+
+    def slow_matrix(*args):
+        building.set()
+        release.wait(10)
+        return matrix(*args)
+
+    monkeypatch.setattr(service, "matrix", slow_matrix)
+    solver = threading.Thread(target=service.rank, args=(SCHOOLS[3:], None, None, "dominance"))
+    solver.start()
+    try:
+        assert building.wait(10)
+        hit = threading.Thread(target=lambda: service.rank(SCHOOLS[:4], method="dominance"))
+        hit.start()
+        hit.join(5)
+        assert not hit.is_alive()
+        assert service.rank(SCHOOLS[:4], method="dominance") == cached
+    finally:
+        release.set()
+        solver.join()
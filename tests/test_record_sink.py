@@ -0,0 +1,55 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import UT_collab  # noqa: E402
+from crawl_checkpoint import CheckpointStore, plan_pairs  # noqa: E402
+from record_sink import RecordSink, read_sink  # noqa: E402
+from table_extraction import COLUMNS, TABLE_TYPES  # noqa: E402
+
+
+def _rows(count):
+    return pd.DataFrame({
+        "School": ["A", "B"] * (count // 2),
+        "Value": [str(i) for i in range(count)],
+    })
+
+
+def test_replace_keeps_row_count_across_runs(tmp_path):
+    root = str(tmp_path / "sink")
+    for _ in range(2):
+        with RecordSink(root, ["School", "Value"], partition_by=["School"], batch_size=3, replace=True) as sink:
+            sink.write(_rows(10))
+    assert len(read_sink(root)) == 10
+
+
+def test_append_without_replace(tmp_path):
+    root = str(tmp_path / "sink")
+    for _ in range(2):
+        with RecordSink(root, ["School", "Value"], partition_by=["School"]) as sink:
+            sink.write(_rows(10))
+    assert len(read_sink(root)) == 20
+
+
+def test_collab_rerun_does_not_duplicate_rows(tmp_path, monkeypatch):
+    schools = ["School A", "School B", "School C"]
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(UT_collab, "schools", schools)
+    monkeypatch.setattr(UT_collab, "SEARCH_API_URL", None)
+    monkeypatch.setattr(UT_collab, "crawl_pairs", lambda pending, **kwargs: iter(()))
+
+    # Checkpoint every pair so both runs only rewrite the stored rows
+    store = CheckpointStore(UT_collab.CHECKPOINT_PATH)
+    for i, pair in enumerate(plan_pairs(schools)):
+        table = pd.DataFrame([[f"Journal {i}", f"Article {i}", "Author", "2020", "1"]], columns=COLUMNS)
+        store.save_pair(pair, {table_type: table for table_type in TABLE_TYPES})
+    store.close()
+
+    counts = []
+    for _ in range(2):
+        UT_collab.main()
+        counts.append([len(read_sink(directory)) for directory in UT_collab.OUTPUT_DIRS.values()])
+    assert counts[0] == counts[1] == [6, 6]
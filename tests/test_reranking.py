@@ -0,0 +1,114 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graph_generators import random_tournament_matrix  # noqa: E402
+from recursive import solve_exact_fas_dp  # noqa: E402
+from reranking import (  # noqa: E402
+    backward_weight, bound_shift, delta_entries, incremental_rerank, rerank_subset, sift, solve_ordering_mip,
+)
+
+SEEDS = range(6)
+NUM_NODES = 9
+
+
+def random_weights(seed, num_nodes=NUM_NODES):
+    weights = random_tournament_matrix(num_nodes, seed=seed).astype(float)
+    np.fill_diagonal(weights, 0)
+    return weights
+
+
+def random_delta(weights, seed, num_arcs=4):
+    """
+    A sparse change of a few arcs that keeps every weight non-negative.
+    """
+    rng = np.random.default_rng(seed)
+    n = weights.shape[0]
+    rows = rng.integers(0, n, num_arcs)
+    cols = (rows + rng.integers(1, n, num_arcs)) % n
+    delta = np.zeros_like(weights)
+    delta[rows, cols] = np.maximum(rng.integers(-5, 6, num_arcs), -weights[rows, cols])
+    return delta
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_sift_never_worsens_an_ordering(seed):
+    weights = random_weights(seed)
+    start = np.random.default_rng(seed).permutation(NUM_NODES)
+    order, objective, _ = sift(weights, start)
+
+    assert sorted(order.tolist()) == list(range(NUM_NODES))
+    assert objective == backward_weight(weights, order)
+    assert objective <= backward_weight(weights, start)
+    assert objective >= solve_exact_fas_dp(weights)[0]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_bound_shift_is_a_valid_certificate(seed):
+    weights = random_weights(seed)
+    delta = random_delta(weights, seed)
+    shift = bound_shift(*delta_entries(delta), NUM_NODES)
+
+    # No ordering's backward weight changes by less than the shift ...
+    rng = np.random.default_rng(seed)
+    for _ in range(50):
+        order = rng.permutation(NUM_NODES)
+        assert backward_weight(weights + delta, order) - backward_weight(weights, order) >= shift - 1e-9
+    # ... so the shifted old optimum bounds the new one
+    assert solve_exact_fas_dp(weights)[0] + shift <= solve_exact_fas_dp(weights + delta)[0] + 1e-9
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_incremental_rerank_matches_a_full_resolve(seed):
+    pytest.importorskip("gurobipy")
+    weights = random_weights(seed)
+    objective, order = solve_exact_fas_dp(weights)
+    delta = random_delta(weights, seed)
+    updated = weights + delta
+
+    result = incremental_rerank(updated, order, delta, bound=objective, tolerance=1e-9, margin=2)
+    assert result["certified"]
+    assert result["objective"] == pytest.approx(solve_exact_fas_dp(updated)[0])
+    assert result["objective"] == pytest.approx(backward_weight(updated, result["order"]))
+    assert result["bound"] <= result["objective"] + 1e-9
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_repair_alone_is_never_below_the_optimum(seed):
+    weights = random_weights(seed)
+    _, order = solve_exact_fas_dp(weights)
+    delta = random_delta(weights, seed)
+    updated = weights + delta
+
+    result = incremental_rerank(updated, order, delta, bound=None, fallback=False)
+    assert result["method"] == "repair" and not result["certified"]
+    assert result["objective"] >= solve_exact_fas_dp(updated)[0] - 1e-9
+    assert result["objective"] <= result["previous_objective"]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_ordering_mip_matches_the_exact_dp(seed):
+    pytest.importorskip("gurobipy")
+    weights = random_weights(seed)
+    start = np.random.default_rng(seed).permutation(NUM_NODES)
+    objective, order, optimal = solve_ordering_mip(weights, start)
+
+    assert optimal
+    assert objective == pytest.approx(solve_exact_fas_dp(weights)[0])
+    assert objective == pytest.approx(backward_weight(weights, order))
+
+
+def test_exact_subset_rerank_matches_the_exact_dp():
+    weights = random_weights(0, num_nodes=12)
+    full_order, _, _ = sift(weights, np.arange(12))
+    subset = [1, 3, 4, 7, 8, 10, 11]
+    result = rerank_subset(weights, full_order, subset, exact=True, bound=False)
+
+    assert sorted(result["order"]) == subset
+    expected, _ = solve_exact_fas_dp(weights[np.ix_(subset, subset)])
+    assert result["objective"] == pytest.approx(expected)
+    assert result["objective"] == pytest.approx(backward_weight(weights, result["order"]))
@@ -0,0 +1,82 @@
+import datetime
+import os
+import sys
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from politeness import AdaptiveRateLimiter  # noqa: E402
+from response_cache import ResponseCache, cache_key, cached_get  # noqa: E402
+from stub_server import FixtureServer, ReplayServer  # noqa: E402
+from ut_http_client import UTSearchClient  # noqa: E402
+
+THIS_YEAR = datetime.date.today().year
+PAIR = ("School A", "School B")
+PAST_ROW = ["Management Science", "Old Paper", "Chen, Ying", "2019", "65"]
+CURRENT_ROW = ["Journal of Finance", "New Paper", "Lee, Sang", str(THIS_YEAR), "80"]
+LATER_ROW = ["Journal of Finance", "Newer Paper", "Smith, John", str(THIS_YEAR), "80"]
+
+
+def searched_years(server):
+    return [parse_qs(urlparse(path).query)["from"][0] for path in server.requests if path.startswith("/api/search")]
+
+
+def search(server, cache):
+    client = UTSearchClient(server.url.replace("/search", "/api/search"), limiter=AdaptiveRateLimiter(rate=100.0),
+                            timeout=5.0, fallback=False, cache=cache)
+    try:
+        return client.search(list(PAIR))["Business School Faculty"]["Article"].tolist()
+    finally:
+        client.close()
+
+
+def test_only_the_current_year_is_refetched(tmp_path):
+    fixtures = {PAIR: {"Business School Faculty": [PAST_ROW, CURRENT_ROW]}}
+    with FixtureServer(fixtures) as server:
+        cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+        assert search(server, cache) == ["Old Paper", "New Paper"]
+        # Both entries are fresh: the second search sends no request
+        assert search(server, cache) == ["Old Paper", "New Paper"]
+        assert searched_years(server) == ["1990"]
+        cache.close()
+
+        # Once this year's entry has expired, only this year is searched again
+        server.fixtures[PAIR]["Business School Faculty"].append(LATER_ROW)
+        cache = ResponseCache(str(tmp_path / "cache.sqlite"), ttls={"ut_search": 0})
+        assert search(server, cache) == ["Old Paper", "New Paper", "Newer Paper"]
+        assert searched_years(server) == ["1990", str(THIS_YEAR)]
+        cache.close()
+
+
+def test_stale_entries_are_revalidated(tmp_path):
+    recording = {"status": 200, "content_type": "text/html", "body": "<p>results</p>", "etag": '"v1"'}
+    with ReplayServer({"/scholar?q=paper": recording}) as server, requests.Session() as session:
+        url, params = server.base_url + "/scholar", {"q": "paper"}
+        cache = ResponseCache(str(tmp_path / "cache.sqlite"), ttls={"scholar": 0})
+        assert cached_get(cache, session, "scholar", url, params) == (200, "<p>results</p>")
+        assert cache.lookup("scholar", cache_key(url=url, params=params))["etag"] == '"v1"'
+
+        # The stale entry is revalidated: the ETag still matches, so the server answers 304 and
+        # the cached body is served even though the recorded body differs
+        recording["body"] = "<p>not sent</p>"
+        assert cached_get(cache, session, "scholar", url, params) == (200, "<p>results</p>")
+        assert len(server.requests) == 2
+
+        # A changed resource is downloaded again and replaces the entry
+        recording.update(body="<p>updated</p>", etag='"v2"')
+        assert cached_get(cache, session, "scholar", url, params) == (200, "<p>updated</p>")
+        assert cache.lookup("scholar", cache_key(url=url, params=params))["etag"] == '"v2"'
+        cache.close()
+
+
+def test_invalid_pages_are_not_cached(tmp_path):
+    recording = {"status": 200, "content_type": "text/html", "body": "unusual traffic"}
+    with ReplayServer({"/scholar?q=paper": recording}) as server, requests.Session() as session:
+        cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+        url = server.base_url + "/scholar"
+        for _ in range(2):
+            cached_get(cache, session, "scholar", url, {"q": "paper"}, is_valid=lambda text: "unusual" not in text)
+        assert len(server.requests) == 2
+        cache.close()
@@ -0,0 +1,50 @@
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shared_arrays  # noqa: E402
+from shared_arrays import SharedArrayStore, attach  # noqa: E402
+
+
+def _attach_sum(handle):
+    """
+    Sum of a shared array in a worker, with the segments the worker has mapped at that point.
+    """
+    total = float(attach(handle).sum())
+    return total, sorted(shared_arrays._attached)
+
+
+def test_publish_attach_in_a_spawned_worker_and_release():
+    first, second = np.arange(12.0).reshape(3, 4), np.ones((5, 5))
+    context = multiprocessing.get_context("spawn")
+    with SharedArrayStore() as store, ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        first_handle = store.publish(first)
+        assert executor.submit(_attach_sum, first_handle).result() == (first.sum(), [first_handle.name])
+
+        store.release(first_handle)
+        assert len(store) == 0
+        second_handle = store.publish(second)
+        # The worker's mapping of the released segment was closed once its array was gone
+        assert executor.submit(_attach_sum, second_handle).result() == (second.sum(), [second_handle.name])
+
+        with pytest.raises(FileNotFoundError):
+            executor.submit(_attach_sum, first_handle).result()
+
+
+def test_attachments_stay_mapped_while_viewed():
+    with SharedArrayStore() as store:
+        handle = store.publish(np.arange(4))
+        view = attach(handle)[1:]
+        shared_arrays._close_unused()
+        assert handle.name in shared_arrays._attached
+        assert view.tolist() == [1, 2, 3]
+
+        del view
+        store.release(handle)
+        assert handle.name not in shared_arrays._attached
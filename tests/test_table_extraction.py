@@ -0,0 +1,47 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from table_extraction import COLUMNS, TABLE_TYPES, parse_tables_html, tables_to_frames  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "ut_results_page.html")
+
+
+@pytest.fixture
+def frames():
+    with open(FIXTURE, encoding="utf-8") as file:
+        return tables_to_frames(parse_tables_html(file.read()))
+
+
+def test_every_table_type_is_extracted_with_the_columns(frames):
+    assert list(frames) == TABLE_TYPES
+    for frame in frames.values():
+        assert list(frame.columns) == COLUMNS
+
+
+def test_business_rows_skip_header_and_spacer_rows(frames):
+    expected = pd.DataFrame([
+        ["Management Science", "Pricing with Strategic Customers", "Chen, Ying\nLee, Sang\nHinds, Pamela J.", "2021", "67"],
+        ["Journal of Finance", "Liquidity and Asset Prices", "Smith, John", "2019", "74"],
+        ["MIS Quarterly", "Platform Governance & Trust", "Garcia, Maria\nOkafor, Chidi", "2024", "48"],
+    ], columns=COLUMNS)
+    pd.testing.assert_frame_equal(frames["Business School Faculty"], expected)
+
+
+def test_multi_author_cells_are_newline_joined(frames):
+    authors = frames["Business School Faculty"]["Author"].str.split("\n")
+    assert authors.tolist() == [
+        ["Chen, Ying", "Lee, Sang", "Hinds, Pamela J."],
+        ["Smith, John"],
+        ["Garcia, Maria", "Okafor, Chidi"],
+    ]
+
+
+def test_empty_table_gives_an_empty_frame(frames):
+    frame = frames["Non-Business School Faculty"]
+    assert frame.empty
+    assert list(frame.columns) == COLUMNS
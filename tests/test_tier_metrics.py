@@ -0,0 +1,85 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cluster_ranks import graph_weight_matrix, total_cut_imbalance  # noqa: E402
+from enumerate_tiers import compute_cut_imbalance  # noqa: E402
+from graph_generators import random_tournament_matrix, to_networkx  # noqa: E402
+from make_tiers import cut_imbalance_from_assignment  # noqa: E402
+from tier_metrics import labels_from_tiers, tier_cut_imbalance  # noqa: E402
+
+
+def loop_cut_imbalance(tiers, weights):
+    """
+    Reference: the original pair-by-pair loop from enumerate_tiers.
+    """
+    total = 0
+    for i in range(len(tiers)):
+        for j in range(len(tiers)):
+            if i != j:
+                w_ij = sum(weights[u][v] for u in tiers[i] for v in tiers[j])
+                w_ji = sum(weights[u][v] for u in tiers[j] for v in tiers[i])
+                if w_ij + w_ji > 0:
+                    total += abs(w_ij - w_ji) / (w_ij + w_ji)
+    return total / 2
+
+
+def random_case(seed):
+    """
+    A random tournament and a random sequential tier split of it.
+    """
+    rng = np.random.default_rng(seed)
+    num_nodes = int(rng.integers(2, 30))
+    num_tiers = int(rng.integers(1, num_nodes + 1))
+    weights = random_tournament_matrix(num_nodes, seed=rng).astype(float)
+    splits = np.sort(rng.choice(np.arange(1, num_nodes), num_tiers - 1, replace=False))
+    tiers = [part.tolist() for part in np.split(np.arange(num_nodes), splits)]
+    return weights, tiers
+
+
+SEEDS = range(40)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("sparse", [False, True], ids=["dense", "csr"])
+def test_kernel_matches_loop(seed, sparse):
+    weights, tiers = random_case(seed)
+    labels = labels_from_tiers(tiers, len(weights))
+    matrix = csr_matrix(weights) if sparse else weights
+    assert tier_cut_imbalance(matrix, labels) == pytest.approx(loop_cut_imbalance(tiers, weights))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_compute_cut_imbalance(seed):
+    weights, tiers = random_case(seed)
+    assert compute_cut_imbalance(tiers, weights) == pytest.approx(loop_cut_imbalance(tiers, weights))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_total_cut_imbalance(seed):
+    weights, tiers = random_case(seed)
+    # cluster_ranks halves the total, as the original implementation did
+    expected = 0.5 * loop_cut_imbalance(tiers, weights)
+    G = to_networkx(weights)
+    assert total_cut_imbalance(G, dict(enumerate(tiers))) == pytest.approx(expected)
+    assert total_cut_imbalance(G, dict(enumerate(tiers)), graph_weight_matrix(G)) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_cut_imbalance_from_assignment(seed):
+    weights, tiers = random_case(seed)
+    labels = labels_from_tiers(tiers, len(weights))
+    arcs = {(i, j): weights[i, j] for i, j in zip(*np.nonzero(weights))}
+    assignment = dict(enumerate(labels + 1))
+    expected = loop_cut_imbalance(tiers, weights)
+    assert cut_imbalance_from_assignment(arcs, assignment, len(tiers)) == pytest.approx(expected)
+
+
+def test_overlapping_tiers_are_rejected():
+    with pytest.raises(ValueError):
+        labels_from_tiers([[0, 1], [1, 2]], 3)
@@ -0,0 +1,103 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from politeness import AdaptiveRateLimiter  # noqa: E402
+from stub_server import ReplayServer  # noqa: E402
+from table_extraction import COLUMNS, TABLE_TYPES  # noqa: E402
+from ut_http_client import UTSearchClient, default_search_params  # noqa: E402
+
+PAIR = ["School A", "School B"]
+ROWS = [
+    ["Management Science", "Pricing with Strategic Customers", "Chen, Ying\nLee, Sang", "2021", "67"],
+    ["Journal of Finance", "Liquidity and Asset Prices", "Smith, John", "2019", "74"],
+]
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def search_path(schools, from_year="1990"):
+    params = default_search_params(schools, from_year)
+    return "/api/search?" + "&".join(f"{key}={value}" for key, value in params.items())
+
+
+def json_recording(tables):
+    return {"status": 200, "content_type": "application/json", "body": json.dumps({"columns": COLUMNS, "tables": tables})}
+
+
+def make_client(server, fallback=False):
+    return UTSearchClient(server.base_url + "/api/search", limiter=AdaptiveRateLimiter(rate=100.0),
+                          timeout=5.0, fallback=fallback)
+
+
+def test_json_search():
+    with ReplayServer({search_path(PAIR): json_recording([ROWS, []])}) as server:
+        client = make_client(server)
+        tables = client.search(PAIR)
+        client.close()
+
+    assert list(tables) == TABLE_TYPES
+    assert tables["Business School Faculty"].values.tolist() == ROWS
+    assert tables["Non-Business School Faculty"].empty
+
+
+def test_html_search():
+    with open(os.path.join(FIXTURES, "ut_results_page.html"), encoding="utf-8") as file:
+        page = file.read()
+    recording = {"status": 200, "content_type": "text/html; charset=utf-8", "body": page}
+    with ReplayServer({search_path(PAIR): recording}) as server:
+        client = make_client(server)
+        tables = client.search(PAIR)
+        client.close()
+
+    assert len(tables["Business School Faculty"]) == 3
+    assert tables["Business School Faculty"]["Author"][0] == "Chen, Ying\nLee, Sang\nHinds, Pamela J."
+
+
+@pytest.mark.parametrize("recording", [
+    {"status": 200, "content_type": "application/json", "body": ""},
+    {"status": 200, "content_type": "text/html", "body": "   "},
+    {"status": 200, "content_type": "application/json", "body": "{\"rows\": []"},
+    {"status": 200, "content_type": "application/json", "body": "{\"columns\": [\"Title\"], \"tables\": [[]]}"},
+    {"status": 200, "content_type": "application/json", "body": "[]"},
+], ids=["empty-json", "empty-html", "truncated-json", "wrong-columns", "not-an-object"])
+def test_malformed_response_raises_without_fallback(recording):
+    with ReplayServer({search_path(PAIR): recording}) as server:
+        client = make_client(server)
+        with pytest.raises(ValueError):
+            client.search(PAIR)
+        client.close()
+
+
+@pytest.mark.parametrize("recording", [
+    {"status": 200, "content_type": "application/json", "body": ""},
+    None,  # not recorded: the server answers 404
+], ids=["empty-response", "http-error"])
+def test_failed_search_falls_back_to_the_browser(recording, monkeypatch):
+    recordings = {search_path(PAIR): recording} if recording else {}
+    browser_tables = {table_type: None for table_type in TABLE_TYPES}
+    with ReplayServer(recordings) as server:
+        client = make_client(server, fallback=True)
+        calls = []
+        monkeypatch.setattr(client, "_search_selenium", lambda schools, from_year: calls.append(schools) or browser_tables)
+        assert client.search(PAIR) is browser_tables
+        client.close()
+    assert calls == [PAIR]
+
+
+def test_search_pairs_reports_errors_per_pair():
+    good, bad = ("School A", "School B"), ("School A", "School C")
+    recordings = {
+        search_path(list(good)): json_recording([ROWS, ROWS]),
+        search_path(list(bad)): {"status": 200, "content_type": "application/json", "body": ""},
+    }
+    with ReplayServer(recordings) as server:
+        client = make_client(server)
+        results = {pair: (tables, error) for pair, tables, error in client.search_pairs([good, bad], max_workers=2)}
+        client.close()
+
+    assert results[good][1] is None and len(results[good][0]["Non-Business School Faculty"]) == 2
+    assert results[bad][0] is None and isinstance(results[bad][1], ValueError)
@@ -0,0 +1,149 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from politeness import AdaptiveRateLimiter
+from response_cache import cached_search
+from table_extraction import COLUMNS, TABLE_TYPES, ColumnarBuffer, parse_tables_html, tables_to_frames
+
+
+def default_search_params(schools, from_year):
+    """
+    Query parameters of a search request. These match the local stub server; for the live
+    site, capture the request the Search button sends (browser network tab) and pass a
+    matching `build_params` to UTSearchClient.
+    """
+    return {"schools": "|".join(schools), "from": str(from_year)}
+
+
+def parse_search_response(response):
+    """
+    Parse a search response into the scrapers' tables: either JSON of the form
+    {"columns": [...], "tables": [[row, ...], ...]} or an HTML page with result tables.
+    Empty bodies and JSON without tables raise ValueError, so the client falls back.
+
+    Returns:
+    dict: Table type -> DataFrame with the COLUMNS.
+    """
+    if not response.content.strip():
+        raise ValueError("Empty search response")
+    if "json" in response.headers.get("Content-Type", ""):
+        payload = response.json()
+        if not isinstance(payload, dict) or not isinstance(payload.get("tables"), list):
+            raise ValueError("Search response has no tables")
+        if payload.get("columns", COLUMNS) != COLUMNS:
+            raise ValueError(f"Unexpected columns in search response: {payload.get('columns')}")
+        results = {}
+        for table_type, rows in zip(TABLE_TYPES, payload["tables"]):
+            buffer = ColumnarBuffer(COLUMNS)
+            buffer.extend([[str(value) for value in row] for row in rows])
+            results[table_type] = buffer.to_frame()
+        return results
+    return tables_to_frames(parse_tables_html(response.text))
+
+
+class UTSearchClient:
+    """
+    Issues UT Dallas searches as plain HTTP requests over a pooled keep-alive session,
+    falling back to driving the page with Selenium when a request cannot be served.
+
+    Parameters:
+    api_url (str): URL of the search request.
+    build_params (callable): (schools, from_year) -> query parameters.
+    limiter (AdaptiveRateLimiter): Shared politeness limiter (a new one at 2 requests/s if None).
+    pool_size (int): Connections kept alive in the session pool.
+    timeout (float): Seconds before a request times out.
+    fallback (bool): Retry failed searches through the Selenium path.
+    page_url (str): Search page URL for the Selenium fallback (ut_search.SEARCH_URL if None).
+    cache (ResponseCache): On-disk cache; past years are served from it and only the current
+        year is refetched.
+    """
+
+    def __init__(self, api_url, build_params=default_search_params, limiter=None, pool_size=8,
+                 timeout=30.0, fallback=True, page_url=None, cache=None):
+        self.api_url = api_url
+        self.build_params = build_params
+        self.limiter = limiter if limiter is not None else AdaptiveRateLimiter(rate=2.0, target_latency=5.0)
+        self.timeout = timeout
+        self.fallback = fallback
+        self.page_url = page_url
+        self.cache = cache
+
+        self.session = requests.Session()
+        retries = Retry(total=3, backoff_factor=1.0, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._driver = None
+        self._driver_lock = threading.Lock()
+
+    def fetch(self, schools, from_year="1990"):
+        """
+        Send one search request and return the raw response.
+        """
+        self.limiter.wait()
+        start = time.monotonic()
+        try:
+            response = self.session.get(self.api_url, params=self.build_params(schools, from_year), timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException:
+            self.limiter.record(time.monotonic() - start, ok=False)
+            raise
+        self.limiter.record(time.monotonic() - start)
+        return response
+
+    def search(self, schools, from_year="1990"):
+        """
+        Search for a school (or a pair of schools) and parse the result tables.
+
+        Returns:
+        dict: Table type -> DataFrame with the COLUMNS.
+        """
+        if self.cache is not None:
+            return cached_search(self.cache, self._search_uncached, schools, from_year)
+        return self._search_uncached(schools, from_year)
+
+    def _search_uncached(self, schools, from_year):
+        try:
+            return parse_search_response(self.fetch(schools, from_year))
+        except (requests.RequestException, ValueError, KeyError) as e:
+            if not self.fallback:
+                raise
+            print(f"HTTP search failed for {schools} ({e}), falling back to Selenium")
+            return self._search_selenium(schools, from_year)
+
+    def _search_selenium(self, schools, from_year):
+        from ut_search import SEARCH_URL, make_driver, search_schools
+
+        # One shared driver; Selenium drivers are not thread-safe
+        with self._driver_lock:
+            if self._driver is None:
+                self._driver = make_driver()
+            return search_schools(self._driver, list(schools), from_year, self.page_url or SEARCH_URL)
+
+    def search_pairs(self, pairs, from_year="1990", max_workers=8):
+        """
+        Run the searches for many school pairs concurrently on the pooled session.
+
+        Yields:
+        tuple: (pair, tables, error) as searches complete, like collab_crawler.crawl_pairs.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self.search, list(pair), from_year): pair for pair in pairs}
+            for future in as_completed(futures):
+                pair = futures[future]
+                try:
+                    yield pair, future.result(), None
+                except Exception as e:
+                    yield pair, None, e
+
+    def close(self):
+        self.session.close()
+        if self._driver is not None:
+            self._driver.quit()
+            self._driver = None
@@ -0,0 +1,151 @@
+from politeness import options_loaded, rows_stable
+from table_extraction import extract_tables_script, parse_tables_html, tables_to_frames
+
+SEARCH_URL = "https://jsom.utdallas.edu/the-utd-top-100-business-school-research-rankings/search#collaboration"
+
+# Loading indicator shown while a search runs (an absent element counts as gone);
+# ("id", ...) is (By.ID, ...), spelled out so importing this module does not load selenium
+SPINNER_LOCATOR = ("id", "spinner")
+
+# Message shown instead of the result tables when a search matches nothing
+NO_RESULTS_LOCATOR = ("xpath", "//*[contains(translate(text(), 'NORESULT', 'noresult'), 'no results')]")
+
+
+def make_driver(headless=True):
+    """
+    Start a Chrome driver for the UT Dallas search page.
+    """
+    from selenium import webdriver
+
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--window-size=1280,1024")
+    return webdriver.Chrome(options=options)
+
+
+def reset_driver(driver, url=SEARCH_URL):
+    """
+    Clear cookies and storage and reload the search page, so a long-lived driver starts
+    every query from a clean state without relaunching the browser.
+    """
+    driver.delete_all_cookies()
+    driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+    driver.get("about:blank")
+    driver.get(url)
+
+
+def choose_school(driver, school):
+    """
+    Type a school name into the autocomplete box and click the matching result.
+    """
+    from selenium.webdriver.common.action_chains import ActionChains
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    # Wait for the search box to be present
+    search_box = WebDriverWait(driver, 10).until(
+        EC.presence_of_element_located((By.CLASS_NAME, "as-input"))
+    )
+
+    # Input the school name into the search box
+    search_box.clear()  # Clear any previous input
+    search_box.send_keys(school)
+
+    # Wait for the results dropdown to appear
+    WebDriverWait(driver, 15).until(
+        EC.visibility_of_element_located((By.CLASS_NAME, "as-results"))
+    )
+
+    # Locate and click the appropriate result
+    result_items = driver.find_elements(By.CLASS_NAME, "as-result-item")
+    for item in result_items:
+        if school in item.text:
+            actions = ActionChains(driver)
+            actions.move_to_element(item).click().perform()
+            break
+
+    # The dropdown closes once the selection has been registered
+    WebDriverWait(driver, 10).until(
+        EC.invisibility_of_element_located((By.CLASS_NAME, "as-results"))
+    )
+
+
+def submit_search(driver, from_year="1990", timeout=60):
+    """
+    Pick the start year, select all journals and press Search, then wait until the loading
+    spinner is gone and the result table row counts have stopped changing (or the "no
+    results" message is shown).
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import Select, WebDriverWait
+
+    # Wait for the year dropdown to be populated
+    year_dropdown = WebDriverWait(driver, 10).until(options_loaded((By.ID, "fromDate")))
+
+    # Select the start year in the dropdown
+    Select(year_dropdown).select_by_value(from_year)
+
+    # Wait for the "Select All" link to be clickable and click it
+    select_all_link = WebDriverWait(driver, 10).until(
+        EC.element_to_be_clickable((By.LINK_TEXT, "Select All"))
+    )
+    select_all_link.click()
+
+    # Wait for the "Search" button to be clickable and click it
+    search_button = WebDriverWait(driver, 10).until(
+        EC.element_to_be_clickable((By.CLASS_NAME, "button4"))
+    )
+    search_button.click()
+
+    # Wait for the results to load: spinner gone and table rows no longer changing, or no results
+    WebDriverWait(driver, timeout).until(EC.invisibility_of_element_located(SPINNER_LOCATOR))
+    WebDriverWait(driver, timeout, poll_frequency=0.25).until(
+        rows_stable((By.TAG_NAME, "table"), empty_locator=NO_RESULTS_LOCATOR)
+    )
+
+
+def extract_tables(driver, method="script"):
+    """
+    Read the result tables on the page in one round trip.
+
+    Parameters:
+    driver: Selenium WebDriver showing the results.
+    method (str): "script" to collect the cells with one execute_script call, or "html" to
+        parse driver.page_source with lxml.
+
+    Returns:
+    dict: Table type -> DataFrame with the COLUMNS, for every table present.
+    """
+    if method == "html":
+        raw_tables = parse_tables_html(driver.page_source)
+    else:
+        raw_tables = extract_tables_script(driver)
+    return tables_to_frames(raw_tables)
+
+
+def search_schools(driver, schools, from_year="1990", url=SEARCH_URL, reset=True):
+    """
+    Run one search for a school (or a pair of schools for collaborations) and read the results.
+
+    Parameters:
+    driver: Selenium WebDriver to use.
+    schools (list): One school, or two schools for a collaboration search.
+    from_year (str): First publication year to include.
+    url (str): Search page URL.
+    reset (bool): Reset the driver state and reload the page before searching.
+
+    Returns:
+    dict: Table type -> DataFrame with the COLUMNS.
+    """
+    if reset:
+        reset_driver(driver, url)
+    else:
+        driver.get(url)
+
+    for school in schools:
+        choose_school(driver, school)
+    submit_search(driver, from_year)
+    return extract_tables(driver)